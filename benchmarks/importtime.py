@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""specify 冷啟動的 -X importtime 迴歸基準。
+
+在全新的直譯器中重複匯入 specify_cli.cli (即 specify --help / specify check 會載入的部分)，
+並檢查：
+
+1. 不應在啟動時載入的重量級模組 (httpx、readchar、rich.live 等) 是否被匯入；
+2. 扣除第三方基本開銷 (typer + rich.console + platformdirs) 後，specify_cli 自身的匯入耗時
+   是否超過 --max-overhead-ms；
+3. (選用) 整體匯入耗時是否超過 --max-total-ms。
+
+任何一項不符時以非零結束代碼結束，可直接放進 CI。
+
+用法：
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --runs 15 --max-overhead-ms 20 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# 這些模組只應在真正需要時 (init 下載、互動式選單等) 才載入
+FORBIDDEN_AT_STARTUP = (
+    "httpx",
+    "readchar",
+    "rich.live",
+    "rich.progress",
+    "rich.table",
+    "rich.tree",
+    "specify_cli.github",
+    "specify_cli.scaffold",
+    "specify_cli.batch",
+    "specify_cli.git",
+)
+
+# specify 啟動時無論如何都必須付出的第三方匯入
+BASELINE_IMPORTS = "import typer, typer.core, rich.console, rich.text, rich.align, platformdirs"
+TARGET_IMPORTS = "import specify_cli.cli"
+
+
+def measure(statement: str) -> tuple[float, set[str]]:
+    """在全新的直譯器中執行匯入，回傳 (頂層匯入累計毫秒數, 已匯入模組集合)。"""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR), PYTHONDONTWRITEBYTECODE="")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # 標題列
+        modules.add(name.strip())
+        # 沒有縮排的項目是頂層匯入，其累計時間已包含所有子匯入
+        if not name.startswith("  ", 1):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def run(runs: int) -> dict:
+    # 先各執行一次以暖機 (產生 .pyc)，避免首次編譯干擾量測
+    measure(BASELINE_IMPORTS)
+    measure(TARGET_IMPORTS)
+
+    baseline_ms = []
+    target_ms = []
+    imported = set()
+    for _ in range(runs):
+        baseline_ms.append(measure(BASELINE_IMPORTS)[0])
+        elapsed, modules = measure(TARGET_IMPORTS)
+        target_ms.append(elapsed)
+        imported |= modules
+
+    baseline = statistics.median(baseline_ms)
+    target = statistics.median(target_ms)
+    return {
+        "runs": runs,
+        "baseline_ms": round(baseline, 2),
+        "total_ms": round(target, 2),
+        "overhead_ms": round(target - baseline, 2),
+        "forbidden_imports": sorted(m for m in FORBIDDEN_AT_STARTUP if m in imported),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=9, help="量測次數 (取中位數)")
+    parser.add_argument("--max-overhead-ms", type=float, default=25.0, help="specify_cli 自身匯入耗時上限")
+    parser.add_argument("--max-total-ms", type=float, default=None, help="整體匯入耗時上限 (依機器而定，預設不檢查)")
+    parser.add_argument("--json", action="store_true", help="以 JSON 輸出結果")
+    args = parser.parse_args()
+
+    report = run(max(1, args.runs))
+    failures = []
+    if report["forbidden_imports"]:
+        failures.append(f"啟動時載入了重量級模組：{', '.join(report['forbidden_imports'])}")
+    if report["overhead_ms"] > args.max_overhead_ms:
+        failures.append(f"specify_cli 匯入耗時 {report['overhead_ms']} ms 超過上限 {args.max_overhead_ms} ms")
+    if args.max_total_ms is not None and report["total_ms"] > args.max_total_ms:
+        failures.append(f"整體匯入耗時 {report['total_ms']} ms 超過上限 {args.max_total_ms} ms")
+    report["failures"] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"第三方基本開銷：{report['baseline_ms']} ms")
+        print(f"specify_cli.cli 整體：{report['total_ms']} ms")
+        print(f"specify_cli 自身：{report['overhead_ms']} ms (上限 {args.max_overhead_ms} ms)")
+        for failure in failures:
+            print(f"失敗：{failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""specify init 流程的分階段基準 (使用本機的假 GitHub 伺服器，不連線)。
+
+在本機啟動提供 /repos/<owner>/<repo>/releases/latest 與合成範本 ZIP 的 HTTP 伺服器
+(檔案數、總大小與延遲可調整；ZIP 採 GitHub 樣式的單一根目錄，會經過展平)，並量測：
+
+- fetch：取得發布版本資訊 (fetch_latest_release)
+- download：下載範本 (download_template_from_github)
+- flatten：偵測並移除根目錄前綴 (解壓縮時即展平，這裡只剩前綴偵測)
+- extract：解壓縮到專案目錄並記錄安裝基準
+- git：初始化儲存庫並建立第一個提交 (bootstrap_git_repo)
+- total：上述階段的總時間
+- end_to_end：在相同快取狀態下直接呼叫 download_and_extract_template 加上 git 的總時間
+
+情境：cold (空快取)、warm (發布版本資訊與 ZIP 皆已快取)、nocache (--no-cache)，
+以及 here (--here 合併到已有檔案的目錄，使用暖快取)。
+結果可輸出為 JSON，並可與先前的結果比較，任一階段退步超過門檻時以非零結束代碼結束。
+
+用法：
+    python benchmarks/init_pipeline.py
+    python benchmarks/init_pipeline.py --files 400 --size-kb 4096 --runs 7 --output bench.json
+    python benchmarks/init_pipeline.py --compare bench.json --max-regression 0.25
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from specify_cli import github  # noqa: E402
+from specify_cli.cache import TemplateCache  # noqa: E402
+from specify_cli.extract import archive_root_prefix, extract_template_archive  # noqa: E402
+from specify_cli.git import bootstrap_git_repo  # noqa: E402
+from specify_cli.scaffold import download_and_extract_template  # noqa: E402
+from specify_cli.ui import console  # noqa: E402
+from specify_cli.upgrade import record_installed_templates  # noqa: E402
+
+AGENT = "claude"
+RELEASE = "v0.0.0-bench"
+PHASES = ("fetch", "download", "flatten", "extract", "git", "total", "end_to_end")
+SCENARIOS = ("cold", "warm", "nocache", "here")
+# 合成範本中的目錄與各自的檔案比例
+TEMPLATE_LAYOUT = (("templates", 0.4), ("scripts", 0.2), ("memory", 0.1), (".claude/commands", 0.3))
+
+
+def build_template_zip(files: int, total_bytes: int, seed: int = 0) -> bytes:
+    """建立 GitHub 樣式 (單一根目錄) 的合成範本 ZIP；內容為可壓縮的文字與部分隨機位元組。"""
+    rng = random.Random(seed)
+    root = f"spec-kit-template-{AGENT}-{RELEASE}"
+    per_file = max(1, total_bytes // max(1, files))
+    words = [f"word{n}" for n in range(512)]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        number = 0
+        for directory, share in TEMPLATE_LAYOUT:
+            count = max(1, round(files * share))
+            for _ in range(count):
+                text = " ".join(rng.choice(words) for _ in range(per_file // 12 + 1)).encode()
+                noise = rng.randbytes(per_file // 4)
+                suffix = ".sh" if directory == "scripts" else ".md"
+                info = zipfile.ZipInfo(f"{root}/{directory}/file-{number:05d}{suffix}", (2024, 1, 1, 0, 0, 0))
+                info.external_attr = (0o100755 if suffix == ".sh" else 0o100644) << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(info, (text[: per_file - len(noise)] + noise)[:per_file])
+                number += 1
+    return buffer.getvalue()
+
+
+class FakeGitHub:
+    """在背景執行緒提供發布版本 JSON 與範本 ZIP 的本機伺服器 (支援 ETag 與 Range)。"""
+
+    def __init__(self, payload: bytes, latency: float = 0.0):
+        self.payload = payload
+        self.latency = latency
+        self.requests = 0
+        digest = hashlib.sha256(payload).hexdigest()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if self.path.endswith("/releases/latest"):
+                    etag = f'"{digest[:16]}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    body = json.dumps(fake.release_data()).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("ETag", etag)
+                elif self.path == f"/assets/{fake.asset_name}":
+                    start = 0
+                    if self.headers.get("Range", "").startswith("bytes="):
+                        start = int(self.headers["Range"][6:].split("-")[0])
+                    body = fake.payload[start:]
+                    self.send_response(206 if start else 200)
+                    if start:
+                        self.send_header("Content-Range", f"bytes {start}-{len(fake.payload) - 1}/{len(fake.payload)}")
+                    self.send_header("Content-Type", "application/zip")
+                else:
+                    self.send_error(404)
+                    return
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.asset_name = f"spec-kit-template-{AGENT}-{RELEASE}.zip"
+        self.digest = digest
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url}/repos/bench/spec-kit/releases/latest"
+
+    def release_data(self) -> dict:
+        return {
+            "tag_name": RELEASE,
+            "assets": [{
+                "name": self.asset_name,
+                "size": len(self.payload),
+                "browser_download_url": f"{self.base_url}/assets/{self.asset_name}",
+                "digest": f"sha256:{self.digest}",
+            }],
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def populate_existing(project: Path, payload: bytes, extra_files: int):
+    """--here 情境：目錄中已有一半的範本檔案 (會被覆寫) 與其他專案檔案。"""
+    project.mkdir(parents=True)
+    with zipfile.ZipFile(io.BytesIO(payload)) as zf:
+        prefix = archive_root_prefix(zf.namelist())
+        for name in zf.namelist()[::2]:
+            target = project / name[len(prefix):]
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(b"existing\n")
+    for number in range(extra_files):
+        target = project / "src" / f"module_{number // 50}" / f"file_{number}.py"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"value = {number}\n")
+
+
+def timed(timings: dict, phase: str, func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings[phase] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def run_pipeline(project: Path, server: FakeGitHub, cache: TemplateCache | None, here: bool, git: bool) -> dict:
+    """依 init 的順序逐階段執行並計時 (毫秒)。"""
+    timings = {}
+    started = time.perf_counter()
+    release = timed(timings, "fetch", github.fetch_latest_release, server.api_url, cache=cache)
+    archive, _ = timed(
+        timings, "download", github.download_template_from_github,
+        AGENT, verbose=False, show_progress=False, cache=cache, release=release,
+    )
+    try:
+        if not here:
+            project.mkdir(parents=True)
+        with zipfile.ZipFile(archive) as zip_ref:
+            prefix = timed(timings, "flatten", archive_root_prefix, zip_ref.namelist())
+
+            def extract():
+                stats = extract_template_archive(zip_ref, project, strip_prefix=prefix)
+                record_installed_templates(project, [(AGENT, stats)], RELEASE)
+
+            timed(timings, "extract", extract)
+    finally:
+        archive.close()
+    if git:
+        timed(timings, "git", bootstrap_git_repo, project)
+    timings["total"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def run_end_to_end(project: Path, cache: TemplateCache | None, here: bool, git: bool) -> float:
+    # 沒有追蹤器時會顯示下載進度條，與 init 的實際行為相同，但不輸出到終端機
+    started = time.perf_counter()
+    download_and_extract_template(project, AGENT, here, verbose=False, cache=cache)
+    if git:
+        bootstrap_git_repo(project)
+    return (time.perf_counter() - started) * 1000
+
+
+def run_scenario(scenario: str, server: FakeGitHub, workdir: Path, *, runs: int, git: bool, extra_files: int) -> dict:
+    cache_root = workdir / "cache"
+    here = scenario == "here"
+    samples = {phase: [] for phase in PHASES if git or phase != "git"}
+
+    def prepare_cache() -> TemplateCache | None:
+        if scenario == "nocache":
+            return None
+        if scenario == "cold":
+            shutil.rmtree(cache_root, ignore_errors=True)
+        cache = TemplateCache(cache_root)
+        if scenario in ("warm", "here") and cache.lookup(RELEASE, server.asset_name) is None:
+            archive, _ = github.download_template_from_github(AGENT, verbose=False, show_progress=False, cache=cache)
+            archive.close()
+        return cache
+
+    for run in range(runs):
+        projects = [workdir / f"{scenario}-{run}-{kind}" for kind in ("pipeline", "e2e")]
+        if here:
+            for project in projects:
+                populate_existing(project, server.payload, extra_files)
+        timings = run_pipeline(projects[0], server, prepare_cache(), here, git)
+        timings["end_to_end"] = run_end_to_end(projects[1], prepare_cache(), here, git)
+        for phase, values in samples.items():
+            values.append(timings[phase])
+        for project in projects:
+            shutil.rmtree(project, ignore_errors=True)
+
+    return {
+        phase: {
+            "median_ms": round(statistics.median(values), 3),
+            "min_ms": round(min(values), 3),
+            "max_ms": round(max(values), 3),
+        }
+        for phase, values in samples.items()
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> list[str]:
+    """與先前的結果比較各情境、各階段的中位數，回傳退步項目。"""
+    failures = []
+    for scenario, phases in report["results"].items():
+        for phase, current in phases.items():
+            previous = baseline.get("results", {}).get(scenario, {}).get(phase)
+            if not previous:
+                continue
+            delta = current["median_ms"] - previous["median_ms"]
+            if delta > min_delta_ms and delta > previous["median_ms"] * max_regression:
+                failures.append(
+                    f"{scenario}/{phase}：{previous['median_ms']:.1f} ms -> {current['median_ms']:.1f} ms "
+                    f"(+{delta / previous['median_ms'] * 100 if previous['median_ms'] else float('inf'):.0f}%)"
+                )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200, help="合成範本的檔案數")
+    parser.add_argument("--size-kb", type=int, default=1024, help="合成範本的總大小 (KiB，未壓縮)")
+    parser.add_argument("--runs", type=int, default=5, help="每個情境的量測次數 (取中位數)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="假伺服器每個請求的額外延遲")
+    parser.add_argument("--here-files", type=int, default=500, help="here 情境中目錄內原有的其他檔案數")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="只執行指定情境 (可重複)")
+    parser.add_argument("--no-git", action="store_true", help="不量測 git 階段")
+    parser.add_argument("--output", type=Path, help="將結果寫入 JSON 檔案")
+    parser.add_argument("--compare", type=Path, help="與先前的 JSON 結果比較")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="允許的退步比例 (搭配 --compare)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="小於此毫秒數的差異視為雜訊")
+    parser.add_argument("--json", action="store_true", help="以 JSON 輸出結果")
+    args = parser.parse_args()
+
+    git = not args.no_git and shutil.which("git") is not None
+    payload = build_template_zip(args.files, args.size_kb * 1024)
+    scenarios = args.scenario or list(SCENARIOS)
+    report = {
+        "config": {
+            "files": args.files,
+            "size_kb": args.size_kb,
+            "zip_bytes": len(payload),
+            "runs": args.runs,
+            "latency_ms": args.latency_ms,
+            "git": git,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {},
+    }
+
+    env = {key: os.environ.get(key) for key in ("SPECIFY_RELEASE_TTL", "GIT_AUTHOR_NAME", "GIT_AUTHOR_EMAIL", "GIT_COMMITTER_NAME", "GIT_COMMITTER_EMAIL")}
+    # 基準不應受使用者的 git 設定與 TTL 影響
+    os.environ.update({
+        "SPECIFY_RELEASE_TTL": "600",
+        "GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@example.com",
+        "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@example.com",
+    })
+    original_url = github.latest_release_url
+    console.quiet = True
+    try:
+        with FakeGitHub(payload, args.latency_ms / 1000) as server, tempfile.TemporaryDirectory(prefix="specify-bench-") as tmp:
+            # download_and_extract_template 內部會自行查詢發布版本，改指向假伺服器
+            github.latest_release_url = lambda: server.api_url
+            for scenario in scenarios:
+                report["results"][scenario] = run_scenario(
+                    scenario, server, Path(tmp) / scenario,
+                    runs=max(1, args.runs), git=git, extra_files=args.here_files,
+                )
+    finally:
+        github.latest_release_url = original_url
+        console.quiet = False
+        for key, value in env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    failures = []
+    if args.compare:
+        failures = compare(report, json.loads(args.compare.read_text(encoding="utf-8")), args.max_regression, args.min_delta_ms)
+    report["failures"] = failures
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        config = report["config"]
+        print(f"合成範本：{config['files']} 檔案，{config['size_kb']} KiB (ZIP {config['zip_bytes']:,} bytes)，每情境 {config['runs']} 次")
+        phases = [phase for phase in PHASES if git or phase != "git"]
+        print(f"{'情境':<10}" + "".join(f"{phase:>12}" for phase in phases))
+        for scenario, results in report["results"].items():
+            print(f"{scenario:<12}" + "".join(f"{results[phase]['median_ms']:>12.1f}" for phase in phases))
+        print("(中位數，毫秒)")
+        for failure in failures:
+            print(f"退步：{failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
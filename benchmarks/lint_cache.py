@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""specify lint 結果快取的迴歸檢查。
+
+在暫存儲存庫中 (memory/constitution.md + specs/001-demo/plan.md) 依序：
+
+1. 以快取檢查一次；
+2. 在憲章的核心原則中新增一條 plan.md 未涵蓋的原則 (plan.md 本身不變)；
+3. 再以同一個快取檢查一次，並與不使用快取的結果比較。
+
+第二次檢查必須回報新增原則的 constitution 警告，且結果與不使用快取時相同；
+不符時以非零結束代碼結束，可直接放進 CI。
+
+用法：
+    python benchmarks/lint_cache.py
+    python benchmarks/lint_cache.py --json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from specify_cli.lint import lint_paths  # noqa: E402
+
+CONSTITUTION = """# 示範專案憲章
+
+## 核心原則
+
+### I. Alpha Principle
+每個功能都從程式庫開始。
+"""
+NEW_PRINCIPLE = """
+### II. Zeta Principle
+每次變更都必須附上量測結果。
+"""
+PLAN = """# 實作計畫：示範功能
+
+## 摘要
+示範用的計畫。
+
+## 憲法檢查
+- [x] Alpha Principle：以程式庫實作
+"""
+EXPECTED_MESSAGE = "憲法檢查未涵蓋憲章原則：Zeta Principle"
+
+
+def messages(report: dict) -> list[str]:
+    return sorted(f"{f['path']}:{f['rule']}:{f['message']}" for f in report["findings"])
+
+
+def run() -> dict:
+    with tempfile.TemporaryDirectory(prefix="specify-lint-cache-") as tmp:
+        repo_root = Path(tmp)
+        (repo_root / "memory").mkdir()
+        constitution = repo_root / "memory" / "constitution.md"
+        constitution.write_text(CONSTITUTION, encoding="utf-8")
+        (repo_root / "specs" / "001-demo").mkdir(parents=True)
+        (repo_root / "specs" / "001-demo" / "plan.md").write_text(PLAN, encoding="utf-8")
+        cache_path = repo_root / ".lint-cache.json"
+
+        first = lint_paths([repo_root], repo_root=repo_root, cache_path=cache_path)
+        constitution.write_text(CONSTITUTION + NEW_PRINCIPLE, encoding="utf-8")
+        cached = lint_paths([repo_root], repo_root=repo_root, cache_path=cache_path)
+        uncached = lint_paths([repo_root], repo_root=repo_root)
+        return {
+            "first_findings": len(first["findings"]),
+            "cached_findings": len(cached["findings"]),
+            "uncached_findings": len(uncached["findings"]),
+            "cached_rechecked": cached["checked"],
+            "reports_new_principle": any(f["message"] == EXPECTED_MESSAGE for f in cached["findings"]),
+            "matches_uncached": messages(cached) == messages(uncached),
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="以 JSON 輸出結果")
+    args = parser.parse_args()
+
+    report = run()
+    failures = []
+    if not report["reports_new_principle"]:
+        failures.append(f"修改憲章後，快取的檢查結果沒有回報「{EXPECTED_MESSAGE}」")
+    if not report["matches_uncached"]:
+        failures.append(f"快取的檢查結果 ({report['cached_findings']} 項) 與不使用快取時 ({report['uncached_findings']} 項) 不同")
+    report["failures"] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"第一次：{report['first_findings']} 項；修改憲章後 (快取)：{report['cached_findings']} 項，"
+              f"重新檢查 {report['cached_rechecked']} 個檔案；不使用快取：{report['uncached_findings']} 項")
+        for failure in failures:
+            print(f"失敗：{failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
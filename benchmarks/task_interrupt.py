@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""specify tasks run 的 Ctrl-C 迴歸檢查。
+
+建立暫存的 tasks.md (數個平行的 `sleep` 任務，多於 --jobs)，以子行程執行 specify tasks run，
+在 --interrupt-after 秒後送出 SIGINT，並檢查：
+
+1. specify 在 --max-exit-seconds 秒內結束 (不會等待執行中的任務跑完)，結束代碼為 130；
+2. 執行中的任務指令 (獨立的行程群組，收不到終端機的 SIGINT) 已被結束；
+3. 排隊中的任務沒有啟動。
+
+任何一項不符時以非零結束代碼結束，可直接放進 CI。僅支援 POSIX。
+
+用法：
+    python benchmarks/task_interrupt.py
+    python benchmarks/task_interrupt.py --sleep 8 --interrupt-after 1 --json
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+SPECIFY = "import sys; from specify_cli import main; sys.argv[0] = 'specify'; main()"
+
+
+def write_tasks(feature_dir: Path, count: int, sleep: float):
+    """count 個平行任務，每個先寫入自己的 shell PID 再 sleep。"""
+    lines = ["# 任務：中斷檢查", "", "## 階段 3.1：設定"]
+    for number in range(1, count + 1):
+        task_id = f"T{number:03d}"
+        lines.append(f"- [ ] {task_id} [P] 在 {task_id.lower()}.txt 中等待")
+        lines.append(f"  - 指令：`echo $$ > {feature_dir / task_id}.pid; sleep {sleep:g}`")
+    (feature_dir / "tasks.md").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def alive(pid: int) -> bool:
+    """行程仍在執行 (殭屍行程視為已結束)。"""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def run(sleep: float, interrupt_after: float, jobs: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="specify-interrupt-") as tmp:
+        feature_dir = Path(tmp)
+        count = jobs + 1
+        write_tasks(feature_dir, count, sleep)
+        env = dict(os.environ, PYTHONPATH=str(SRC_DIR), SPECIFY_NO_TUI="1")
+        proc = subprocess.Popen(
+            [sys.executable, "-c", SPECIFY, "tasks", "run", str(feature_dir / "tasks.md"), "--jobs", str(jobs)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=env,
+        )
+        time.sleep(interrupt_after)
+        sent = time.perf_counter()
+        proc.send_signal(signal.SIGINT)
+        try:
+            output, _ = proc.communicate(timeout=sleep * 2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            output, _ = proc.communicate()
+        exit_seconds = time.perf_counter() - sent
+
+        pids = {}
+        for number in range(1, count + 1):
+            pid_file = feature_dir / f"T{number:03d}.pid"
+            if pid_file.is_file():
+                pids[pid_file.stem] = int(pid_file.read_text().strip())
+        return {
+            "jobs": jobs,
+            "tasks": count,
+            "returncode": proc.returncode,
+            "exit_seconds": round(exit_seconds, 3),
+            "started_tasks": sorted(pids),
+            "surviving_tasks": sorted(task_id for task_id, pid in pids.items() if alive(pid)),
+            "output": output.decode("utf-8", "replace"),
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sleep", type=float, default=8.0, help="每個任務執行的秒數")
+    parser.add_argument("--interrupt-after", type=float, default=1.0, help="啟動後多少秒送出 SIGINT")
+    parser.add_argument("--jobs", type=int, default=2, help="同時執行的任務數 (另有一個任務排隊)")
+    parser.add_argument("--max-exit-seconds", type=float, default=3.0, help="送出 SIGINT 後結束的時間上限")
+    parser.add_argument("--json", action="store_true", help="以 JSON 輸出結果")
+    args = parser.parse_args()
+
+    if os.name == "nt":
+        print("此檢查僅支援 POSIX")
+        return 0
+
+    report = run(args.sleep, args.interrupt_after, max(1, args.jobs))
+    failures = []
+    if report["exit_seconds"] > args.max_exit_seconds:
+        failures.append(f"送出 SIGINT 後 {report['exit_seconds']} 秒才結束，超過上限 {args.max_exit_seconds} 秒")
+    if report["returncode"] != 130:
+        failures.append(f"結束代碼為 {report['returncode']}，預期為 130")
+    if report["surviving_tasks"]:
+        failures.append(f"中斷後仍在執行的任務：{', '.join(report['surviving_tasks'])}")
+    if len(report["started_tasks"]) > report["jobs"]:
+        failures.append(f"中斷後仍啟動了排隊中的任務：{', '.join(report['started_tasks'])}")
+    report["failures"] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"送出 SIGINT 後結束：{report['exit_seconds']} 秒 (上限 {args.max_exit_seconds} 秒)，結束代碼 {report['returncode']}")
+        print(f"已啟動的任務：{', '.join(report['started_tasks']) or '無'}")
+        for failure in failures:
+            print(f"失敗：{failure}")
+        if failures:
+            print(report["output"])
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""AI 助理上下文檔案 (CLAUDE.md、GEMINI.md、copilot-instructions.md) 的增量更新。
+
+取代 update-agent-context.sh：plan.md 與每個上下文檔案都只解析一次，
+依章節套用「使用中的技術 / 指令 / 最近變更」等差異，手動新增區塊原樣保留，
+並以同目錄中的唯一暫存檔原子寫入。章節標題與標籤同時支援中文與英文版本的範本。
+"""
+
+import os
+import re
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from .render import compile_template, default_variables
+
+# 助理 -> (上下文檔案相對路徑, 顯示名稱)
+AGENT_CONTEXT_FILES = {
+    "claude": ("CLAUDE.md", "Claude Code"),
+    "gemini": ("GEMINI.md", "Gemini CLI"),
+    "copilot": (".github/copilot-instructions.md", "GitHub Copilot"),
+}
+
+# plan.md 技術背景欄位 -> 可能的標籤
+PLAN_FIELDS = {
+    "language": ("Language/Version", "語言/版本"),
+    "framework": ("Primary Dependencies", "主要相依性"),
+    "storage": ("Storage", "儲存"),
+    "testing": ("Testing", "測試"),
+    "project_type": ("Project Type", "專案類型"),
+}
+
+# 上下文檔案章節 -> 可能的標題
+SECTION_TITLES = {
+    "technologies": ("Active Technologies", "使用中的技術"),
+    "structure": ("Project Structure", "專案結構"),
+    "commands": ("Commands", "指令"),
+    "style": ("Code Style", "程式碼風格"),
+    "recent": ("Recent Changes", "最近變更"),
+}
+
+MANUAL_START_MARKERS = ("<!-- MANUAL ADDITIONS START -->", "<!-- 手動新增開始 -->")
+MANUAL_END_MARKERS = ("<!-- MANUAL ADDITIONS END -->", "<!-- 手動新增結束 -->")
+
+# 依語言加入的最小指令集 (關鍵字, 指令)
+LANGUAGE_COMMANDS = (
+    (("Python",), "cd src && pytest && ruff check ."),
+    (("Rust",), "cargo test && cargo clippy"),
+    (("JavaScript", "TypeScript"), "npm test && npm run lint"),
+)
+
+RECENT_CHANGES_LIMIT = 3
+_PLACEHOLDER = re.compile(r"^\[.*\]$")
+_DATE_LINE = re.compile(r"(Last updated: |最後更新：)(\d{4}-\d{2}-\d{2}|\[DATE\])")
+
+
+def parse_plan(text: str) -> dict:
+    """一次掃描 plan.md，取出技術背景欄位；未定案 (NEEDS CLARIFICATION、N/A、範本佔位符) 的欄位為空字串。"""
+    label_to_field = {label: field for field, labels in PLAN_FIELDS.items() for label in labels}
+    pattern = re.compile(r"^\*\*(.+?)\*\*\s*[:：]\s*(.*?)\s*$")
+    info = dict.fromkeys(PLAN_FIELDS, "")
+    for line in text.splitlines():
+        match = pattern.match(line)
+        if not match or match.group(1) not in label_to_field:
+            continue
+        field = label_to_field[match.group(1)]
+        value = match.group(2)
+        if info[field] or "NEEDS CLARIFICATION" in value or _PLACEHOLDER.match(value):
+            continue
+        if field == "storage" and value == "N/A":
+            continue
+        info[field] = value
+    return info
+
+
+def language_command(language: str) -> str:
+    for keywords, command in LANGUAGE_COMMANDS:
+        if any(keyword in language for keyword in keywords):
+            return command
+    return f"# 新增 {language} 的指令"
+
+
+class AgentContextDocument:
+    """以章節為單位的 Markdown 模型：前言、各 ## 章節與手動新增區塊，渲染時還原其餘內容。"""
+
+    def __init__(self, text: str):
+        self.trailing_newline = text.endswith("\n")
+        # 每個區塊：{"kind": preamble|section|manual|raw, "lines": [...]}；章節的第一行為標題
+        self.blocks: list[dict] = [{"kind": "preamble", "lines": []}]
+        in_fence = False
+        in_manual = False
+        for line in text.splitlines():
+            stripped = line.strip()
+            if in_manual:
+                self.blocks[-1]["lines"].append(line)
+                if stripped in MANUAL_END_MARKERS:
+                    in_manual = False
+                    self.blocks.append({"kind": "raw", "lines": []})
+                continue
+            if stripped.startswith("```"):
+                in_fence = not in_fence
+            if not in_fence and stripped in MANUAL_START_MARKERS:
+                in_manual = True
+                self.blocks.append({"kind": "manual", "lines": [line]})
+            elif not in_fence and line.startswith("## "):
+                self.blocks.append({"kind": "section", "lines": [line]})
+            else:
+                self.blocks[-1]["lines"].append(line)
+
+    def render(self) -> str:
+        text = "\n".join(line for block in self.blocks for line in block["lines"])
+        return text + "\n" if self.trailing_newline else text
+
+    def section(self, key: str) -> list[str] | None:
+        """回傳章節的行清單 (第一行為標題，可直接修改)；找不到時回傳 None。"""
+        titles = SECTION_TITLES[key]
+        for block in self.blocks:
+            if block["kind"] == "section" and block["lines"][0][3:].strip() in titles:
+                return block["lines"]
+        return None
+
+    @staticmethod
+    def _body(lines: list[str]) -> tuple[list[str], list[str]]:
+        # 拆成 (內容, 結尾空行)，並移除範本佔位符行
+        end = len(lines)
+        while end > 1 and not lines[end - 1].strip():
+            end -= 1
+        body = [line for line in lines[1:end] if not _PLACEHOLDER.match(line.strip())]
+        return body, lines[end:] or [""]
+
+    @staticmethod
+    def _set_body(lines: list[str], body: list[str], tail: list[str]):
+        lines[1:] = body + tail
+
+    def add_list_items(self, key: str, items: list[tuple[str, str]]) -> list[str]:
+        """加入 (比對文字, 清單項目)：章節中尚未出現比對文字時才加入，回傳實際加入的項目。"""
+        lines = self.section(key)
+        if lines is None:
+            return []
+        body, tail = self._body(lines)
+        content = "\n".join(body)
+        added = [item for probe, item in items if probe and probe not in content]
+        if added:
+            self._set_body(lines, body + added, tail)
+        return added
+
+    def add_fenced_lines(self, key: str, new_lines: list[str]) -> list[str]:
+        """在章節的程式碼區塊中加入尚未出現的行 (沒有程式碼區塊時直接加在章節內容後)。"""
+        lines = self.section(key)
+        if lines is None:
+            return []
+        body, tail = self._body(lines)
+        existing = {line.strip() for line in body}
+        added = [line for line in new_lines if line.strip() not in existing]
+        if not added:
+            return []
+        fences = [i for i, line in enumerate(body) if line.strip().startswith("```")]
+        if len(fences) >= 2:
+            body = body[:fences[1]] + added + body[fences[1]:]
+        else:
+            body = body + added
+        self._set_body(lines, body, tail)
+        return added
+
+    def prepend_recent_change(self, branch: str, entry: str, limit: int = RECENT_CHANGES_LIMIT) -> bool:
+        """在最近變更最前面加入此功能 (同一分支的舊項目會被取代)，只保留最近 limit 筆；回傳是否有變更。"""
+        lines = self.section("recent")
+        if lines is None:
+            return False
+        body, tail = self._body(lines)
+        same_branch = re.compile(rf"^- {re.escape(branch)}[:：]")
+        entries = [line for line in body if line.startswith("- ") and not same_branch.match(line)]
+        # 非清單行 (例如標題後的空行) 保留在清單之前
+        others = [line for line in body if not line.startswith("- ")]
+        updated = others + [entry, *entries][:limit]
+        if updated == body:
+            return False
+        self._set_body(lines, updated, tail)
+        return True
+
+    def set_date(self, today: str) -> bool:
+        changed = False
+        for block in self.blocks:
+            for i, line in enumerate(block["lines"]):
+                updated = _DATE_LINE.sub(lambda m: m.group(1) + today, line)
+                if updated != line:
+                    block["lines"][i] = updated
+                    changed = True
+        return changed
+
+
+def apply_plan(document: AgentContextDocument, plan: dict, branch: str, *, created: bool = False, today: str | None = None) -> dict:
+    """將 plan 的技術資訊套用到上下文檔案，回傳各章節實際加入的內容。"""
+    language, framework, storage = plan["language"], plan["framework"], plan["storage"]
+    stack = " + ".join(part for part in (language, framework) if part)
+    changes: dict = {}
+
+    changes["technologies"] = document.add_list_items("technologies", [
+        (language, f"- {stack} ({branch})"),
+        (storage, f"- {storage} ({branch})"),
+    ])
+
+    is_web = "web" in plan["project_type"]
+    if created:
+        structure = ["backend/", "frontend/", "tests/"] if is_web else ["src/", "tests/"]
+        changes["structure"] = document.add_fenced_lines("structure", structure)
+    elif is_web and "frontend/" not in document.render():
+        changes["structure"] = document.add_fenced_lines("structure", ["frontend/src/      # Web UI"])
+
+    if language:
+        changes["commands"] = document.add_fenced_lines("commands", [language_command(language)])
+        changes["style"] = document.add_list_items("style", [(language, f"- {language}：遵循標準慣例")])
+
+    if stack and document.prepend_recent_change(branch, f"- {branch}：新增 {stack}"):
+        changes["recent"] = [f"- {branch}：新增 {stack}"]
+    document.set_date(today or date.today().isoformat())
+    return {key: value for key, value in changes.items() if value}
+
+
+def write_atomic(path: Path, text: str | bytes):
+    """以同目錄中的唯一暫存檔寫入後取代，多個程序同時更新也不會互相覆寫暫存檔。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with (os.fdopen(fd, "wb") if isinstance(text, bytes) else os.fdopen(fd, "w", encoding="utf-8", newline="")) as f:
+            f.write(text)
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o7777)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def update_agent_contexts(repo_root: Path, branch: str, plan_path: Path, agents: list[str] | None = None, *, dry_run: bool = False) -> dict:
+    """依 plan.md 一次更新所有指定 (或已存在) 的助理上下文檔案。
+
+    agents 為空時更新所有已存在的上下文檔案；都不存在時建立 CLAUDE.md。
+    回傳 {"plan": 解析結果, "files": [{agent, path, created, changed, changes}]}。
+    """
+    plan = parse_plan(plan_path.read_text(encoding="utf-8"))
+    if not agents:
+        agents = [ai for ai, (rel, _) in AGENT_CONTEXT_FILES.items() if (repo_root / rel).is_file()] or ["claude"]
+
+    template_text = None
+    results = []
+    for ai in agents:
+        rel, _ = AGENT_CONTEXT_FILES[ai]
+        path = repo_root / rel
+        created = not path.is_file()
+        if created:
+            if template_text is None:
+                template_path = repo_root / "templates" / "agent-file-template.md"
+                if not template_path.is_file():
+                    raise FileNotFoundError(f"在 {template_path} 找不到範本")
+                template_text = template_path.read_text(encoding="utf-8")
+            original = ""
+            # 以單次替換填入 [PROJECT NAME] 與 [DATE]
+            document = AgentContextDocument(compile_template(template_text).render(default_variables(repo_root)))
+        else:
+            original = path.read_text(encoding="utf-8")
+            document = AgentContextDocument(original)
+        changes = apply_plan(document, plan, branch, created=created)
+        rendered = document.render()
+        changed = rendered != original
+        if changed and not dry_run:
+            write_atomic(path, rendered)
+        results.append({"agent": ai, "path": str(path), "created": created, "changed": changed, "changes": changes})
+    return {"plan": plan, "files": results}
@@ -0,0 +1,268 @@
+"""依清單批次初始化多個專案。"""
+
+import io
+import json
+import time
+import shutil
+import subprocess
+from pathlib import Path
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import typer
+import httpx
+
+from .cache import TemplateCache
+from .constants import AI_CHOICES
+from .extract import layer_template_archives
+from .git import bootstrap_git_repo
+from .github import (
+    download_error_message,
+    fetch_latest_release,
+    iter_template_downloads,
+    latest_release_url,
+)
+from .http_client import shared_client
+from .local_templates import iter_local_templates
+from .scaffold import RELEASE_CACHE_LABELS, download_detail
+from .tracker import StepTracker
+from .tracing import write_trace
+from .ui import console, track_progress
+from .upgrade import record_installed_templates
+
+
+def load_batch_manifest(manifest_path: Path) -> list[dict]:
+    """讀取批次初始化清單。
+
+    清單為專案陣列 (或包含 projects 陣列的物件)，每個項目包含 name、ai (字串、逗號分隔字串或陣列)、
+    no_git 與 path；path 省略時使用 name。相對路徑以清單檔案所在目錄為基準。
+    支援 JSON；安裝 PyYAML 時也支援 .yaml / .yml。
+    """
+    text = manifest_path.read_text(encoding="utf-8")
+    if manifest_path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("讀取 YAML 清單需要 PyYAML 套件 (pip install pyyaml)，或改用 JSON 清單")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("projects")
+    if not isinstance(data, list) or not data:
+        raise ValueError("清單必須是非空的專案陣列，或包含 projects 陣列的物件")
+
+    base_dir = manifest_path.resolve().parent
+    entries = []
+    seen_paths = set()
+    for number, item in enumerate(data, 1):
+        if not isinstance(item, dict) or not item.get("name"):
+            raise ValueError(f"第 {number} 個項目缺少 name")
+        ai = item.get("ai") or "copilot"
+        ais = [a.strip() for a in ai.split(",")] if isinstance(ai, str) else [str(a).strip() for a in ai]
+        ais = list(dict.fromkeys(a for a in ais if a))
+        invalid = [a for a in ais if a not in AI_CHOICES]
+        if invalid or not ais:
+            raise ValueError(f"項目 '{item['name']}' 的 AI 助理無效：{', '.join(invalid) or ai}")
+        project_path = Path(item.get("path") or item["name"]).expanduser()
+        if not project_path.is_absolute():
+            project_path = base_dir / project_path
+        project_path = project_path.resolve()
+        if project_path in seen_paths:
+            raise ValueError(f"項目 '{item['name']}' 的路徑重複：{project_path}")
+        seen_paths.add(project_path)
+        entries.append({
+            "name": str(item["name"]),
+            "ai": ais,
+            "no_git": bool(item.get("no_git", False)),
+            "path": project_path,
+        })
+    return entries
+
+
+def batch_project_result(entry: dict, status: str = "ok", error: str | None = None) -> dict:
+    """單一專案的報告項目。"""
+    return {
+        "name": entry["name"],
+        "path": str(entry["path"]),
+        "ai": entry["ai"],
+        "status": status,
+        "error": error,
+        "files": 0,
+        "git": "skipped",
+        "timings": {},
+    }
+
+
+def init_batch_project(entry: dict, payloads: dict[str, bytes], git_available: bool, release: str, on_start=None) -> dict:
+    """在工作執行緒中建立單一批次專案，回傳該專案的報告項目 (含各階段耗時)。
+
+    on_start 在工作執行緒實際開始處理此專案時呼叫 (不含在執行緒池中排隊的時間)。
+    """
+    if on_start:
+        on_start()
+    started = time.perf_counter()
+    project_path = entry["path"]
+    result = batch_project_result(entry)
+    created = False
+    try:
+        if project_path.exists():
+            raise FileExistsError(f"目錄已存在：{project_path}")
+        project_path.mkdir(parents=True)
+        created = True
+
+        phase = time.perf_counter()
+        # 各專案已在執行緒池中並行，專案內依序寫入即可
+        layered = layer_template_archives(project_path, [(ai, io.BytesIO(payloads[ai])) for ai in entry["ai"]], workers=1)
+        record_installed_templates(project_path, layered, release)
+        result["files"] = sum(stats["files"] for _, stats in layered)
+        result["timings"]["extract"] = round(time.perf_counter() - phase, 4)
+
+        if not entry["no_git"] and git_available:
+            try:
+                git_result = bootstrap_git_repo(project_path)
+            except subprocess.CalledProcessError as e:
+                result["git"] = "error"
+                raise RuntimeError(f"git 初始化失敗：{(e.stderr or b'').decode(errors='replace').strip() or e}")
+            result["timings"]["git"] = round(git_result["seconds"], 4)
+            result["git"] = f"initialized ({git_result['method']})"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+        # 與單一 init 相同：git 失敗時保留專案，其餘失敗時移除已建立的目錄
+        if created and result["git"] != "error" and project_path.exists():
+            shutil.rmtree(project_path)
+    result["timings"]["total"] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def run_batch_init(manifest_path: Path, *, jobs: int, report_path: Path | None, cache: TemplateCache | None, offline: bool, ignore_agent_tools: bool, loader=None, trace_path: Path | None = None, otlp_path: Path | None = None, tui: bool = True):
+    """依清單批次初始化多個專案。
+
+    發布版本只解析一次，每個助理的範本只下載一次並在記憶體中共用 (提供 loader 時改用本機範本)；
+    解壓縮與 git 初始化在執行緒池中進行，最後輸出彙總樹狀圖與 JSON 報告。
+    提供 trace_path / otlp_path 時匯出各步驟的時間 (見 tracing.write_trace)；tui 為 False 時逐行輸出進度。
+    """
+    try:
+        entries = load_batch_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]錯誤：[/red] 無法讀取批次清單：{e}")
+        raise typer.Exit(1)
+
+    ai_assistants = list(dict.fromkeys(ai for entry in entries for ai in entry["ai"]))
+    if not ignore_agent_tools:
+        missing = [ai for ai in ai_assistants if ai in ("claude", "gemini") and not shutil.which(ai)]
+        if missing:
+            console.print(f"[red]錯誤：[/red] 找不到 AI 工具：{', '.join(missing)}")
+            console.print("[yellow]提示：[/yellow] 使用 --ignore-agent-tools 跳過此檢查")
+            raise typer.Exit(1)
+    git_available = shutil.which("git") is not None
+
+    started = time.perf_counter()
+    tracker = StepTracker(f"批次初始化 {len(entries)} 個專案")
+    tracker.add("fetch", "取得最新發布版本")
+    for ai in ai_assistants:
+        tracker.add(f"agent-{ai}", f"{AI_CHOICES[ai]} 範本")
+    for number, entry in enumerate(entries):
+        tracker.add(f"project-{number}", entry["name"])
+
+    results: list[dict] = [None] * len(entries)
+    payloads: dict[str, bytes] = {}
+    release_tag = None
+    try:
+        with track_progress(tracker, tui=tui):
+
+            # 1. 解析發布版本一次，每個助理的範本只下載一次
+            download_errors: dict[str, str] = {}
+
+            def collect(results):
+                nonlocal release_tag
+                for ai in ai_assistants:
+                    tracker.start(f"agent-{ai}", "下載中")
+                for ai, result in results:
+                    if isinstance(result, Exception):
+                        download_errors[ai] = download_error_message(result)
+                        tracker.error(f"agent-{ai}", download_errors[ai])
+                        continue
+                    archive, meta = result
+                    with archive:
+                        payloads[ai] = archive.read()
+                    release_tag = release_tag or meta["release"]
+                    tracker.record(f"agent-{ai}", nbytes=meta["size"])
+                    if meta["cache_hit"]:
+                        tracker.complete(f"agent-{ai}", f"快取命中 {meta['filename']}")
+                    elif meta["release_cache"] == "local":
+                        tracker.complete(f"agent-{ai}", f"本機範本 {meta['filename']}")
+                    else:
+                        tracker.complete(f"agent-{ai}", f"已下載 {meta['filename']}{download_detail(meta)}")
+
+            if loader is not None:
+                tracker.complete("fetch", RELEASE_CACHE_LABELS["local"])
+                collect(iter_local_templates(ai_assistants, loader))
+            else:
+                tracker.start("fetch", "讀取本機快取" if offline else "正在聯繫 GitHub API")
+                client = shared_client()
+                release = None
+                if not offline:
+                    try:
+                        release = fetch_latest_release(latest_release_url(), cache=cache, client=client)
+                    except httpx.HTTPError as e:
+                        tracker.error("fetch", str(e))
+                        raise typer.Exit(1)
+                    release_tag = release[0]["tag_name"]
+                    tracker.complete("fetch", f"發布版本 {release_tag}，{RELEASE_CACHE_LABELS.get(release[1], '已取得')}")
+                else:
+                    tracker.complete("fetch", RELEASE_CACHE_LABELS["offline"])
+                collect(iter_template_downloads(ai_assistants, cache=cache, offline=offline, client=client, release=release))
+            fetch_seconds = time.perf_counter() - started
+
+            # 2. 在執行緒池中解壓縮並初始化 git
+            if not download_errors:
+                with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+                    futures = {}
+                    for number, entry in enumerate(entries):
+                        # 排隊中的專案維持待處理，由工作執行緒開始處理時才標記為執行中
+                        on_start = partial(tracker.start, f"project-{number}", "建立中")
+                        futures[pool.submit(init_batch_project, entry, payloads, git_available, release_tag, on_start)] = number
+                    for future in as_completed(futures):
+                        number = futures[future]
+                        result = results[number] = future.result()
+                        if result["status"] == "ok":
+                            tracker.record(f"project-{number}", files=result["files"])
+                            tracker.complete(f"project-{number}", f"{result['files']} 檔案，{result['timings']['total']:.2f}s")
+                        else:
+                            tracker.error(f"project-{number}", result["error"])
+            else:
+                # 任何範本下載失敗時不建立專案；報告中仍列出每個專案與原因
+                for number, entry in enumerate(entries):
+                    errors = [f"{ai}：{download_errors[ai]}" for ai in entry["ai"] if ai in download_errors]
+                    error = "；".join(errors) or f"其他助理的範本下載失敗：{', '.join(download_errors)}"
+                    results[number] = batch_project_result(entry, "skipped", error)
+                    tracker.skip(f"project-{number}", "範本下載失敗")
+    finally:
+        # 失敗時也匯出，方便找出卡住的步驟
+        if trace_path or otlp_path:
+            write_trace(tracker, trace_path, otlp_path, now=time.perf_counter())
+
+    if tui:
+        console.print(tracker.render())
+
+    failed = [r for r in results if r is None or r["status"] != "ok"]
+    report = {
+        "manifest": str(manifest_path.resolve()),
+        "release": release_tag,
+        "jobs": jobs,
+        "fetch_seconds": round(fetch_seconds, 4),
+        "total_seconds": round(time.perf_counter() - started, 4),
+        "succeeded": len(entries) - len(failed),
+        "failed": len(failed),
+        "projects": [r for r in results if r is not None],
+    }
+    if report_path:
+        report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        console.print(f"[cyan]批次報告：[/cyan] {report_path}")
+
+    if failed:
+        console.print(f"\n[red]{len(failed)} 個專案初始化失敗[/red]（共 {len(entries)} 個）")
+        raise typer.Exit(1)
+    console.print(f"\n[bold green]{len(entries)} 個專案準備就緒。[/bold green] [dim]({report['total_seconds']:.2f}s)[/dim]")
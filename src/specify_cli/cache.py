@@ -0,0 +1,267 @@
+"""以內容定址的本機範本快取。"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+
+import platformdirs
+
+# 範本快取預設值 (可透過環境變數覆寫)
+CACHE_MAX_BYTES = int(os.environ.get("SPECIFY_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+CACHE_MAX_AGE_DAYS = float(os.environ.get("SPECIFY_CACHE_MAX_AGE_DAYS", 30))
+
+
+def file_sha256(path: Path) -> str:
+    """計算檔案的 SHA-256 十六進位摘要。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _lock_owner_alive(lock_path: Path) -> bool:
+    """鎖定檔中記錄的程序是否仍在執行 (無法判斷時視為執行中)。"""
+    try:
+        pid = int(lock_path.read_text(encoding="utf-8").strip())
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError):
+        return True
+    if os.name == "nt":
+        # Windows 的 os.kill 會直接結束程序，只能依鎖定檔的時間判斷
+        try:
+            return time.time() - lock_path.stat().st_mtime < 86400
+        except OSError:
+            return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def get_cache_dir() -> Path:
+    """回傳範本快取目錄 (SPECIFY_CACHE_DIR 優先，否則使用 platformdirs 使用者快取目錄)。"""
+    override = os.environ.get("SPECIFY_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    return Path(platformdirs.user_cache_dir("specify-cli")) / "templates"
+
+
+def get_state_cache_dir(name: str) -> Path:
+    """回傳 lint、check 等檢查結果的快取目錄 (platformdirs 使用者快取目錄下的 <name>/)。
+
+    與範本快取分開存放：specify cache list / prune / clear 只管理範本，不會計入或刪除這些結果。
+    """
+    return Path(platformdirs.user_cache_dir("specify-cli")) / name
+
+
+class TemplateCache:
+    """以內容定址的本機範本快取。
+
+    每個項目以 (發布版本標籤, 資產名稱) 為鍵並記錄 SHA-256；
+    ZIP 本體依雜湊存放於 blobs/<sha256>.zip，相同內容只保存一份。
+    """
+    INDEX_NAME = "index.json"
+    # 多助理 / 批次模式會在多個執行緒中同時讀寫索引
+    _lock = threading.RLock()
+
+    def __init__(self, root: Path | None = None):
+        self.root = root or get_cache_dir()
+        self.blobs = self.root / "blobs"
+
+    @staticmethod
+    def entry_key(release: str, asset_name: str) -> str:
+        return f"{release}/{asset_name}"
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs / f"{sha256}.zip"
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.root / self.INDEX_NAME, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_index(self, index: dict):
+        # 先寫入暫存檔再原子性取代，避免平行的 init 讀到寫到一半的索引
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f"{self.INDEX_NAME}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.root / self.INDEX_NAME)
+
+    def _verified_blob(self, index: dict, key: str) -> Path | None:
+        """回傳項目的 blob 路徑；若遺失或雜湊不符則移除該項目並回傳 None。"""
+        entry = index[key]
+        path = self.blob_path(entry["sha256"])
+        if path.is_file() and file_sha256(path) == entry["sha256"]:
+            return path
+        index.pop(key)
+        path.unlink(missing_ok=True)
+        self._save_index(index)
+        return None
+
+    def entries(self) -> list[dict]:
+        """依最近使用時間排序回傳所有快取項目。"""
+        return sorted(self._load_index().values(), key=lambda e: e.get("last_used", 0), reverse=True)
+
+    def lookup(self, release: str, asset_name: str) -> tuple[Path, dict] | None:
+        """尋找指定發布版本與資產的快取；命中時回傳 (blob 路徑, 項目)。"""
+        with self._lock:
+            index = self._load_index()
+            key = self.entry_key(release, asset_name)
+            if key not in index:
+                return None
+            path = self._verified_blob(index, key)
+            if path is None:
+                return None
+            index[key]["last_used"] = time.time()
+            self._save_index(index)
+            return path, index[key]
+
+    def latest_for(self, ai_assistant: str) -> tuple[Path, dict] | None:
+        """離線模式使用：回傳指定 AI 助理最新存入的快取範本。"""
+        with self._lock:
+            pattern = f"spec-kit-template-{ai_assistant}"
+            index = self._load_index()
+            candidates = sorted(
+                (key for key, entry in index.items()
+                 if pattern in entry["asset"] and entry["asset"].endswith(".zip")),
+                key=lambda k: index[k].get("created", 0),
+                reverse=True,
+            )
+            for key in candidates:
+                path = self._verified_blob(index, key)
+                if path is not None:
+                    index[key]["last_used"] = time.time()
+                    self._save_index(index)
+                    return path, index[key]
+            return None
+
+    def staging_path(self) -> Path:
+        """回傳 blobs 目錄內的暫存下載路徑，完成後 store() 只需重新命名。"""
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        return self.blobs / f"download.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def partial_path(self, release: str, asset_name: str) -> Path | None:
+        """取得資產專屬的續傳檔 blobs/<鍵雜湊>.part；中斷的下載下次可從已收到的位元組繼續。
+
+        以 O_EXCL 鎖定檔確保同一資產同時只有一個下載者，被其他執行中的下載鎖定時回傳 None。
+        完成或失敗後需呼叫 release_partial 解除鎖定 (.part 本身保留供續傳)。
+        """
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        name = hashlib.sha256(self.entry_key(release, asset_name).encode()).hexdigest()[:16]
+        part_path = self.blobs / f"{name}.part"
+        lock_path = self.blobs / f"{name}.part.lock"
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if _lock_owner_alive(lock_path):
+                    return None
+                # 異常結束的下載留下的鎖定檔
+                lock_path.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(str(os.getpid()))
+            return part_path
+        return None
+
+    def release_partial(self, part_path: Path):
+        part_path.with_name(f"{part_path.name}.lock").unlink(missing_ok=True)
+
+    def store(self, src: Path, release: str, asset_name: str, *, sha256: str | None = None, asset_url: str = "") -> Path:
+        """將下載完成的檔案移入快取並回傳 blob 路徑。"""
+        sha256 = sha256 or file_sha256(src)
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        dest = self.blob_path(sha256)
+        now = time.time()
+        # 重新命名與寫入索引需在同一個鎖內，避免 prune 把尚未登錄的 blob 當成孤兒刪除
+        with self._lock:
+            if dest.exists():
+                src.unlink()
+            else:
+                tmp_dest = self.blobs / f"{sha256}.{os.getpid()}.{threading.get_ident()}.tmp"
+                shutil.move(str(src), str(tmp_dest))
+                os.replace(tmp_dest, dest)
+            index = self._load_index()
+            index[self.entry_key(release, asset_name)] = {
+                "release": release,
+                "asset": asset_name,
+                "sha256": sha256,
+                "size": dest.stat().st_size,
+                "asset_url": asset_url,
+                "created": now,
+                "last_used": now,
+            }
+            self._save_index(index)
+        return dest
+
+    def _release_path(self, api_url: str) -> Path:
+        return self.root / "releases" / f"{hashlib.sha256(api_url.encode()).hexdigest()[:16]}.json"
+
+    def load_release(self, api_url: str) -> dict | None:
+        """讀取已快取的發布版本中繼資料：{data, etag, last_modified, fetched_at}。"""
+        try:
+            with open(self._release_path(api_url), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return record if isinstance(record, dict) and "data" in record else None
+
+    def save_release(self, api_url: str, record: dict):
+        path = self._release_path(api_url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+
+    def prune(self, max_bytes: int = CACHE_MAX_BYTES, max_age_days: float = CACHE_MAX_AGE_DAYS) -> list[dict]:
+        """依存放時間與總大小淘汰項目 (最久未使用者優先)，回傳被移除的項目。"""
+        with self._lock:
+            index = self._load_index()
+            removed = []
+            cutoff = time.time() - max_age_days * 86400
+            for key in [k for k, e in index.items() if e.get("last_used", 0) < cutoff]:
+                removed.append(index.pop(key))
+
+            def total_size() -> int:
+                return sum({e["sha256"]: e["size"] for e in index.values()}.values())
+
+            by_age = sorted(index, key=lambda k: index[k].get("last_used", 0))
+            while by_age and total_size() > max_bytes:
+                removed.append(index.pop(by_age.pop(0)))
+
+            # 移除不再被任何項目引用的 blob，以及中斷下載留下超過一天的暫存檔與續傳檔
+            referenced = {e["sha256"] for e in index.values()}
+            if self.blobs.is_dir():
+                for blob in self.blobs.glob("*.zip"):
+                    if blob.stem not in referenced:
+                        blob.unlink(missing_ok=True)
+                for staging in [*self.blobs.glob("*.tmp"), *self.blobs.glob("*.part")]:
+                    try:
+                        if staging.stat().st_mtime < time.time() - 86400:
+                            staging.unlink()
+                    except OSError:
+                        pass
+            if removed:
+                self._save_index(index)
+            return removed
+
+    def clear(self) -> int:
+        """刪除整個快取目錄，回傳被移除的項目數。"""
+        count = len(self._load_index())
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        return count
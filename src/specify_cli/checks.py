@@ -0,0 +1,146 @@
+"""specify check 的環境檢查：同時執行網路與工具探測，並短暫快取結果。"""
+
+import os
+import json
+import time
+import hashlib
+import shutil
+import subprocess
+from pathlib import Path
+
+# 每項探測的逾時秒數 (網路請求與 --version 呼叫)
+CHECK_TIMEOUT_SECONDS = float(os.environ.get("SPECIFY_CHECK_TIMEOUT", 3))
+# 檢查結果在此秒數內直接重複使用，編輯器整合每次開啟工作區時呼叫也不會等待
+CHECK_TTL_SECONDS = float(os.environ.get("SPECIFY_CHECK_TTL", 300))
+CHECK_REPORT_VERSION = 1
+
+# (工具, 分類, 安裝提示)
+CHECK_TOOLS = (
+    ("git", "tool", "https://git-scm.com/downloads"),
+    ("claude", "ai", "https://docs.anthropic.com/en/docs/claude-code/setup"),
+    ("gemini", "ai", "https://github.com/google-gemini/gemini-cli"),
+)
+
+
+def probe_network(timeout: float = CHECK_TIMEOUT_SECONDS) -> dict:
+    """確認能否連上 GitHub API (或 SPECIFY_MIRROR_URL)；收到任何 HTTP 回應 (包含 403 速率限制) 都視為可連線。
+    透過共用的用戶端連線，代理伺服器與 CA 憑證設定與下載範本時相同。
+    """
+    import httpx
+
+    from .http_client import api_base_url, shared_client
+
+    started = time.perf_counter()
+    url = api_base_url()
+    result = {"name": "network", "kind": "network", "url": url}
+    try:
+        response = shared_client().get(url, timeout=timeout)
+        result.update(ok=True, status="ok", detail=f"HTTP {response.status_code}")
+    except httpx.TimeoutException:
+        result.update(ok=False, status="timeout", detail=f"{timeout:g} 秒內沒有回應")
+    except httpx.RequestError as e:
+        result.update(ok=False, status="error", detail=str(e) or type(e).__name__)
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def probe_tool(tool: str, kind: str = "tool", install_hint: str = "", timeout: float = CHECK_TIMEOUT_SECONDS) -> dict:
+    """以 PATH 查找工具並執行 <tool> --version；找得到但取不到版本時仍視為已安裝。"""
+    started = time.perf_counter()
+    path = shutil.which(tool)
+    result = {"name": tool, "kind": kind, "path": path, "version": None, "install_hint": install_hint}
+    if path is None:
+        result.update(ok=False, status="missing", detail="找不到指令")
+    else:
+        result.update(ok=True, status="ok", detail=None)
+        try:
+            completed = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=timeout)
+            output = (completed.stdout or completed.stderr).strip()
+            result["version"] = output.splitlines()[0] if output else None
+        except subprocess.TimeoutExpired:
+            result["detail"] = f"--version 在 {timeout:g} 秒內沒有回應"
+        except OSError as e:
+            result["detail"] = str(e)
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_checks(*, offline: bool = False, timeout: float = CHECK_TIMEOUT_SECONDS) -> dict:
+    """同時執行所有探測並回傳結構化報告；--offline 時完全不發出網路請求。"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .http_client import api_base_url
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(CHECK_TOOLS) + 1) as pool:
+        network = None if offline else pool.submit(probe_network, timeout)
+        tools = [pool.submit(probe_tool, tool, kind, hint, timeout) for tool, kind, hint in CHECK_TOOLS]
+        # 略過時也回報實際會檢查的 URL (設定 SPECIFY_MIRROR_URL 時為鏡像站)
+        checks = [network.result() if network else {
+            "name": "network", "kind": "network", "url": api_base_url(),
+            "ok": None, "status": "skipped", "detail": "--offline", "seconds": 0.0,
+        }]
+        checks += [future.result() for future in tools]
+
+    by_name = {c["name"]: c for c in checks}
+    return {
+        "version": CHECK_REPORT_VERSION,
+        "generated_at": time.time(),
+        "seconds": round(time.perf_counter() - started, 3),
+        "offline": offline,
+        "cached": False,
+        "summary": {
+            "network": by_name["network"]["ok"],
+            "git": by_name["git"]["ok"],
+            "ai_assistant": any(c["ok"] for c in checks if c["kind"] == "ai"),
+        },
+        "checks": checks,
+    }
+
+
+def _report_path(cache_dir: Path, offline: bool) -> Path:
+    # PATH (例如新安裝工具) 或鏡像站改變時自動使用新的快取項目
+    mirror = os.environ.get("SPECIFY_MIRROR_URL", "").strip().rstrip("/")
+    key = hashlib.sha256(f"{offline}\0{os.environ.get('PATH', '')}\0{mirror}".encode()).hexdigest()[:16]
+    return cache_dir / f"{key}.json"
+
+
+def load_cached_report(cache_dir: Path, *, offline: bool, ttl: float = CHECK_TTL_SECONDS) -> dict | None:
+    """回傳 ttl 秒內產生的檢查報告，沒有或已過期時回傳 None。"""
+    if ttl <= 0:
+        return None
+    try:
+        with open(_report_path(cache_dir, offline), "r", encoding="utf-8") as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(report, dict) or report.get("version") != CHECK_REPORT_VERSION:
+        return None
+    if time.time() - report.get("generated_at", 0) > ttl:
+        return None
+    report["cached"] = True
+    return report
+
+
+def save_report(cache_dir: Path, report: dict):
+    path = _report_path(cache_dir, report["offline"])
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # 無法寫入快取不影響檢查本身
+
+
+def get_check_report(cache_dir: Path | None, *, offline: bool = False, timeout: float = CHECK_TIMEOUT_SECONDS, ttl: float = CHECK_TTL_SECONDS) -> dict:
+    """優先使用快取的報告，否則執行檢查並寫回快取 (cache_dir 為 None 時不使用快取)。"""
+    if cache_dir is not None:
+        report = load_cached_report(cache_dir, offline=offline, ttl=ttl)
+        if report is not None:
+            return report
+    report = run_checks(offline=offline, timeout=timeout)
+    if cache_dir is not None:
+        save_report(cache_dir, report)
+    return report
@@ -0,0 +1,1099 @@
+"""specify 指令列介面。
+
+指令函式只在需要時才載入 httpx、zipfile、rich.live 等較重的模組，
+讓 specify --help 與 specify check 的冷啟動保持輕量。
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+import typer
+from rich.align import Align
+from typer.core import TyperGroup
+
+from .cache import CACHE_MAX_AGE_DAYS, CACHE_MAX_BYTES, TemplateCache, get_state_cache_dir
+from .checks import CHECK_TIMEOUT_SECONDS
+from .constants import AI_CHOICES
+from .ui import console, show_banner
+
+
+class BannerGroup(TyperGroup):
+    """在說明前顯示橫幅的自訂群組。"""
+    
+    def format_help(self, ctx, formatter):
+        # 在說明前顯示橫幅
+        show_banner()
+        super().format_help(ctx, formatter)
+
+
+app = typer.Typer(
+    name="specify",
+    help="Specify 規格驅動開發專案的設定工具",
+    add_completion=False,
+    invoke_without_command=True,
+    cls=BannerGroup,
+)
+
+
+@app.callback()
+def callback(ctx: typer.Context):
+    """未提供子指令時顯示橫幅。"""
+    # 只有在沒有子指令且沒有說明旗標時顯示橫幅
+    # (說明由 BannerGroup 處理)
+    if ctx.invoked_subcommand is None and "--help" not in sys.argv and "-h" not in sys.argv:
+        show_banner()
+        console.print(Align.center("[dim]執行 'specify --help' 取得使用資訊[/dim]"))
+        console.print()
+
+
+def run_command(cmd: list[str], check_return: bool = True, capture: bool = False, shell: bool = False) -> Optional[str]:
+    """執行 shell 指令並選擇性擷取輸出。"""
+    try:
+        if capture:
+            result = subprocess.run(cmd, check=check_return, capture_output=True, text=True, shell=shell)
+            return result.stdout.strip()
+        else:
+            subprocess.run(cmd, check=check_return, shell=shell)
+            return None
+    except subprocess.CalledProcessError as e:
+        if check_return:
+            console.print(f"[red]執行指令時發生錯誤：[/red] {' '.join(cmd)}")
+            console.print(f"[red]結束代碼：[/red] {e.returncode}")
+            if hasattr(e, 'stderr') and e.stderr:
+                console.print(f"[red]錯誤輸出：[/red] {e.stderr}")
+            raise
+        return None
+
+
+def check_tool(tool: str, install_hint: str) -> bool:
+    """檢查工具是否已安裝。"""
+    if shutil.which(tool):
+        return True
+    else:
+        console.print(f"[yellow]⚠️  找不到 {tool}[/yellow]")
+        console.print(f"   安裝方式：[cyan]{install_hint}[/cyan]")
+        return False
+
+
+@app.command()
+def init(
+    project_name: str = typer.Argument(None, help="新專案目錄的名稱 (使用 --here 時為選用)"),
+    ai_assistant: str = typer.Option(None, "--ai", help="要使用的 AI 助理：claude、gemini 或 copilot；以逗號分隔可同時設定多個"),
+    ignore_agent_tools: bool = typer.Option(False, "--ignore-agent-tools", help="跳過 AI 代理工具 (如 Claude Code) 的檢查"),
+    no_git: bool = typer.Option(False, "--no-git", help="跳過 git 儲存庫初始化"),
+    here: bool = typer.Option(False, "--here", help="在目前目錄初始化專案，而非建立新目錄"),
+    non_interactive: bool = typer.Option(False, "--non-interactive", "-n", help="非互動式模式，使用預設選項"),
+    offline: bool = typer.Option(False, "--offline", help="不連線，只使用本機快取中的範本"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="不讀取也不寫入本機範本快取"),
+    batch: Path = typer.Option(None, "--batch", help="依清單檔案 (JSON/YAML) 批次初始化多個專案", dir_okay=False),
+    jobs: int = typer.Option(min(8, os.cpu_count() or 1), "--jobs", "-j", help="批次模式的並行工作數", min=1),
+    report: Path = typer.Option(None, "--report", help="批次模式的 JSON 報告輸出路徑", dir_okay=False),
+    template_dir: Path = typer.Option(None, "--template-dir", help="由本機範本原始碼 (含 templates/、memory/、scripts/) 建置範本，不連線", exists=True, file_okay=False),
+    template_zip: Path = typer.Option(None, "--template-zip", help="使用預先建置的範本 ZIP，不連線 (僅限單一 AI 助理)", exists=True, dir_okay=False),
+    trace: Path = typer.Option(None, "--trace", envvar="SPECIFY_TRACE", help="將各步驟的時間寫入 Chrome 追蹤檔 (並在旁邊寫入 .summary.json 摘要)", dir_okay=False),
+    trace_otlp: Path = typer.Option(None, "--trace-otlp", envvar="SPECIFY_TRACE_OTLP", help="將各步驟的時間以 OTLP/JSON (OpenTelemetry) 格式附加到檔案", dir_okay=False),
+    no_tui: bool = typer.Option(False, "--no-tui", envvar="SPECIFY_NO_TUI", help="不顯示即時樹狀圖，改為逐行輸出進度 (輸出不是終端機時自動使用)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="搭配 --here：只列出會新增與覆寫的檔案，不寫入"),
+):
+    """
+    從最新範本初始化新的 Specify 專案。
+    
+    此指令將會：
+    1. 檢查必要工具是否已安裝（git 為選用）
+    2. 讓你選擇 AI 助理（Claude Code、Gemini CLI 或 GitHub Copilot）
+    3. 從 GitHub 下載適當的範本
+    4. 將範本解壓縮到新專案目錄或目前目錄
+    5. 初始化新的 git 儲存庫（如果未使用 --no-git 且無現有儲存庫）
+    6. 選擇性設定 AI 助理指令
+    
+    範例：
+        specify init my-project
+        specify init my-project --ai claude
+        specify init my-project --ai gemini
+        specify init my-project --ai copilot --no-git
+        specify init --ignore-agent-tools my-project
+        specify init --here --ai claude
+        specify init --here
+        specify init --here --ai claude --dry-run
+        specify init my-project --ai claude --offline
+        specify init my-project --ai claude,gemini,copilot
+        specify init --batch projects.json --jobs 8 --report report.json
+        specify init my-project --ai claude --template-dir ./spec-kit
+        specify init my-project --ai claude --template-zip spec-kit-template-claude-v0.0.9.zip
+        specify init my-project --ai claude --trace init-trace.json
+    """
+    from rich.panel import Panel
+
+    from .batch import run_batch_init
+    from .git import bootstrap_git_repo, is_git_repo
+    from .local_templates import is_template_source, local_template_loader
+    from .scaffold import download_and_extract_templates, preview_template_merge
+    from .tracing import write_trace
+    from .tracker import StepTracker
+    from .ui import select_with_arrows, track_progress, use_tui
+
+    # 首先顯示橫幅
+    show_banner()
+    
+    if offline and no_cache:
+        console.print("[red]錯誤：[/red] --offline 需要使用快取，不能與 --no-cache 同時使用")
+        raise typer.Exit(1)
+
+    # 本機範本來源：取代從 GitHub 下載
+    loader = None
+    if template_dir and template_zip:
+        console.print("[red]錯誤：[/red] --template-dir 與 --template-zip 不能同時使用")
+        raise typer.Exit(1)
+    if template_dir:
+        if not is_template_source(template_dir):
+            console.print(f"[red]錯誤：[/red] {template_dir} 不是範本原始碼目錄 (找不到 templates/commands)")
+            raise typer.Exit(1)
+        loader = local_template_loader(template_dir=template_dir)
+    elif template_zip:
+        loader = local_template_loader(template_zip=template_zip)
+
+    # 批次模式：專案資訊全部來自清單
+    if batch:
+        if here or project_name:
+            console.print("[red]錯誤：[/red] --batch 不能與專案名稱或 --here 同時使用")
+            raise typer.Exit(1)
+        run_batch_init(
+            batch,
+            jobs=jobs,
+            report_path=report,
+            cache=None if no_cache else TemplateCache(),
+            offline=offline,
+            ignore_agent_tools=ignore_agent_tools,
+            loader=loader,
+            trace_path=trace,
+            otlp_path=trace_otlp,
+            tui=use_tui(no_tui),
+        )
+        return
+
+    # 驗證參數
+    if here and project_name:
+        console.print("[red]錯誤：[/red] 不能同時指定專案名稱和 --here 旗標")
+        raise typer.Exit(1)
+    
+    if not here and not project_name:
+        console.print("[red]錯誤：[/red] 必須指定專案名稱或使用 --here 旗標")
+        raise typer.Exit(1)
+
+    if dry_run and not here:
+        console.print("[red]錯誤：[/red] --dry-run 只能搭配 --here 使用 (新目錄中的檔案都是新增)")
+        raise typer.Exit(1)
+    
+    # 決定專案目錄
+    if here:
+        project_name = Path.cwd().name
+        project_path = Path.cwd()
+        
+        # 檢查目前目錄是否有任何檔案
+        existing_items = list(project_path.iterdir())
+        if existing_items and not dry_run:
+            console.print(f"[yellow]警告：[/yellow] 目前目錄不是空的（{len(existing_items)} 個項目）")
+            console.print("[yellow]範本檔案將與現有內容合併，可能會覆寫現有檔案[/yellow]")
+            
+            # 詢問確認
+            response = typer.confirm("你想要繼續嗎？")
+            if not response:
+                console.print("[yellow]操作已取消[/yellow]")
+                raise typer.Exit(0)
+    else:
+        project_path = Path(project_name).resolve()
+        # 檢查專案目錄是否已存在
+        if project_path.exists():
+            console.print(f"[red]錯誤：[/red] 目錄 '{project_name}' 已存在")
+            raise typer.Exit(1)
+    
+    console.print(Panel.fit(
+        "[bold cyan]Specify 專案設定[/bold cyan]\n"
+        f"{'在目前目錄初始化：' if here else '建立新專案：'} [green]{project_path.name}[/green]"
+        + (f"\n[dim]Path: {project_path}[/dim]" if here else ""),
+        border_style="cyan"
+    ))
+    
+    # 只有在可能需要時才檢查 git (非 --no-git)
+    git_available = True
+    if not no_git:
+        git_available = check_tool("git", "https://git-scm.com/downloads")
+        if not git_available:
+            console.print("[yellow]找不到 Git - 將跳過儲存庫初始化[/yellow]")
+
+    # AI 助理選擇 (--ai 可用逗號分隔多個助理)
+    if ai_assistant:
+        selected_ais = list(dict.fromkeys(a.strip() for a in ai_assistant.split(",") if a.strip()))
+        invalid = [a for a in selected_ais if a not in AI_CHOICES]
+        if invalid or not selected_ais:
+            console.print(f"[red]錯誤：[/red] 無效的 AI 助理 '{', '.join(invalid) or ai_assistant}'。請從以下選擇：{', '.join(AI_CHOICES.keys())}")
+            raise typer.Exit(1)
+        if template_zip and len(selected_ais) > 1:
+            console.print("[red]錯誤：[/red] --template-zip 只能搭配單一 AI 助理；多個助理請使用 --template-dir")
+            raise typer.Exit(1)
+    elif non_interactive:
+        # 非互動式模式使用預設選項
+        selected_ais = ["copilot"]
+        console.print(f"[yellow]非互動式模式：使用預設 AI 助理 - {AI_CHOICES['copilot']}[/yellow]")
+    else:
+        # 使用方向鍵選擇介面
+        selected_ais = [select_with_arrows(
+            AI_CHOICES, 
+            "選擇你的 AI 助理：", 
+            "copilot"
+        )]
+    
+    # 除非忽略，否則檢查代理工具
+    if not ignore_agent_tools:
+        agent_tool_missing = False
+        if "claude" in selected_ais:
+            if not check_tool("claude", "安裝方式：https://docs.anthropic.com/en/docs/claude-code/setup"):
+                console.print("[red]錯誤：[/red] Claude Code 專案需要 Claude CLI")
+                agent_tool_missing = True
+        if "gemini" in selected_ais:
+            if not check_tool("gemini", "安裝方式：https://github.com/google-gemini/gemini-cli"):
+                console.print("[red]錯誤：[/red] Gemini 專案需要 Gemini CLI")
+                agent_tool_missing = True
+        # GitHub Copilot 檢查不需要，因為通常在支援的 IDE 中可用
+        
+        if agent_tool_missing:
+            console.print("\n[red]缺少必要的 AI 工具！[/red]")
+            console.print("[yellow]提示：[/yellow] 使用 --ignore-agent-tools 跳過此檢查")
+            raise typer.Exit(1)
+    
+    if dry_run:
+        import httpx
+
+        try:
+            layered = preview_template_merge(project_path, selected_ais, cache=None if no_cache else TemplateCache(), offline=offline, loader=loader)
+        except (RuntimeError, httpx.HTTPError) as e:
+            console.print(f"[red]取得範本時發生錯誤：[/red] {e}")
+            raise typer.Exit(1)
+        _show_merge_preview(layered)
+        return
+
+    # 下載並設定專案
+    # 新的樹狀進度 (無表情符號)；包含較早的子步驟
+    tracker = StepTracker("初始化 Specify 專案")
+    # 允許抑制舊版標題的旗標
+    # sys._specify_tracker_active = True  # 註解掉，因為這不是標準屬性
+    # 在即時渲染前記錄為已完成的預先步驟
+    tracker.add("precheck", "檢查必要工具")
+    tracker.complete("precheck", "ok")
+    tracker.add("ai-select", "選擇 AI 助理")
+    tracker.complete("ai-select", ", ".join(selected_ais))
+    if len(selected_ais) == 1:
+        template_steps = [
+            ("download", "下載範本"),
+            ("extract", "解壓縮範本"),
+            ("zip-list", "檔案內容"),
+            ("extracted-summary", "解壓縮摘要"),
+        ]
+    else:
+        # 多助理模式：每個助理一列，顯示下載與疊加進度
+        template_steps = [(f"agent-{ai}", f"{AI_CHOICES[ai]} 範本") for ai in selected_ais]
+        template_steps.append(("extract", "解壓縮範本"))
+    for key, label in [
+        ("fetch", "取得最新發布版本"),
+        *template_steps,
+        ("cleanup", "清理"),
+        ("git", "初始化 git 儲存庫"),
+        ("final", "完成")
+    ]:
+        tracker.add(key, label)
+
+    # 使用 transient 讓即時樹狀圖被最終靜態渲染取代 (避免重複輸出)
+    tui = use_tui(no_tui)
+    with track_progress(tracker, tui=tui):
+        try:
+            download_and_extract_templates(
+                project_path,
+                selected_ais,
+                here,
+                verbose=False,
+                tracker=tracker,
+                cache=None if no_cache else TemplateCache(),
+                offline=offline,
+                loader=loader,
+            )
+
+            # Git 步驟
+            if not no_git:
+                tracker.start("git")
+                if is_git_repo(project_path):
+                    tracker.complete("git", "偵測到現有儲存庫")
+                elif git_available:
+                    try:
+                        git_result = bootstrap_git_repo(project_path)
+                        tracker.record("git", files=git_result["files"])
+                        tracker.complete("git", f"已初始化 ({git_result['method']}，{git_result['seconds'] * 1000:.0f} ms)")
+                    except subprocess.CalledProcessError:
+                        tracker.error("git", "初始化失敗")
+                else:
+                    tracker.skip("git", "git 不可用")
+            else:
+                tracker.skip("git", "--no-git 旗標")
+
+            tracker.complete("final", "專案準備就緒")
+        except Exception as e:
+            tracker.error("final", str(e))
+            if not here and project_path.exists():
+                shutil.rmtree(project_path)
+            raise typer.Exit(1)
+        finally:
+            # 失敗時也匯出追蹤，方便找出卡住的步驟
+            if trace or trace_otlp:
+                write_trace(tracker, trace, trace_otlp, now=time.perf_counter())
+
+    # 最終靜態樹狀圖 (確保在 Live 上下文結束後可見完成狀態；逐行模式已逐步輸出)
+    if tui:
+        console.print(tracker.render())
+    console.print("\n[bold green]專案準備就緒。[/bold green]")
+    
+    # 框起來的「下一步」區塊
+    steps_lines = []
+    if not here:
+        steps_lines.append(f"1. [bold green]cd {project_name}[/bold green]")
+        step_num = 2
+    else:
+        steps_lines.append("1. 你已經在專案目錄中了！")
+        step_num = 2
+
+    for selected_ai in selected_ais:
+        if selected_ai == "claude":
+            steps_lines.append(f"{step_num}. 在 Visual Studio Code 中開啟並開始使用 Claude Code 的 / 指令")
+            steps_lines.append("   - 在任何檔案中輸入 / 查看可用指令")
+            steps_lines.append("   - 使用 /specify 建立規格")
+            steps_lines.append("   - 使用 /plan 建立實作計畫")
+            steps_lines.append("   - 使用 /tasks 產生任務")
+        elif selected_ai == "gemini":
+            steps_lines.append(f"{step_num}. 使用 Gemini CLI 的 / 指令")
+            steps_lines.append("   - 執行 gemini /specify 建立規格")
+            steps_lines.append("   - 執行 gemini /plan 建立實作計畫")
+            steps_lines.append("   - 查看 GEMINI.md 了解所有可用指令")
+        elif selected_ai == "copilot":
+            steps_lines.append(f"{step_num}. 在 Visual Studio Code 中開啟並使用 GitHub Copilot 的 [bold cyan]/specify[/]、[bold cyan]/plan[/]、[bold cyan]/tasks[/] 指令")
+        step_num += 1
+
+    steps_lines.append(f"{step_num}. 更新 [bold magenta]CONSTITUTION.md[/bold magenta]，加入你專案的不可妥協原則")
+
+    steps_panel = Panel("\n".join(steps_lines), title="下一步", border_style="cyan", padding=(1,2))
+    console.print()  # 空行
+    console.print(steps_panel)
+    
+    # 已依使用者要求移除告別訊息
+
+
+@app.command()
+def check(
+    json_output: bool = typer.Option(False, "--json", help="以 JSON 輸出結構化報告 (供編輯器整合等程式使用)"),
+    offline: bool = typer.Option(False, "--offline", help="略過網路連線檢查"),
+    timeout: float = typer.Option(CHECK_TIMEOUT_SECONDS, "--timeout", help="每項檢查的逾時秒數", min=0.1),
+    refresh: bool = typer.Option(False, "--refresh", help="忽略快取的檢查結果，重新檢查"),
+):
+    """檢查所有必要工具是否已安裝。"""
+    from .checks import CHECK_TTL_SECONDS, get_check_report
+
+    report = get_check_report(get_state_cache_dir("checks"), offline=offline, timeout=timeout, ttl=0 if refresh else CHECK_TTL_SECONDS)
+
+    if json_output:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    show_banner()
+    console.print("[bold]正在檢查 Specify 需求...[/bold]")
+    if report["cached"]:
+        age = time.time() - report["generated_at"]
+        console.print(f"[dim]使用 {age:.0f} 秒前的檢查結果 (--refresh 重新檢查)[/dim]")
+    console.print()
+    checks = {c["name"]: c for c in report["checks"]}
+
+    network = checks["network"]
+    if network["status"] == "skipped":
+        console.print("[dim]已略過網路連線檢查 (--offline)[/dim]")
+    elif network["ok"]:
+        console.print("[green]✓[/green] 網路連線可用")
+    else:
+        console.print(f"[red]✗[/red] 無網路連線 - 下載範本時需要網路 [dim]({network['detail']})[/dim]")
+        console.print("[yellow]請檢查您的網路連線[/yellow]")
+
+    def show_tool(result: dict):
+        if result["ok"]:
+            version = result["version"] or result["detail"] or ""
+            console.print(f"[green]✓[/green] {result['name']} [dim]{version}[/dim]")
+        else:
+            console.print(f"[yellow]⚠️  找不到 {result['name']}[/yellow]")
+            console.print(f"   安裝方式：[cyan]{result['install_hint']}[/cyan]")
+
+    console.print("\n[cyan]選用工具：[/cyan]")
+    for result in report["checks"]:
+        if result["kind"] == "tool":
+            show_tool(result)
+
+    console.print("\n[cyan]選用 AI 工具：[/cyan]")
+    for result in report["checks"]:
+        if result["kind"] == "ai":
+            show_tool(result)
+
+    console.print("\n[green]✓ Specify CLI 準備就緒！[/green]")
+    if not report["summary"]["git"]:
+        console.print("[yellow]建議安裝 git 以進行儲存庫管理[/yellow]")
+    if not report["summary"]["ai_assistant"]:
+        console.print("[yellow]建議安裝 AI 助理以獲得最佳體驗[/yellow]")
+
+
+@app.command()
+def upgrade(
+    project_dir: Path = typer.Argument(Path("."), help="專案目錄", exists=True, file_okay=False),
+    ai_assistant: str = typer.Option(None, "--ai", help="只更新指定的 AI 助理 (逗號分隔；預設為所有已安裝的助理)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="只列出會變更的檔案，不寫入"),
+    force: bool = typer.Option(False, "--force", help="即使已是相同發布版本也重新比較所有檔案"),
+    offline: bool = typer.Option(False, "--offline", help="不連線，只使用本機快取中的範本"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="不讀取也不寫入本機範本快取"),
+    template_dir: Path = typer.Option(None, "--template-dir", help="由本機範本原始碼建置新版本範本，不連線", exists=True, file_okay=False),
+    template_zip: Path = typer.Option(None, "--template-zip", help="使用預先建置的範本 ZIP，不連線 (僅限單一 AI 助理)", exists=True, dir_okay=False),
+    json_output: bool = typer.Option(False, "--json", help="以 JSON 輸出更新結果"),
+):
+    """將專案範本更新到最新發布版本，只改寫上游有變更且本機未修改的檔案。
+
+    以 init 時記錄的 .specify/manifest-<助理>.json 為基準做三方比較；
+    本機也修改過的檔案列為衝突並保留本機版本，不會被覆寫。
+
+    範例：
+        specify upgrade
+        specify upgrade --dry-run
+        specify upgrade my-project --ai claude --template-dir ./spec-kit
+    """
+    import zipfile
+
+    import httpx
+    from rich.table import Table
+
+    from .github import download_error_message, fetch_latest_release, iter_template_downloads, latest_release_url
+    from .http_client import shared_client
+    from .local_templates import is_template_source, iter_local_templates, local_template_loader
+    from .upgrade import ACTION_LABELS, LOCAL_LABELS, UPSTREAM_LABELS, installed_agents, load_installed_manifest, upgrade_agent
+
+    def fail(message: str):
+        if json_output:
+            print(json.dumps({"error": message}, ensure_ascii=False))
+        else:
+            console.print(f"[red]錯誤：[/red]{message}", highlight=False)
+        raise typer.Exit(1)
+
+    project_dir = project_dir.resolve()
+    if offline and no_cache:
+        fail("--offline 需要使用快取，不能與 --no-cache 同時使用")
+    if template_dir and template_zip:
+        fail("--template-dir 與 --template-zip 不能同時使用")
+    agents = installed_agents(project_dir)
+    if not agents:
+        fail(f"{project_dir} 沒有範本安裝紀錄 (.specify/manifest-<助理>.json)；請確認專案是以支援差異更新的 specify init 建立")
+    if ai_assistant:
+        selected = [a.strip() for a in ai_assistant.split(",") if a.strip()]
+        missing = [a for a in selected if a not in agents]
+        if missing:
+            fail(f"此專案沒有安裝 {', '.join(missing)} 的範本 (已安裝：{', '.join(agents)})")
+        agents = [a for a in agents if a in selected]
+    if template_zip and len(agents) > 1:
+        fail("--template-zip 只能搭配單一 AI 助理；請以 --ai 指定")
+
+    loader = None
+    if template_dir:
+        if not is_template_source(template_dir):
+            fail(f"{template_dir} 不是範本原始碼目錄 (找不到 templates/commands)")
+        loader = local_template_loader(template_dir=template_dir)
+    elif template_zip:
+        loader = local_template_loader(template_zip=template_zip)
+
+    cache = None if no_cache else TemplateCache()
+    results: dict[str, dict] = {}
+    failures: dict[str, str] = {}
+
+    def apply(downloads):
+        for ai, result in downloads:
+            if isinstance(result, Exception):
+                failures[ai] = download_error_message(result)
+                continue
+            archive, meta = result
+            try:
+                results[ai] = upgrade_agent(project_dir, ai, archive, meta, dry_run=dry_run)
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                failures[ai] = str(e)
+            finally:
+                archive.close()
+
+    if loader is not None:
+        apply(iter_local_templates(agents, loader))
+    else:
+        client = shared_client()
+        release = None
+        pending = agents
+        if not offline:
+            try:
+                release = fetch_latest_release(latest_release_url(), cache=cache, client=client)
+            except httpx.HTTPError as e:
+                fail(f"取得發布版本資訊時發生錯誤：{e}")
+            tag = release[0]["tag_name"]
+            # 已安裝相同發布版本的助理不需下載
+            if not force:
+                pending = [ai for ai in agents if load_installed_manifest(project_dir, ai).get("release") != tag]
+            for ai in agents:
+                if ai not in pending:
+                    results[ai] = {"agent": ai, "from": tag, "to": tag, "files": None, "changes": [], "counts": {}}
+        apply(iter_template_downloads(pending, cache=cache, offline=offline, client=client, release=release))
+
+    ordered = [results[ai] for ai in agents if ai in results]
+    if json_output:
+        print(json.dumps({"project": str(project_dir), "dry_run": dry_run, "agents": ordered, "failures": failures}, indent=2, ensure_ascii=False))
+        if failures:
+            raise typer.Exit(1)
+        return
+
+    for result in ordered:
+        title = f"{AI_CHOICES[result['agent']]}：{result['from']} → {result['to']}"
+        changes = [c for c in result["changes"] if c["action"] != "current"]
+        if not changes:
+            note = "已是最新版本" if result["files"] is None else "沒有需要更新的檔案"
+            console.print(f"[green]✓[/green] {title} [dim]({note})[/dim]", highlight=False)
+            continue
+        table = Table(title=title + (" (預覽，未寫入)" if dry_run else ""), title_justify="left")
+        table.add_column("檔案")
+        table.add_column("上游", style="cyan")
+        table.add_column("本機")
+        table.add_column("處理")
+        for change in changes:
+            conflict = change["action"] == "conflict"
+            table.add_row(
+                change["path"],
+                UPSTREAM_LABELS[change["upstream"]],
+                LOCAL_LABELS[change["local"]],
+                f"[yellow]{ACTION_LABELS['conflict']}[/yellow]" if conflict else ACTION_LABELS[change["action"]],
+            )
+        console.print(table)
+        counts = result["counts"]
+        console.print(
+            f"  新增 {counts['added']}、更新 {counts['updated']}、刪除 {counts['removed']}、"
+            f"已一致 {counts['current']}、衝突 {counts['conflict']} (共 {result['files']} 個範本檔案)",
+            highlight=False,
+        )
+    for ai, reason in failures.items():
+        console.print(f"[red]✗[/red] {AI_CHOICES[ai]}：{reason}", highlight=False)
+    if any(result["counts"].get("conflict") for result in ordered):
+        console.print("[yellow]衝突的檔案已保留本機版本；合併上游變更 (或刪除檔案) 後再次執行 specify upgrade[/yellow]")
+    if failures:
+        raise typer.Exit(1)
+
+
+cache_app = typer.Typer(name="cache", help="管理本機範本快取", add_completion=False)
+app.add_typer(cache_app, name="cache")
+
+
+@cache_app.command("list")
+def cache_list():
+    """列出快取中的範本。"""
+    from rich.table import Table
+
+    cache = TemplateCache()
+    entries = cache.entries()
+    if not entries:
+        console.print(f"[yellow]快取是空的[/yellow] [dim]({cache.root})[/dim]")
+        return
+
+    table = Table(title=str(cache.root), title_style="dim")
+    table.add_column("發布版本", style="cyan")
+    table.add_column("資產")
+    table.add_column("大小", justify="right")
+    table.add_column("SHA-256", style="bright_black")
+    table.add_column("最後使用", style="bright_black")
+    for entry in entries:
+        table.add_row(
+            entry["release"],
+            entry["asset"],
+            f"{entry['size']:,}",
+            entry["sha256"][:12],
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("last_used", 0))),
+        )
+    console.print(table)
+
+
+@cache_app.command("prune")
+def cache_prune(
+    max_bytes: int = typer.Option(CACHE_MAX_BYTES, "--max-bytes", help="快取總大小上限 (bytes)"),
+    max_age_days: float = typer.Option(CACHE_MAX_AGE_DAYS, "--max-age-days", help="超過此天數未使用的項目將被移除"),
+):
+    """依大小與存放時間淘汰快取項目。"""
+    removed = TemplateCache().prune(max_bytes=max_bytes, max_age_days=max_age_days)
+    for entry in removed:
+        console.print(f"[yellow]已移除：[/yellow] {entry['release']}/{entry['asset']}")
+    console.print(f"[green]✓[/green] 已淘汰 {len(removed)} 個快取項目")
+
+
+@cache_app.command("clear")
+def cache_clear():
+    """清空整個範本快取。"""
+    count = TemplateCache().clear()
+    console.print(f"[green]✓[/green] 已清除 {count} 個快取項目")
+
+
+feature_app = typer.Typer(
+    name="feature",
+    help="管理功能分支與規格目錄 (scripts/*.sh 的單一程序版本)",
+    add_completion=False,
+)
+app.add_typer(feature_app, name="feature")
+
+
+def _show_merge_preview(layered: list[tuple[str, dict]]):
+    """顯示 init --here --dry-run 的結果：會新增與覆寫的檔案，以及內容相同而略過的檔案數。"""
+    from rich.table import Table
+
+    changes = [(rel, "overwritten") for _, stats in layered for rel in stats["overwritten"]]
+    changes += [(rel, "added") for _, stats in layered for rel in stats["added"]]
+    counts = {state: sum(len(stats[state]) for _, stats in layered) for state in ("added", "overwritten", "unchanged")}
+    if changes:
+        table = Table(title="合併到目前目錄 (預覽，未寫入)", title_justify="left")
+        table.add_column("檔案")
+        table.add_column("處理")
+        for rel, state in sorted(changes, key=lambda change: (change[1] != "overwritten", change[0])):
+            table.add_row(rel, "[yellow]覆寫[/yellow]" if state == "overwritten" else "新增")
+        console.print(table)
+    console.print(
+        f"  新增 {counts['added']}、覆寫 {counts['overwritten']}、內容相同 {counts['unchanged']}",
+        highlight=False,
+    )
+
+
+def _feature_output(result: dict, json_output: bool, text_keys: list[str] | None = None):
+    """以原本腳本的格式輸出：--json 為單行 JSON，否則為「鍵: 值」(供 LLM 使用)。
+
+    使用純文字輸出 (不經 Rich)，避免長路徑被折行。
+    """
+    if json_output:
+        print(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
+        return
+    for key in text_keys or result:
+        print(f"{key}: {result[key]}")
+
+
+def _feature_error(error: Exception, json_output: bool):
+    if json_output:
+        print(json.dumps({"error": str(error)}, ensure_ascii=False, separators=(",", ":")))
+    else:
+        print(f"錯誤：{error}")
+    raise typer.Exit(1)
+
+
+@feature_app.command("new")
+def feature_new(
+    description: list[str] = typer.Argument(..., help="功能描述"),
+    json_output: bool = typer.Option(False, "--json", help="以單行 JSON 輸出"),
+):
+    """建立功能分支、規格目錄與 spec.md (取代 create-new-feature.sh)。"""
+    from .features import create_feature
+
+    try:
+        result = create_feature(" ".join(description))
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        _feature_error(e, json_output)
+    for warning in result.pop("warnings"):
+        print(f"警告：{warning}", file=sys.stderr)
+    _feature_output(result, json_output)
+
+
+@feature_app.command("plan")
+def feature_plan(json_output: bool = typer.Option(False, "--json", help="以單行 JSON 輸出")):
+    """為目前功能分支建立實作計畫 (取代 setup-plan.sh)。"""
+    from .features import setup_plan
+
+    try:
+        result = setup_plan()
+    except (OSError, ValueError) as e:
+        _feature_error(e, json_output)
+    _feature_output(result, json_output)
+
+
+@feature_app.command("paths")
+def feature_paths(json_output: bool = typer.Option(False, "--json", help="以單行 JSON 輸出 (包含所有設計文件路徑)")):
+    """輸出目前功能分支的路徑，不建立任何內容 (取代 get-feature-paths.sh)。"""
+    from .features import get_feature_paths, require_feature_branch
+
+    try:
+        result = require_feature_branch(get_feature_paths())
+    except (OSError, ValueError) as e:
+        _feature_error(e, json_output)
+    _feature_output(result, json_output, ["REPO_ROOT", "BRANCH", "FEATURE_DIR", "FEATURE_SPEC", "IMPL_PLAN", "TASKS"])
+
+
+@feature_app.command("prereqs")
+def feature_prereqs(json_output: bool = typer.Option(False, "--json", help="以單行 JSON 輸出")):
+    """確認實作計畫存在並列出可用的設計文件 (取代 check-task-prerequisites.sh)。"""
+    from .features import check_prerequisites
+
+    try:
+        result = check_prerequisites()
+    except (OSError, ValueError) as e:
+        _feature_error(e, json_output)
+    docs = result.pop("docs")
+    if json_output:
+        _feature_output(result, json_output)
+        return
+    print(f"FEATURE_DIR:{result['FEATURE_DIR']}")
+    print("AVAILABLE_DOCS:")
+    for name, present in docs.items():
+        print(f"  {'✓' if present else '✗'} {name}")
+
+
+@feature_app.command("list")
+def feature_list(
+    json_output: bool = typer.Option(False, "--json", help="以 JSON 輸出完整索引"),
+    number: int = typer.Option(None, "--number", help="只顯示指定編號的功能"),
+    refresh: bool = typer.Option(False, "--refresh", help="重新檢查所有功能的文件狀態"),
+):
+    """列出 specs/ 中的功能與文件狀態 (使用 specs/.index.json 索引)。"""
+    from .features import FEATURE_ARTIFACTS, list_features
+
+    try:
+        index = list_features(refresh=refresh)
+    except (OSError, ValueError) as e:
+        _feature_error(e, json_output)
+    features = [f for f in index["features"].values() if number is None or f["number"] == number]
+    if json_output:
+        print(json.dumps({**index, "features": features}, indent=2, ensure_ascii=False))
+        return
+    if not features:
+        console.print("[yellow]沒有符合的功能[/yellow]")
+        return
+
+    from rich.table import Table
+
+    table = Table(title=f"下一個編號：{index['highest'] + 1:03d}", title_style="dim")
+    table.add_column("編號", style="cyan", justify="right")
+    table.add_column("分支")
+    for name in FEATURE_ARTIFACTS:
+        table.add_column(name.split(".")[0].rstrip("/"), justify="center")
+    for feature in features:
+        table.add_row(
+            "" if feature["number"] is None else f"{feature['number']:03d}",
+            feature["branch"],
+            *("[green]✓[/green]" if feature["artifacts"][name] else "[dim]-[/dim]" for name in FEATURE_ARTIFACTS),
+        )
+    console.print(table)
+
+
+@feature_app.command("reindex")
+def feature_reindex():
+    """依 specs/ 目錄樹重新建立功能索引。"""
+    from .features import list_features
+
+    try:
+        index = list_features(refresh=True)
+    except (OSError, ValueError) as e:
+        _feature_error(e, False)
+    console.print(f"[green]✓[/green] 已重新建立索引：{len(index['features'])} 個功能，下一個編號 {index['highest'] + 1:03d}")
+
+
+@feature_app.command("context")
+def feature_context(
+    agent: str = typer.Argument(None, help="只更新指定助理：claude、gemini 或 copilot (省略時更新所有已存在的上下文檔案)"),
+    json_output: bool = typer.Option(False, "--json", help="以單行 JSON 輸出"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="只顯示會變更的內容，不寫入檔案"),
+):
+    """依目前功能的 plan.md 更新 AI 助理上下文檔案 (取代 update-agent-context.sh)。"""
+    from .agent_context import AGENT_CONTEXT_FILES, update_agent_contexts
+    from .features import get_feature_paths
+
+    try:
+        if agent and agent not in AGENT_CONTEXT_FILES:
+            raise ValueError(f"未知的代理程式類型 '{agent}'。請使用：{'、'.join(AGENT_CONTEXT_FILES)}，或留空以更新全部。")
+        paths = get_feature_paths()
+        plan_path = Path(paths["IMPL_PLAN"])
+        if not plan_path.is_file():
+            raise FileNotFoundError(f"在 {plan_path} 找不到 plan.md")
+        result = update_agent_contexts(Path(paths["REPO_ROOT"]), paths["BRANCH"], plan_path, [agent] if agent else None, dry_run=dry_run)
+    except (OSError, ValueError) as e:
+        _feature_error(e, json_output)
+    if json_output:
+        print(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
+        return
+
+    print(f"=== 為功能 {paths['BRANCH']} 更新代理程式上下文檔案 ===")
+    for file in result["files"]:
+        name = AGENT_CONTEXT_FILES[file["agent"]][1]
+        if not file["changed"]:
+            status = "沒有變更"
+        elif dry_run:
+            status = "將會建立" if file["created"] else "將會更新"
+        else:
+            status = "已建立" if file["created"] else "已更新"
+        print(f"{'✅' if file['changed'] else '・'} {name}：{file['path']} ({status})")
+        for section, lines in file["changes"].items():
+            for line in lines:
+                print(f"    + [{section}] {line}")
+    plan = result["plan"]
+    summary = [("新增語言", plan["language"]), ("新增框架", plan["framework"]), ("新增資料庫", plan["storage"])]
+    if any(value for _, value in summary):
+        print("\n變更摘要：")
+        for label, value in summary:
+            if value:
+                print(f"- {label}：{value}")
+
+
+tasks_app = typer.Typer(
+    name="tasks",
+    help="分析與執行功能的 tasks.md",
+    add_completion=False,
+)
+app.add_typer(tasks_app, name="tasks")
+
+
+def _load_task_graph(tasks_file: Path | None) -> tuple[Path, dict]:
+    from .tasks import build_task_graph, parse_tasks
+
+    if tasks_file is None:
+        from .features import get_feature_paths
+
+        tasks_file = Path(get_feature_paths()["TASKS"])
+    if not tasks_file.is_file():
+        raise FileNotFoundError(f"找不到 {tasks_file}\n請先執行 /tasks 來建立任務清單。")
+    return tasks_file, build_task_graph(*parse_tasks(tasks_file.read_text(encoding="utf-8")))
+
+
+@tasks_app.command("graph")
+def tasks_graph(
+    tasks_file: Path = typer.Argument(None, help="tasks.md 路徑 (預設為目前功能分支的 tasks.md)"),
+    json_output: bool = typer.Option(False, "--json", help="以 JSON 輸出任務圖"),
+    dot_output: bool = typer.Option(False, "--dot", help="以 Graphviz DOT 格式輸出任務圖"),
+):
+    """將 tasks.md 解析為相依圖：檢查 [P] 任務的檔案衝突與循環，並列出平行波次與關鍵路徑。
+
+    圖無效 (有循環或衝突) 時結束代碼為 1。
+    """
+    from .tasks import task_graph_to_dot
+
+    try:
+        tasks_file, graph = _load_task_graph(tasks_file)
+    except (OSError, ValueError) as e:
+        _feature_error(e, json_output)
+    if json_output:
+        print(json.dumps({"file": str(tasks_file), **graph}, indent=2, ensure_ascii=False))
+    elif dot_output:
+        print(task_graph_to_dot(graph, tasks_file.parent.name), end="")
+    else:
+        done = sum(task["done"] for task in graph["tasks"])
+        console.print(f"[cyan]{tasks_file}[/cyan]：{len(graph['tasks'])} 個任務 (已完成 {done})，"
+                      f"{len(graph['waves'])} 個波次，最大平行度 {graph['max_parallelism']}")
+        for number, wave in enumerate(graph["waves"], 1):
+            console.print(f"  波次 {number:>2}：{'、'.join(wave)}")
+        console.print(f"[bold]關鍵路徑[/bold] ({len(graph['critical_path'])})：{' → '.join(graph['critical_path'])}")
+        for warning in graph["warnings"]:
+            console.print(f"[yellow]警告：[/yellow]{warning}")
+        for cycle in graph["cycles"]:
+            console.print(f"[red]循環相依：[/red]{' → '.join(cycle)}")
+        for conflict in graph["conflicts"]:
+            console.print(f"[red]平行衝突：[/red]{'、'.join(conflict['tasks'])} 在同一波次中都修改 {conflict['file']}")
+    if not graph["valid"]:
+        raise typer.Exit(1)
+
+
+@tasks_app.command("run")
+def tasks_run(
+    tasks_file: Path = typer.Argument(None, help="tasks.md 路徑 (預設為目前功能分支的 tasks.md)"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="同時執行的任務數 (預設為 CPU 核心數)"),
+    timeout: float = typer.Option(None, "--timeout", help="每個任務的逾時秒數 (任務可用「逾時：」覆寫)"),
+    retries: int = typer.Option(0, "--retries", help="失敗任務的重試次數 (任務可用「重試：」覆寫)"),
+    backoff: float = typer.Option(None, "--backoff", help="第一次重試前等待的秒數，之後每次加倍"),
+    keep_going: bool = typer.Option(False, "--keep-going", "-k", help="任務失敗後繼續執行不相依於它的任務"),
+    skip_manual: bool = typer.Option(False, "--skip-manual", help="將沒有指令的任務視為已完成"),
+    restart: bool = typer.Option(False, "--restart", help="忽略先前的執行狀態，重新執行所有任務"),
+    json_output: bool = typer.Option(False, "--json", help="以 JSON 輸出執行結果 (不顯示即時進度)"),
+    no_tui: bool = typer.Option(False, "--no-tui", envvar="SPECIFY_NO_TUI", help="不顯示即時樹狀圖，改為逐行輸出進度 (輸出不是終端機時自動使用)"),
+):
+    """依相依圖平行執行 tasks.md 中任務附加的指令。
+
+    執行狀態與記錄保存在功能目錄 (.tasks-state.json、.task-logs/)，中斷後重新執行會從未完成的任務繼續。
+    """
+    from .git import find_repo_root
+    from .task_runner import DEFAULT_TASK_BACKOFF, DEFAULT_TASK_TIMEOUT, run_task_graph
+
+    try:
+        tasks_file, graph = _load_task_graph(tasks_file)
+    except (OSError, ValueError) as e:
+        _feature_error(e, json_output)
+    if not graph["valid"]:
+        problems = [f"循環相依：{' → '.join(cycle)}" for cycle in graph["cycles"]]
+        problems += [f"平行衝突：{'、'.join(c['tasks'])} 都修改 {c['file']}" for c in graph["conflicts"]]
+        _feature_error(ValueError("任務圖無效，請先執行 specify tasks graph 修正：\n" + "\n".join(problems)), json_output)
+
+    feature_dir = tasks_file.resolve().parent
+    repo_root = find_repo_root(feature_dir) or feature_dir
+    options = dict(
+        repo_root=repo_root,
+        feature_dir=feature_dir,
+        jobs=jobs or os.cpu_count() or 1,
+        timeout=timeout or DEFAULT_TASK_TIMEOUT,
+        retries=retries,
+        backoff=DEFAULT_TASK_BACKOFF if backoff is None else backoff,
+        keep_going=keep_going,
+        skip_manual=skip_manual,
+        restart=restart,
+    )
+
+    if json_output:
+        result = run_task_graph(graph, **options)
+        print(json.dumps({"file": str(tasks_file), **result}, indent=2, ensure_ascii=False))
+    else:
+        from .tracker import StepTracker
+        from .ui import track_progress, use_tui
+
+        tui = use_tui(no_tui)
+        tracker = StepTracker(f"執行 {tasks_file.parent.name} 的任務 (同時 {options['jobs']} 個)")
+        for task in graph["tasks"]:
+            tracker.add(task["id"], f"{task['id']} {task['description'][:60]}")
+        with track_progress(tracker, tui=tui) as live:
+            try:
+                result = run_task_graph(graph, tracker=tracker, **options)
+            except KeyboardInterrupt:
+                if live:
+                    live.refresh()
+                console.print("[yellow]已中斷；重新執行會從未完成的任務繼續[/yellow]")
+                raise typer.Exit(130)
+        if tui:
+            console.print(tracker.render())
+        summary = f"成功 {result['succeeded']}、失敗 {result['failed']}、略過 {result['skipped']}"
+        if result["manual"]:
+            summary += f"、待手動完成 {result['manual']}"
+        if result["blocked"]:
+            summary += f"、未執行 {result['blocked']}"
+        console.print(f"\n{summary} ({result['seconds']:.1f}s)")
+    if result["failed"]:
+        raise typer.Exit(1)
+
+
+@app.command()
+def lint(
+    paths: list[Path] = typer.Argument(None, help="要檢查的檔案或目錄 (預設為儲存庫的 specs/)"),
+    json_output: bool = typer.Option(False, "--json", help="以 JSON 輸出檢查結果"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="平行檢查的行程數 (預設為 CPU 核心數)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="不使用也不更新檢查結果快取"),
+    strict: bool = typer.Option(False, "--strict", help="有警告時也以結束代碼 1 結束"),
+):
+    """檢查 specs/*/ 的 spec.md、plan.md、tasks.md 是否符合範本結構。
+
+    檢查必要章節、未解決的 [NEEDS CLARIFICATION] 標記與範本佔位符、閘門檢查清單、
+    memory/constitution.md 的憲章原則，以及任務編號與相依圖。結果依內容雜湊快取，只重新檢查變更的檔案。
+    """
+    import hashlib
+    from .git import find_repo_root
+    from .lint import lint_paths
+
+    repo_root = find_repo_root() or Path.cwd()
+    cache_path = None
+    if not no_cache:
+        cache_path = get_state_cache_dir("lint") / f"{hashlib.sha256(str(repo_root.resolve()).encode()).hexdigest()[:16]}.json"
+    report = lint_paths(paths or [repo_root], repo_root=repo_root, cache_path=cache_path, jobs=jobs or os.cpu_count() or 1)
+
+    if json_output:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        # 以純文字一次輸出 (path:line: 嚴重度 [規則] 訊息)，便於編輯器解析；大量結果時也不經 Rich 逐行排版
+        labels = {"error": "錯誤", "warning": "警告"}
+        lines = []
+        for finding in report["findings"]:
+            location = finding["path"] if finding["line"] is None else f"{finding['path']}:{finding['line']}"
+            lines.append(f"{location}: {labels[finding['severity']]} [{finding['rule']}] {finding['message']}\n")
+        sys.stdout.write("".join(lines))
+        console.print(
+            f"\n檢查 {report['files']} 個檔案 (重新檢查 {report['checked']}，快取 {report['cached']})："
+            f"{report['errors']} 個錯誤、{report['warnings']} 個警告"
+        )
+    if report["errors"] or (strict and report["warnings"]):
+        raise typer.Exit(1)
+
+
+@app.command()
+def render(
+    templates: list[Path] = typer.Argument(..., help="要渲染的範本檔案"),
+    var: list[str] = typer.Option(None, "--var", "-v", help="變數 KEY=VALUE (可重複；例如 \"FEATURE NAME=使用者登入\")"),
+    out: Path = typer.Option(None, "--out", "-o", help="輸出檔案 (只有一個範本時；省略時輸出到標準輸出)"),
+    out_dir: Path = typer.Option(None, "--out-dir", help="輸出目錄，檔名去除 -template (spec-template.md -> spec.md)"),
+    list_vars: bool = typer.Option(False, "--list-vars", help="只列出範本中的變數"),
+):
+    """以單次替換渲染範本中的 [PROJECT NAME]、[DATE]、[FEATURE NAME]、[###-feature-name]、{ARGS} 等佔位符。
+
+    DATE、PROJECT NAME 與目前的功能分支會自動填入，可用 --var 覆寫；未提供的變數保留原本的佔位符。
+    """
+    from .agent_context import write_atomic
+    from .features import FEATURE_BRANCH_PATTERN
+    from .git import find_git_dir, find_repo_root, read_current_branch
+    from .render import default_variables, load_template, output_name, parse_variable_args, resolve_variables
+
+    try:
+        compiled = [(template, load_template(template)) for template in templates]
+        variables = parse_variable_args(var or [])
+    except (OSError, ValueError) as e:
+        console.print(f"[red]錯誤：[/red]{e}")
+        raise typer.Exit(1)
+
+    if list_vars:
+        for template, template_compiled in compiled:
+            print(f"{template}: {', '.join(template_compiled.variables) or '(沒有變數)'}")
+        return
+    if out is not None and (out_dir is not None or len(templates) > 1):
+        console.print("[red]錯誤：[/red]--out 只能用於單一範本；多個範本請使用 --out-dir")
+        raise typer.Exit(1)
+    if out is None and out_dir is None and len(templates) > 1:
+        console.print("[red]錯誤：[/red]渲染多個範本時需要 --out-dir")
+        raise typer.Exit(1)
+
+    repo_root = find_repo_root()
+    branch = read_current_branch(find_git_dir(repo_root)) if repo_root else None
+    defaults = default_variables(repo_root, branch if branch and FEATURE_BRANCH_PATTERN.match(branch) else None)
+    values = resolve_variables(variables, defaults)
+
+    for template, template_compiled in compiled:
+        text = template_compiled.render(values)
+        if out is None and out_dir is None:
+            sys.stdout.write(text)
+            continue
+        target = out if out is not None else out_dir / output_name(template)
+        write_atomic(target, text)
+        missing = [name for name in template_compiled.variables if name not in values]
+        note = f" [dim](未填入：{', '.join(missing)})[/dim]" if missing else ""
+        console.print(f"[green]✓[/green] {target}{note}", highlight=False)
+
+
+@app.command()
+def package(
+    source_dir: Path = typer.Argument(Path("."), help="範本原始碼目錄 (包含 templates/commands)"),
+    version: str = typer.Option(..., "--version", help="發布版本標籤，例如 v0.0.10 (用於檔名與 manifest)"),
+    out_dir: Path = typer.Option(Path("."), "--out-dir", "-o", help="ZIP 輸出目錄"),
+    agent: list[str] = typer.Option(None, "--agent", help="只建置指定的助理 (可重複；預設為全部)"),
+    json_output: bool = typer.Option(False, "--json", help="以 JSON 輸出建置結果"),
+):
+    """建置發布用的 spec-kit-template-<助理>-<版本>.zip (取代 release.yml 的 shell 打包步驟)。
+
+    所有助理在同一個程序中同時建置；輸出可重現 (排序的項目、固定時間，可用 SOURCE_DATE_EPOCH 設定)，
+    每個 ZIP 都包含記錄各檔案 SHA-256 的 .specify/manifest-<助理>.json。
+    """
+    from .packager import package_templates
+
+    started = time.perf_counter()
+    try:
+        results = package_templates(source_dir, out_dir, version, agent or None)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]錯誤：[/red]{e}")
+        raise typer.Exit(1)
+    if json_output:
+        print(json.dumps({"version": version, "packages": results}, indent=2, ensure_ascii=False))
+        return
+    for result in results:
+        console.print(f"[green]✓[/green] {result['path']} ({result['files']} 個檔案，{result['size']:,} bytes)", highlight=False)
+        console.print(f"  [dim]sha256 {result['sha256']}[/dim]")
+    console.print(f"已建置 {len(results)} 個套件 ({time.perf_counter() - started:.2f}s)")
@@ -0,0 +1,15 @@
+"""Specify CLI 共用常數。"""
+
+# 常數
+AI_CHOICES = {
+    "copilot": "GitHub Copilot",
+    "claude": "Claude Code",
+    "gemini": "Gemini CLI"
+}
+
+# 範本來源
+TEMPLATE_REPO_OWNER = "lazyjerry"
+TEMPLATE_REPO_NAME = "spec-kit"
+
+# 各 AI 助理範本共用的基底目錄；多助理初始化時只解壓縮一次
+SHARED_TEMPLATE_DIRS = ("memory", "scripts", "templates")
@@ -0,0 +1,157 @@
+"""範本 ZIP 解壓縮：解壓縮時即展平根目錄並疊加多個助理的範本。"""
+
+import os
+import stat
+import zlib
+import hashlib
+import zipfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from .constants import SHARED_TEMPLATE_DIRS
+
+# 複製檔案內容時使用的緩衝大小
+COPY_BUFFER_SIZE = 1024 * 1024
+# 寫入檔案的執行緒數 (在 NFS、overlayfs 等高延遲檔案系統上，每個檔案的 stat/open/close 都要等待往返)
+EXTRACT_WORKERS = int(os.environ.get("SPECIFY_EXTRACT_WORKERS", min(8, os.cpu_count() or 1)))
+# 每個執行緒至少分配的檔案數；檔案少時直接在目前執行緒寫入
+EXTRACT_FILES_PER_WORKER = 16
+
+
+def archive_root_prefix(names: list[str]) -> str:
+    """若 ZIP 中所有項目都位於單一頂層目錄下 (GitHub 樣式)，回傳該前綴 (含結尾斜線)，否則回傳空字串。"""
+    roots = {name.split("/", 1)[0] for name in names if name.strip("/")}
+    if len(roots) != 1:
+        return ""
+    prefix = f"{roots.pop()}/"
+    # 單一頂層「檔案」不算巢狀目錄
+    if not any(name.startswith(prefix) and name != prefix for name in names):
+        return ""
+    return prefix
+
+
+def _existing_digests(path: Path) -> tuple[int, str]:
+    """現有檔案的 CRC-32 (與 ZIP 記錄的值比較) 與 SHA-256 (寫入 manifest)，只讀取一次。"""
+    crc = 0
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_BUFFER_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+            digest.update(chunk)
+    return crc, digest.hexdigest()
+
+
+def _materialize(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path, dry_run: bool) -> tuple[str, str | None]:
+    """寫入單一檔案，回傳 (狀態, sha256)；狀態為 added、overwritten 或 unchanged。
+
+    目的地已有大小與 CRC-32 都相同的檔案時不重寫 (--here 合併到大型儲存庫時，多數檔案通常未變更)。
+    dry_run 時只比較不寫入，新增與覆寫的檔案不回傳 sha256。
+    """
+    mode = (info.external_attr >> 16) & 0o777
+    try:
+        existing = target.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        existing = None
+    if existing is not None and existing.st_size == info.file_size:
+        crc, sha256 = _existing_digests(target)
+        if crc == info.CRC:
+            if mode and not dry_run and stat.S_IMODE(existing.st_mode) != mode:
+                os.chmod(target, mode)
+            return "unchanged", sha256
+    state = "added" if existing is None else "overwritten"
+    if dry_run:
+        return state, None
+    digest = hashlib.sha256()
+    with zip_ref.open(info) as src, open(target, "wb") as out:
+        for chunk in iter(lambda: src.read(COPY_BUFFER_SIZE), b""):
+            digest.update(chunk)
+            out.write(chunk)
+    # 保留 ZIP 中記錄的 Unix 權限 (例如 scripts/*.sh 的執行位元)
+    if mode:
+        os.chmod(target, mode)
+    return state, digest.hexdigest()
+
+
+def extract_template_archive(zip_ref: zipfile.ZipFile, dest: Path, *, strip_prefix: str = "", exclude_top_level: tuple[str, ...] = (), workers: int | None = None, dry_run: bool = False) -> dict:
+    """將 ZIP 項目直接解壓縮到最終位置。
+
+    解壓縮時即移除共同的根目錄前綴，每個檔案只寫入一次，不需要暫存目錄或事後搬移；
+    先計算並一次建立所有目的地目錄，再以最多 workers 個執行緒寫入檔案 (預設 EXTRACT_WORKERS)。
+    目的地已存在且內容相同的檔案略過，不同的會被覆寫 (用於 --here 合併)；dry_run 時只比較，不建立任何檔案。
+    exclude_top_level 中的頂層目錄會被略過。
+    回傳統計：files、dirs、added、overwritten、unchanged、top_level (頂層項目名稱 -> 是否為目錄)
+    與 hashes (路徑 -> {sha256, size}，寫入時一併計算，供 upgrade 作為基準)。
+    """
+    dest_root = dest.resolve()
+    stats = {"files": 0, "dirs": 0, "added": [], "overwritten": [], "unchanged": [], "top_level": {}, "hashes": {}}
+
+    # 1. 規劃：相同路徑出現多次時以最後一個為準 (與依序解壓縮相同)
+    members: dict[str, zipfile.ZipInfo] = {}
+    directories: set[Path] = set()
+    for info in zip_ref.infolist():
+        name = info.filename
+        if strip_prefix:
+            if not name.startswith(strip_prefix):
+                continue
+            name = name[len(strip_prefix):]
+        rel = Path(name)
+        if not name.strip("/") or rel.is_absolute() or ".." in rel.parts:
+            continue
+        if rel.parts[0] in exclude_top_level:
+            continue
+        stats["top_level"].setdefault(rel.parts[0], info.is_dir() or len(rel.parts) > 1)
+        if info.is_dir():
+            directories.add(dest_root / rel)
+            stats["dirs"] += 1
+            continue
+        directories.add((dest_root / rel).parent)
+        members[rel.as_posix()] = info
+
+    # 2. 一次建立所有目錄 (由淺到深，已存在的上層目錄不會重複檢查)
+    if not dry_run:
+        for directory in sorted(directories, key=lambda path: len(path.parts)):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    # 3. 平行寫入檔案；結果依 ZIP 順序收集
+    workers = max(1, min(workers or EXTRACT_WORKERS, len(members) // EXTRACT_FILES_PER_WORKER or 1))
+
+    def materialize(item):
+        rel, info = item
+        return _materialize(zip_ref, info, dest_root / rel, dry_run)
+
+    if workers == 1:
+        results = map(materialize, members.items())
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="specify-extract")
+        results = pool.map(materialize, members.items())
+    try:
+        for (rel, info), (state, sha256) in zip(members.items(), results):
+            stats[state].append(rel)
+            if sha256 is not None:
+                stats["hashes"][rel] = {"sha256": sha256, "size": info.file_size}
+            stats["files"] += 1
+    finally:
+        if workers > 1:
+            pool.shutdown(cancel_futures=True)
+    return stats
+
+
+def layer_template_archives(project_path: Path, sources: list[tuple[str, object]], *, workers: int | None = None, dry_run: bool = False) -> list[tuple[str, dict]]:
+    """依序將多個助理的範本解壓縮到 project_path。
+    第一個範本完整解壓縮；其餘只疊加助理專屬項目，略過 SHARED_TEMPLATE_DIRS。
+    sources 為 (ai, 可隨機讀取的 ZIP 檔案物件)，回傳 (ai, 解壓縮統計) 清單。
+    workers 與 dry_run 見 extract_template_archive。
+    """
+    layered = []
+    for index, (ai, source) in enumerate(sources):
+        with zipfile.ZipFile(source, 'r') as zip_ref:
+            stats = extract_template_archive(
+                zip_ref,
+                project_path,
+                strip_prefix=archive_root_prefix(zip_ref.namelist()),
+                exclude_top_level=() if index == 0 else SHARED_TEMPLATE_DIRS,
+                workers=workers,
+                dry_run=dry_run,
+            )
+        layered.append((ai, stats))
+    return layered
@@ -0,0 +1,263 @@
+"""功能分支與規格目錄：scripts/*.sh 的單一程序版本。
+
+以直接讀取 .git/HEAD 取代 git rev-parse，agent 反覆呼叫時不需啟動任何 git 程序。
+輸出的鍵值與原本腳本相同。
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+from .git import checkout_new_branch, find_git_dir, find_repo_root, read_current_branch
+
+FEATURE_BRANCH_PATTERN = re.compile(r"^[0-9]{3}-")
+# 分支名稱最多取描述中的前幾個單字
+BRANCH_NAME_WORDS = 3
+
+# specs/ 中的功能索引：編號 -> 分支 -> 路徑 -> 文件狀態
+FEATURE_INDEX_NAME = ".index.json"
+FEATURE_INDEX_VERSION = 1
+FEATURE_INDEX_LOCK_TIMEOUT = 10
+# 超過此秒數的鎖定檔視為異常結束留下的殘留
+FEATURE_INDEX_LOCK_STALE_SECONDS = 60
+# 功能目錄中追蹤的文件 (名稱 -> 是否為目錄)
+FEATURE_ARTIFACTS = {
+    "spec.md": False,
+    "plan.md": False,
+    "tasks.md": False,
+    "research.md": False,
+    "data-model.md": False,
+    "quickstart.md": False,
+    "contracts/": True,
+}
+
+
+def get_feature_paths(start: Path | None = None) -> dict:
+    """回傳目前功能的所有標準路徑 (等同 common.sh 的 get_feature_paths)。"""
+    repo_root = find_repo_root(start)
+    if repo_root is None:
+        raise ValueError("不在 git 儲存庫中")
+    branch = read_current_branch(find_git_dir(repo_root))
+    feature_dir = repo_root / "specs" / branch
+    return {
+        "REPO_ROOT": str(repo_root),
+        "BRANCH": branch,
+        "FEATURE_DIR": str(feature_dir),
+        "FEATURE_SPEC": str(feature_dir / "spec.md"),
+        "IMPL_PLAN": str(feature_dir / "plan.md"),
+        "TASKS": str(feature_dir / "tasks.md"),
+        "RESEARCH": str(feature_dir / "research.md"),
+        "DATA_MODEL": str(feature_dir / "data-model.md"),
+        "QUICKSTART": str(feature_dir / "quickstart.md"),
+        "CONTRACTS_DIR": str(feature_dir / "contracts"),
+    }
+
+
+def require_feature_branch(paths: dict) -> dict:
+    """確認目前在功能分支上 (001-feature-name)，否則拋出 ValueError。"""
+    branch = paths["BRANCH"]
+    if not FEATURE_BRANCH_PATTERN.match(branch):
+        raise ValueError(f"不在功能分支上。目前分支：{branch}\n功能分支應該命名為：001-feature-name")
+    return paths
+
+
+def branch_slug(description: str) -> str:
+    """由描述產生分支名稱的單字部分 (小寫英數字，取前三個單字)。"""
+    # 與 tr '[:upper:]' '[:lower:]' 相同，只轉換 ASCII 字母；其餘字元都視為分隔符號
+    words = [w.lower() for w in re.findall(r"[A-Za-z0-9]+", description)]
+    return "-".join(words[:BRANCH_NAME_WORDS])
+
+
+def artifact_status(feature_dir: Path) -> dict:
+    """回傳功能目錄中各文件是否存在 (目錄需包含檔案)。"""
+    status = {}
+    for name, is_dir in FEATURE_ARTIFACTS.items():
+        path = feature_dir / name.rstrip("/")
+        status[name] = path.is_dir() and any(path.iterdir()) if is_dir else path.is_file()
+    return status
+
+
+def _index_entry(specs_dir: Path, name: str) -> dict:
+    match = re.match(r"[0-9]+", name)
+    return {
+        "number": int(match.group()) if match else None,
+        "branch": name,
+        "path": f"specs/{name}",
+        "artifacts": artifact_status(specs_dir / name),
+    }
+
+
+def _feature_dir_names(specs_dir: Path) -> set[str]:
+    # scandir 的 is_dir 使用目錄項目中的型別資訊，不需逐一 stat
+    try:
+        with os.scandir(specs_dir) as entries:
+            return {e.name for e in entries if e.is_dir() and not e.name.startswith(".")}
+    except FileNotFoundError:
+        return set()
+
+
+def rebuild_feature_index(specs_dir: Path) -> dict:
+    """依 specs/ 目錄樹重新建立功能索引 (不寫入磁碟)。"""
+    features = {name: _index_entry(specs_dir, name) for name in sorted(_feature_dir_names(specs_dir))}
+    numbers = [f["number"] for f in features.values() if f["number"] is not None]
+    return {
+        "version": FEATURE_INDEX_VERSION,
+        "highest": max(numbers, default=0),
+        "features": features,
+    }
+
+
+def load_feature_index(specs_dir: Path) -> tuple[dict, bool]:
+    """讀取功能索引，回傳 (index, 是否重新建立)。
+
+    索引中的功能清單與 specs/ 的目錄項目不一致時 (例如手動新增目錄或切換分支)，自動重新建立。
+    """
+    try:
+        with open(specs_dir / FEATURE_INDEX_NAME, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == FEATURE_INDEX_VERSION and set(index["features"]) == _feature_dir_names(specs_dir):
+            return index, False
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return rebuild_feature_index(specs_dir), True
+
+
+def save_feature_index(specs_dir: Path, index: dict):
+    path = specs_dir / FEATURE_INDEX_NAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def feature_index_lock(specs_dir: Path, timeout: float = FEATURE_INDEX_LOCK_TIMEOUT):
+    """以 O_EXCL 建立鎖定檔，避免多個 agent 同時建立功能時取得相同編號。"""
+    lock_path = specs_dir / f"{FEATURE_INDEX_NAME}.lock"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > FEATURE_INDEX_LOCK_STALE_SECONDS:
+                    lock_path.unlink(missing_ok=True)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"等待功能索引鎖定逾時：{lock_path}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        lock_path.unlink(missing_ok=True)
+
+
+def update_feature_index(specs_dir: Path, branch: str):
+    """重新整理單一功能的索引項目並寫回 (例如產生 plan.md 之後)。"""
+    with feature_index_lock(specs_dir):
+        index, _ = load_feature_index(specs_dir)
+        if (specs_dir / branch).is_dir():
+            entry = index["features"][branch] = _index_entry(specs_dir, branch)
+            index["highest"] = max(index["highest"], entry["number"] or 0)
+        save_feature_index(specs_dir, index)
+
+
+def list_features(start: Path | None = None, *, refresh: bool = False) -> dict:
+    """回傳功能索引；refresh 為 True 時重新檢查所有文件狀態並寫回。"""
+    repo_root = find_repo_root(start)
+    if repo_root is None:
+        raise ValueError("不在 git 儲存庫中")
+    specs_dir = repo_root / "specs"
+    if not specs_dir.is_dir():
+        return rebuild_feature_index(specs_dir)
+    with feature_index_lock(specs_dir):
+        index, rebuilt = (rebuild_feature_index(specs_dir), True) if refresh else load_feature_index(specs_dir)
+        if rebuilt:
+            save_feature_index(specs_dir, index)
+    return index
+
+
+def create_feature(description: str, start: Path | None = None) -> dict:
+    """建立功能分支、規格目錄與 spec.md (等同 create-new-feature.sh)。"""
+    repo_root = find_repo_root(start)
+    if repo_root is None:
+        raise ValueError("不在 git 儲存庫中")
+    specs_dir = repo_root / "specs"
+    specs_dir.mkdir(exist_ok=True)
+
+    # 在鎖定中取得編號、建立目錄並更新索引，確保同時建立的功能不會重複編號
+    with feature_index_lock(specs_dir):
+        index, _ = load_feature_index(specs_dir)
+        feature_num = f"{index['highest'] + 1:03d}"
+        branch_name = f"{feature_num}-{branch_slug(description)}"
+        checkout_new_branch(repo_root, branch_name)
+
+        feature_dir = specs_dir / branch_name
+        feature_dir.mkdir(parents=True, exist_ok=True)
+        spec_file = feature_dir / "spec.md"
+        template = repo_root / "templates" / "spec-template.md"
+        warnings = []
+        if template.is_file():
+            shutil.copyfile(template, spec_file)
+        else:
+            warnings.append(f"在 {template} 找不到範本")
+            spec_file.touch()
+
+        index["features"][branch_name] = _index_entry(specs_dir, branch_name)
+        index["highest"] = int(feature_num)
+        save_feature_index(specs_dir, index)
+    return {
+        "BRANCH_NAME": branch_name,
+        "SPEC_FILE": str(spec_file),
+        "FEATURE_NUM": feature_num,
+        "warnings": warnings,
+    }
+
+
+def setup_plan(start: Path | None = None) -> dict:
+    """建立功能目錄並複製計畫範本 (等同 setup-plan.sh)。"""
+    paths = require_feature_branch(get_feature_paths(start))
+    feature_dir = Path(paths["FEATURE_DIR"])
+    feature_dir.mkdir(parents=True, exist_ok=True)
+    template = Path(paths["REPO_ROOT"]) / "templates" / "plan-template.md"
+    if template.is_file():
+        shutil.copyfile(template, paths["IMPL_PLAN"])
+    update_feature_index(feature_dir.parent, paths["BRANCH"])
+    return {
+        "FEATURE_SPEC": paths["FEATURE_SPEC"],
+        "IMPL_PLAN": paths["IMPL_PLAN"],
+        "SPECS_DIR": paths["FEATURE_DIR"],
+        "BRANCH": paths["BRANCH"],
+    }
+
+
+def check_prerequisites(start: Path | None = None) -> dict:
+    """確認 plan.md 存在並列出可用的設計文件 (等同 check-task-prerequisites.sh)。"""
+    paths = require_feature_branch(get_feature_paths(start))
+    feature_dir = Path(paths["FEATURE_DIR"])
+    if not feature_dir.is_dir():
+        raise FileNotFoundError(f"找不到功能目錄：{feature_dir}\n請先執行 /specify 來建立功能結構。")
+    if not Path(paths["IMPL_PLAN"]).is_file():
+        raise FileNotFoundError(f"在 {feature_dir} 中找不到 plan.md\n請先執行 /plan 來建立計畫。")
+
+    contracts = Path(paths["CONTRACTS_DIR"])
+    docs = {
+        "research.md": Path(paths["RESEARCH"]).is_file(),
+        "data-model.md": Path(paths["DATA_MODEL"]).is_file(),
+        "contracts/": contracts.is_dir() and any(contracts.iterdir()),
+        "quickstart.md": Path(paths["QUICKSTART"]).is_file(),
+    }
+    return {
+        "FEATURE_DIR": paths["FEATURE_DIR"],
+        "AVAILABLE_DOCS": [name for name, present in docs.items() if present],
+        "docs": docs,
+    }
@@ -0,0 +1,342 @@
+"""git 儲存庫偵測與初始提交。"""
+
+import os
+import stat
+import time
+import zlib
+import struct
+import hashlib
+import subprocess
+from pathlib import Path
+
+from .ui import console
+
+def find_git_dir(path: Path) -> Path | None:
+    """不啟動 git 程序，由 path 往上尋找 .git (目錄，或 worktree / submodule 的 gitdir 指標檔)。"""
+    for candidate in [path, *path.parents]:
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            try:
+                pointer = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if pointer.startswith("gitdir:"):
+                git_dir = Path(pointer[len("gitdir:"):].strip())
+                return git_dir if git_dir.is_absolute() else (candidate / git_dir).resolve()
+    return None
+
+
+def is_git_repo(path: Path | None = None) -> bool:
+    """檢查指定路徑是否在 git 儲存庫內。"""
+    if path is None:
+        path = Path.cwd()
+    
+    if not path.is_dir():
+        return False
+
+    return find_git_dir(path.resolve()) is not None
+
+
+def find_repo_root(path: Path | None = None) -> Path | None:
+    """不啟動 git 程序，回傳包含 path 的工作樹根目錄 (等同 git rev-parse --show-toplevel)。"""
+    start = (path or Path.cwd()).resolve()
+    for candidate in [start, *start.parents]:
+        if (candidate / ".git").exists():
+            return candidate
+    return None
+
+
+def _common_dir(git_dir: Path) -> Path:
+    # linked worktree 的 HEAD 在自己的 gitdir，refs 則在共用目錄
+    try:
+        pointer = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    common = Path(pointer)
+    return common if common.is_absolute() else (git_dir / common).resolve()
+
+
+def read_current_branch(git_dir: Path) -> str:
+    """直接讀取 HEAD 取得目前分支名稱；detached HEAD 時回傳 "HEAD" (與 git rev-parse --abbrev-ref HEAD 相同)。"""
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/"):]
+    return "HEAD"
+
+
+def resolve_ref(git_dir: Path, ref: str) -> str | None:
+    """讀取 loose ref 或 packed-refs 取得提交 SHA；ref 不存在時回傳 None。"""
+    common = _common_dir(git_dir)
+    try:
+        return (common / ref).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        pass
+    try:
+        packed = (common / "packed-refs").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    for line in packed.splitlines():
+        if line.endswith(f" {ref}") and not line.startswith(("#", "^")):
+            return line.split(" ", 1)[0]
+    return None
+
+
+def _write_atomic(path: Path, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = path.with_name(f"{path.name}.lock")
+    with open(lock_path, "x", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(lock_path, path)
+
+
+def checkout_new_branch(repo_root: Path, branch: str):
+    """建立並切換到新分支 (等同 git checkout -b，工作樹與 index 不變)。
+
+    一般儲存庫直接寫入 refs/heads/<branch> 與 HEAD，不啟動 git 程序；
+    使用 reftable 等特殊 ref 儲存格式，或 SPECIFY_GIT_STRATEGY=porcelain 時改用 git checkout -b。
+    分支已存在時拋出 ValueError；git 失敗時拋出 subprocess.CalledProcessError。
+    """
+    git_dir = find_git_dir(repo_root)
+    if git_dir is None:
+        raise ValueError(f"{repo_root} 不是 git 儲存庫")
+    common = _common_dir(git_dir)
+    try:
+        config = (common / "config").read_text(encoding="utf-8").lower()
+    except OSError:
+        config = ""
+    if os.environ.get("SPECIFY_GIT_STRATEGY") == "porcelain" or "refstorage" in config:
+        _git(repo_root, "checkout", "-q", "-b", branch)
+        return
+
+    ref = f"refs/heads/{branch}"
+    if resolve_ref(git_dir, ref) is not None:
+        raise ValueError(f"分支 '{branch}' 已存在")
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    commit = resolve_ref(git_dir, head[len("ref: "):]) if head.startswith("ref: ") else head
+    # 尚未有任何提交時，只需切換 HEAD (與 git checkout -b 在空儲存庫中的行為相同)
+    if commit:
+        _write_atomic(common / ref, f"{commit}\n")
+    _write_atomic(git_dir / "HEAD", f"ref: {ref}\n")
+
+
+GIT_INITIAL_COMMIT_MESSAGE = "來自 Specify 範本的初始提交"
+GIT_PACK_MAX_BYTES = 64 * 1024 * 1024
+# git config 的布林值 false 的寫法
+FALSE_VALUES = ("false", "no", "off", "0", "")
+
+
+def _git(project_path: Path, *args: str) -> subprocess.CompletedProcess:
+    # 使用 cwd= 而非 os.chdir，讓多個執行緒可以同時初始化不同專案
+    return subprocess.run(["git", *args], check=True, capture_output=True, cwd=project_path)
+
+
+def _git_blob_id(data: bytes) -> bytes:
+    """計算 blob 物件的 20 位元組 SHA-1 (與 git hash-object 相同)。"""
+    return hashlib.sha1(b"blob " + str(len(data)).encode() + b"\0" + data).digest()
+
+
+def _write_pack(git_dir: Path, blobs: dict[bytes, bytes]):
+    """將所有 blob 寫成單一 packfile (.pack + .idx 第 2 版)。
+
+    相較於每個檔案一個鬆散物件，只需建立兩個檔案，在網路檔案系統上差異尤其明顯。
+    """
+    pack = bytearray(b"PACK" + struct.pack(">II", 2, len(blobs)))
+    records = []  # (sha, crc32, offset)
+    for sha, data in blobs.items():
+        offset = len(pack)
+        # 物件標頭：型別 3 (blob) 與長度的可變長度編碼
+        size = len(data)
+        header = bytearray([(3 << 4) | (size & 0x0F)])
+        size >>= 4
+        while size:
+            header[-1] |= 0x80
+            header.append(size & 0x7F)
+            size >>= 7
+        entry = bytes(header) + zlib.compress(data, 1)
+        pack += entry
+        records.append((sha, zlib.crc32(entry), offset))
+    pack_checksum = hashlib.sha1(pack).digest()
+    pack += pack_checksum
+
+    records.sort()
+    fanout = [0] * 256
+    for sha, _, _ in records:
+        fanout[sha[0]] += 1
+    total = 0
+    for i in range(256):
+        total += fanout[i]
+        fanout[i] = total
+    offsets = bytearray()
+    large_offsets = bytearray()
+    for _, _, offset in records:
+        if offset < 0x80000000:
+            offsets += struct.pack(">I", offset)
+        else:
+            offsets += struct.pack(">I", 0x80000000 | (len(large_offsets) // 8))
+            large_offsets += struct.pack(">Q", offset)
+    idx = bytearray(b"\xfftOc" + struct.pack(">I", 2))
+    idx += struct.pack(">256I", *fanout)
+    idx += b"".join(sha for sha, _, _ in records)
+    idx += b"".join(struct.pack(">I", crc) for _, crc, _ in records)
+    idx += offsets + large_offsets + pack_checksum
+    idx += hashlib.sha1(idx).digest()
+
+    pack_dir = git_dir / "objects" / "pack"
+    pack_dir.mkdir(parents=True, exist_ok=True)
+    name = f"pack-{pack_checksum.hex()}"
+    # 先寫 .pack 再寫 .idx：git 只在 .idx 存在時才會使用該 pack
+    for suffix, content in ((".pack", pack), (".idx", idx)):
+        tmp_path = pack_dir / f"tmp_{name}{suffix}"
+        tmp_path.write_bytes(bytes(content))
+        os.replace(tmp_path, pack_dir / f"{name}{suffix}")
+
+
+def _write_index(git_dir: Path, project_path: Path, paths: list[bytes]) -> int:
+    """為 paths (相對於工作樹、以 / 分隔) 寫入 blob 物件 (單一 packfile) 與 index (DIRC 第 2 版)，回傳項目數。
+
+    index 記錄實際的 stat 資訊，之後的 git status 不需重新雜湊檔案。
+    """
+    entries = []
+    blobs: dict[bytes, bytes] = {}
+    for rel in paths:
+        full_path = os.path.join(project_path, os.fsdecode(rel))
+        st = os.lstat(full_path)
+        if stat.S_ISLNK(st.st_mode):
+            mode = 0o120000
+            data = os.fsencode(os.readlink(full_path))
+        else:
+            mode = 0o100755 if st.st_mode & 0o100 else 0o100644
+            with open(full_path, "rb") as f:
+                data = f.read()
+        sha = _git_blob_id(data)
+        blobs.setdefault(sha, data)
+        entries.append((rel, st, mode, sha))
+    entries.sort(key=lambda e: e[0])
+    if blobs:
+        _write_pack(git_dir, blobs)
+
+    body = bytearray(b"DIRC" + struct.pack(">II", 2, len(entries)))
+    mask = 0xFFFFFFFF
+    for path_bytes, st, mode, sha in entries:
+        start = len(body)
+        body += struct.pack(
+            ">10I",
+            int(st.st_ctime) & mask, st.st_ctime_ns % 1_000_000_000,
+            int(st.st_mtime) & mask, st.st_mtime_ns % 1_000_000_000,
+            st.st_dev & mask, st.st_ino & mask, mode,
+            st.st_uid & mask, st.st_gid & mask, st.st_size & mask,
+        )
+        body += sha + struct.pack(">H", min(len(path_bytes), 0xFFF)) + path_bytes
+        # 以 1-8 個 NUL 補齊到 8 位元組邊界
+        body += b"\0" * (8 - (len(body) - start) % 8)
+    body += hashlib.sha1(body).digest()
+
+    lock_path = git_dir / "index.lock"
+    lock_path.write_bytes(bytes(body))
+    os.replace(lock_path, git_dir / "index")
+    return len(entries)
+
+
+def _read_git_config(project_path: Path) -> dict[str, str]:
+    """git config --list 的結果 (包含系統、全域、-c 與 GIT_CONFIG_* 設定)：鍵 -> 最後一個值。"""
+    config = {}
+    for item in _git(project_path, "config", "--list", "-z").stdout.split(b"\0"):
+        if item:
+            key, newline, value = item.decode("utf-8", "replace").partition("\n")
+            # 沒有值的布林設定 (例如 [core] autocrlf) 代表 true
+            config[key.lower()] = value.strip().lower() if newline else "true"
+    return config
+
+
+def _has_entries(path: Path) -> bool:
+    """檔案存在且含有非註解、非空白的行。"""
+    try:
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return False
+    return any(line.strip() and not line.lstrip().startswith("#") for line in lines)
+
+
+def _prebuild_index_paths(project_path: Path, git_dir: Path) -> list[bytes] | None:
+    """git add . 會加入的檔案 (排序後)；git add 會做內容轉換或產生 gitlink 時回傳 None，改用 git add。
+
+    檔案清單由 git ls-files -o --exclude-standard 產生，因此與 git add 一樣套用 .gitignore、
+    .git/info/exclude (含 init.templateDir 的內容) 與全域的 core.excludesFile / $XDG_CONFIG_HOME/git/ignore。
+    """
+    config = _read_git_config(project_path)
+    if config.get("extensions.objectformat", "sha1") != "sha1":
+        return None
+    # 換行轉換 (core.autocrlf；core.safecrlf 只在有轉換時才會檢查) 與 filemode / symlinks 的替代表示
+    if config.get("core.autocrlf", "false") not in FALSE_VALUES:
+        return None
+    if config.get("core.filemode", "true") in FALSE_VALUES or config.get("core.symlinks", "true") in FALSE_VALUES:
+        return None
+    # 任何 gitattributes 來源都可能設定 text / eol / filter
+    xdg_config = Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config")
+    if config.get("core.attributesfile") or _has_entries(xdg_config / "git" / "attributes") or _has_entries(git_dir / "info" / "attributes"):
+        return None
+
+    listed = _git(project_path, "ls-files", "-z", "-o", "--exclude-standard").stdout
+    paths = sorted(path for path in listed.split(b"\0") if path)
+    total_bytes = 0
+    for path in paths:
+        # 巢狀儲存庫會被列為目錄 (結尾為 /)，git add 會將它視為 gitlink
+        if path.endswith(b"/") or path == b".gitattributes" or path.endswith(b"/.gitattributes"):
+            return None
+        # packfile 在記憶體中組合，大型工作樹交給 git add 處理
+        total_bytes += os.lstat(os.path.join(project_path, os.fsdecode(path))).st_size
+        if total_bytes > GIT_PACK_MAX_BYTES:
+            return None
+    return paths
+
+
+def bootstrap_git_repo(project_path: Path, message: str = GIT_INITIAL_COMMIT_MESSAGE) -> dict:
+    """初始化 git 儲存庫並建立初始提交，回傳 {method, files, seconds}。
+
+    預設以 git ls-files 取得 git add 會加入的檔案 (套用所有忽略規則)，blob 物件與 index
+    直接由 Python 寫入，再以預先建立的 index 執行單一 git commit。有 gitattributes、core.autocrlf
+    等會讓 git add 轉換內容的設定，或工作樹含有巢狀儲存庫時，退回 git init + git add + git commit。
+    SPECIFY_GIT_STRATEGY=porcelain 可強制使用傳統流程以比較耗時。
+    全程不切換工作目錄，可在多個執行緒中同時呼叫；失敗時拋出 subprocess.CalledProcessError。
+    """
+    started = time.perf_counter()
+    project_path = Path(project_path).resolve()
+    _git(project_path, "init", "-q")
+    git_dir = project_path / ".git"
+
+    method = "porcelain"
+    files = None
+    paths = None
+    if os.environ.get("SPECIFY_GIT_STRATEGY", "index") != "porcelain":
+        paths = _prebuild_index_paths(project_path, git_dir)
+    if paths is not None:
+        try:
+            files = _write_index(git_dir, project_path, paths)
+            method = "index"
+        except OSError:
+            (git_dir / "index").unlink(missing_ok=True)
+    if method == "porcelain":
+        _git(project_path, "add", ".")
+    _git(project_path, "commit", "-q", "-m", message)
+    return {"method": method, "files": files, "seconds": time.perf_counter() - started}
+
+
+def init_git_repo(project_path: Path, quiet: bool = False) -> bool:
+    """在指定路徑初始化 git 儲存庫。
+    quiet: 如果為 True 則抑制控制台輸出 (追蹤器處理狀態)
+    """
+    try:
+        if not quiet:
+            console.print("[cyan]正在初始化 git 儲存庫...[/cyan]")
+        result = bootstrap_git_repo(project_path)
+        if not quiet:
+            console.print(f"[green]✓[/green] Git 儲存庫初始化完成 [dim]({result['seconds'] * 1000:.0f} ms)[/dim]")
+        return True
+        
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        if not quiet:
+            console.print(f"[red]初始化 git 儲存庫時發生錯誤：[/red] {e}")
+        return False
+
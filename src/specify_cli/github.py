@@ -0,0 +1,504 @@
+"""GitHub 發布版本查詢與範本下載。"""
+
+import os
+import re
+import time
+import queue
+import random
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import typer
+import httpx
+
+from .cache import TemplateCache
+from .constants import TEMPLATE_REPO_OWNER, TEMPLATE_REPO_NAME
+from .http_client import api_base_url, mirror_url, rewrite_download_url, shared_client
+from .ui import console
+
+# 發布版本中繼資料在此秒數內直接使用磁碟上的副本，不重新驗證
+RELEASE_TTL_SECONDS = float(os.environ.get("SPECIFY_RELEASE_TTL", 600))
+
+# 下載緩衝：小於此大小的範本完全保存在記憶體中，超過才溢寫到暫存檔
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+DOWNLOAD_CHUNK_MIN = 64 * 1024
+DOWNLOAD_CHUNK_MAX = 1024 * 1024
+
+# 下載中斷時的重試：最多嘗試次數與指數退避的基準 / 上限秒數 (加上隨機抖動)
+DOWNLOAD_ATTEMPTS = int(os.environ.get("SPECIFY_DOWNLOAD_ATTEMPTS", 5))
+DOWNLOAD_BACKOFF = 1.0
+DOWNLOAD_BACKOFF_MAX = 30.0
+# 值得重試的 HTTP 狀態 (暫時性錯誤)；其餘 4xx 直接失敗
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+CONTENT_RANGE = re.compile(r"bytes (\d+)-")
+
+
+def github_headers() -> dict:
+    """GitHub API 共用標頭；設定 GITHUB_TOKEN 時附帶驗證以提高速率限制。
+    使用鏡像站時不送出 GitHub 權杖，改用 SPECIFY_MIRROR_TOKEN (如有)。
+    """
+    headers = {"Accept": "application/vnd.github+json"}
+    if mirror_url():
+        token = os.environ.get("SPECIFY_MIRROR_TOKEN")
+    else:
+        token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def fetch_latest_release(api_url: str, *, cache: TemplateCache | None = None, ttl: float = RELEASE_TTL_SECONDS, client: httpx.Client | None = None) -> tuple[dict, str]:
+    """取得最新發布版本的 JSON。
+
+    有快取時：TTL 內直接使用磁碟副本；過期則以 If-None-Match / If-Modified-Since
+    條件式請求重新驗證 (304 不計入速率限制)；網路失敗時退回使用過期副本。
+    回傳 (release_data, 快取狀態)，狀態為 fresh、revalidated、stale、miss 或 disabled。
+    未提供 client 時使用共用的用戶端 (見 http_client.shared_client)。
+    """
+    record = cache.load_release(api_url) if cache else None
+    if record and time.time() - record.get("fetched_at", 0) < ttl:
+        return record["data"], "fresh"
+
+    headers = github_headers()
+    if record:
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+
+    try:
+        response = (client or shared_client()).get(api_url, headers=headers)
+        if record and response.status_code == 304:
+            record["fetched_at"] = time.time()
+            status, data = "revalidated", record["data"]
+        else:
+            response.raise_for_status()
+            data = response.json()
+            status = "miss" if cache else "disabled"
+            record = {
+                "data": data,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            }
+    except httpx.HTTPError:
+        if record:
+            return record["data"], "stale"
+        raise
+
+    if cache:
+        try:
+            cache.save_release(api_url, record)
+        except OSError:
+            pass
+    return data, status
+
+
+def adaptive_chunk_size(total_size: int) -> int:
+    """依檔案大小決定讀取區塊大小：約切成 32 塊，介於 64 KiB 與 1 MiB 之間。"""
+    if total_size <= 0:
+        return DOWNLOAD_CHUNK_MIN * 4
+    return max(DOWNLOAD_CHUNK_MIN, min(DOWNLOAD_CHUNK_MAX, total_size // 32))
+
+
+def stream_to_sink(response: httpx.Response, sink, *, chunk_size: int, on_chunk=None, digest=None) -> str:
+    """將 HTTP 回應本體寫入 sink 並回傳 SHA-256。
+
+    寫入與雜湊在背景執行緒進行，透過有界佇列與網路接收重疊。
+    on_chunk 會在呼叫端執行緒以每個區塊的位元組數呼叫 (用於進度顯示)。
+    續傳時傳入已包含先前內容的 digest，回傳整個檔案的雜湊。
+    """
+    digest = digest if digest is not None else hashlib.sha256()
+    chunks: queue.Queue = queue.Queue(maxsize=16)
+    failure: list[BaseException] = []
+
+    def writer():
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            if failure:
+                continue
+            try:
+                sink.write(chunk)
+                digest.update(chunk)
+            except OSError as e:
+                failure.append(e)
+
+    thread = threading.Thread(target=writer, name="specify-download-writer", daemon=True)
+    thread.start()
+    # 自行合併成 chunk_size 的區塊：連線中斷時尚未湊滿的內容也會寫入，續傳不會遺失已收到的位元組
+    pending = bytearray()
+
+    def flush():
+        chunks.put(bytes(pending))
+        if on_chunk:
+            on_chunk(len(pending))
+        pending.clear()
+
+    try:
+        for data in response.iter_bytes():
+            if failure:
+                break
+            pending += data
+            if len(pending) >= chunk_size:
+                flush()
+    finally:
+        if pending and not failure:
+            flush()
+        chunks.put(None)
+        thread.join()
+    if failure:
+        raise failure[0]
+    return digest.hexdigest()
+
+
+class IncompleteDownload(Exception):
+    """連線結束時收到的位元組少於預期，可從目前位置續傳。"""
+
+
+class DownloadIntegrityError(ValueError):
+    """下載內容的大小或 SHA-256 與發布版本記錄不符。"""
+
+
+def expected_asset_sha256(asset: dict) -> str | None:
+    """GitHub 資產的 digest 欄位 (sha256:<hex>)；較舊的發布版本沒有此欄位。"""
+    algorithm, _, value = (asset.get("digest") or "").partition(":")
+    return value.lower() if algorithm == "sha256" and value else None
+
+
+def retry_delay(attempt: int, *, base: float = DOWNLOAD_BACKOFF, cap: float = DOWNLOAD_BACKOFF_MAX) -> float:
+    """第 attempt 次失敗後的等待秒數：指數退避的一半固定、一半隨機，避免多個下載同時重試。"""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, (httpx.TransportError, IncompleteDownload, DownloadIntegrityError))
+
+
+def _reset_sink(sink):
+    sink.seek(0)
+    sink.truncate(0)
+
+
+def download_resumable(
+    client,
+    url: str,
+    sink,
+    *,
+    expected_size: int = 0,
+    expected_sha256: str | None = None,
+    attempts: int = DOWNLOAD_ATTEMPTS,
+    on_progress=None,
+    on_retry=None,
+) -> dict:
+    """下載到可讀寫的 sink；sink 中已有的內容 (先前中斷留下的 .part) 以 Range 請求續傳。
+
+    連線錯誤、提前結束與暫時性 HTTP 錯誤依抖動的指數退避重試，最多 attempts 次，每次都從目前位置續傳。
+    完成後檢查大小與 SHA-256，不符時清空 sink 從頭下載 (計入嘗試次數)。
+    on_progress(已收到的位元組) 用於進度顯示；on_retry(attempt, offset, reason) 在每次重試前呼叫。
+    回傳 {sha256, attempts, resumed_bytes, verified}；resumed_bytes 為續傳而免於重新下載的位元組。
+    """
+    digest = hashlib.sha256()
+    sink.seek(0)
+    for block in iter(lambda: sink.read(DOWNLOAD_CHUNK_MAX), b""):
+        digest.update(block)
+    offset = sink.tell()
+    if expected_size and offset > expected_size:
+        _reset_sink(sink)
+        digest, offset = hashlib.sha256(), 0
+    chunk_size = adaptive_chunk_size(expected_size)
+    resumed = 0
+    etag = None
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            if on_progress:
+                on_progress(offset)
+            if not (offset and offset == expected_size):
+                headers = {}
+                if offset:
+                    headers["Range"] = f"bytes={offset}-"
+                    if etag:
+                        headers["If-Range"] = etag
+                with client.stream("GET", url, headers=headers, follow_redirects=True) as response:
+                    if response.status_code == 416 and offset:
+                        # 伺服器認為已沒有剩餘內容：交由大小與雜湊檢查判斷
+                        pass
+                    else:
+                        response.raise_for_status()
+                        etag = response.headers.get("ETag") or etag
+                        match = CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                        if offset and response.status_code == 206 and match and int(match.group(1)) == offset:
+                            resumed += offset
+                        elif offset:
+                            # 伺服器不支援 Range (或內容已變更)：從頭下載
+                            _reset_sink(sink)
+                            digest, offset = hashlib.sha256(), 0
+                            if on_progress:
+                                on_progress(0)
+                        received = offset
+
+                        def advance(n: int):
+                            nonlocal received
+                            received += n
+                            if on_progress:
+                                on_progress(received)
+
+                        stream_to_sink(response, sink, chunk_size=chunk_size, on_chunk=advance, digest=digest)
+                offset = sink.tell()
+            if expected_size and offset < expected_size:
+                raise IncompleteDownload(f"只收到 {offset:,} / {expected_size:,} bytes")
+            sha256 = digest.hexdigest()
+            if expected_size and offset != expected_size:
+                problem = f"大小不符：預期 {expected_size:,} bytes，實際 {offset:,} bytes"
+            elif expected_sha256 and sha256 != expected_sha256:
+                problem = f"SHA-256 不符：預期 {expected_sha256[:12]}，實際 {sha256[:12]}"
+            else:
+                problem = None
+            if problem:
+                # 內容已損毀，續傳沒有意義：清空後從頭下載
+                _reset_sink(sink)
+                digest, offset = hashlib.sha256(), 0
+                raise DownloadIntegrityError(problem)
+            return {
+                "sha256": sha256,
+                "attempts": attempt,
+                "resumed_bytes": resumed,
+                "verified": "sha256" if expected_sha256 else "size" if expected_size else None,
+            }
+        except Exception as e:
+            if attempt >= attempts or not _retryable(e):
+                raise
+            offset = sink.seek(0, os.SEEK_END)
+            if on_retry:
+                on_retry(attempt, offset, str(e) or type(e).__name__)
+            time.sleep(retry_delay(attempt))
+
+
+def latest_release_url() -> str:
+    return f"{api_base_url()}/repos/{TEMPLATE_REPO_OWNER}/{TEMPLATE_REPO_NAME}/releases/latest"
+
+
+def download_template_from_github(ai_assistant: str, *, verbose: bool = True, show_progress: bool = True, cache: TemplateCache | None = None, offline: bool = False, client: httpx.Client | None = None, release: tuple[dict, str] | None = None, on_retry=None):
+    """使用 HTTP 請求從 GitHub 下載最新的範本發布版本。
+
+    下載內容不會寫到目前目錄：提供 cache 時直接寫入快取 (寫入一次、之後重複使用)，
+    否則保存在記憶體緩衝 (超過 SPOOL_MAX_BYTES 才溢寫到暫存檔)。
+    offline 為 True 時完全不連線，只使用快取中最新的範本。
+    release (fetch_latest_release 的結果) 讓多個下載共用發布版本資訊；未提供 client 時使用共用的用戶端。
+    設定 SPECIFY_MIRROR_URL 時改從鏡像站下載資產。
+    下載中斷時自動續傳並重試 (見 download_resumable)，on_retry(attempt, offset, reason) 在每次重試前呼叫；
+    完成後以資產大小與 GitHub 記錄的 SHA-256 驗證內容。
+    回傳 (archive, metadata_dict)；archive 為可隨機讀取的二進位檔案物件，由呼叫端關閉。
+    """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    if offline:
+        hit = cache.latest_for(ai_assistant) if cache else None
+        if hit is None:
+            if verbose:
+                console.print(f"[red]錯誤：[/red] 離線模式下找不到 AI 助理 '{ai_assistant}' 的快取範本")
+            raise typer.Exit(1)
+        zip_path, entry = hit
+        if verbose:
+            console.print(f"[cyan]使用快取範本：[/cyan] {entry['asset']} ({entry['release']})")
+        return open(zip_path, "rb"), {
+            "filename": entry["asset"],
+            "size": entry["size"],
+            "release": entry["release"],
+            "asset_url": entry.get("asset_url", ""),
+            "sha256": entry["sha256"],
+            "cached": True,
+            "cache_hit": True,
+            "release_cache": "offline",
+        }
+    
+    if release is None:
+        if verbose:
+            console.print("[cyan]正在取得最新發布版本資訊...[/cyan]")
+        try:
+            release = fetch_latest_release(latest_release_url(), cache=cache, client=client)
+        except httpx.HTTPError as e:
+            if verbose:
+                console.print(f"[red]取得發布版本資訊時發生錯誤：[/red] {e}")
+            raise typer.Exit(1)
+    release_data, release_cache = release
+    
+    # 尋找指定 AI 助理的範本資產
+    pattern = f"spec-kit-template-{ai_assistant}"
+    matching_assets = [
+        asset for asset in release_data.get("assets", [])
+        if pattern in asset["name"] and asset["name"].endswith(".zip")
+    ]
+    
+    if not matching_assets:
+        if verbose:
+            console.print(f"[red]錯誤：[/red] 找不到 AI 助理 '{ai_assistant}' 的範本")
+            console.print("[yellow]可用資產：[/yellow]")
+            for asset in release_data.get("assets", []):
+                console.print(f"  - {asset['name']}")
+        raise typer.Exit(1)
+    
+    # 使用第一個匹配的資產
+    asset = matching_assets[0]
+    download_url = rewrite_download_url(asset["browser_download_url"])
+    filename = asset["name"]
+    file_size = asset["size"]
+    metadata = {
+        "filename": filename,
+        "size": file_size,
+        "release": release_data["tag_name"],
+        "asset_url": download_url,
+        "cached": False,
+        "cache_hit": False,
+        "release_cache": release_cache,
+    }
+    
+    if verbose:
+        console.print(f"[cyan]找到範本：[/cyan] {filename}")
+        console.print(f"[cyan]大小：[/cyan] {file_size:,} bytes")
+        console.print(f"[cyan]發布版本：[/cyan] {release_data['tag_name']}")
+
+    # 快取命中時直接使用，不需下載 (發布版本記錄了 SHA-256 時，內容不符的快取項目不使用)
+    expected_sha256 = expected_asset_sha256(asset)
+    if cache:
+        hit = cache.lookup(release_data["tag_name"], filename)
+        if hit is not None and expected_sha256 in (None, hit[1]["sha256"]):
+            zip_path, entry = hit
+            if verbose:
+                console.print(f"[cyan]使用快取範本：[/cyan] {zip_path}")
+            metadata.update(sha256=entry["sha256"], cached=True, cache_hit=True)
+            return open(zip_path, "rb"), metadata
+    
+    # 下載檔案：有快取時寫入資產專屬的 .part (中斷後可續傳)，否則寫入記憶體緩衝
+    staging_path = None
+    partial = False
+    if cache:
+        try:
+            staging_path = cache.partial_path(release_data["tag_name"], filename)
+            partial = staging_path is not None
+            # 同一資產正由其他程序下載：改用唯一的暫存路徑 (不續傳)
+            staging_path = staging_path or cache.staging_path()
+        except OSError as e:
+            if verbose:
+                console.print(f"[yellow]無法寫入範本快取：[/yellow] {e}")
+    sink = open(staging_path, "a+b") if staging_path else tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    if verbose:
+        console.print("[cyan]正在下載範本...[/cyan]")
+
+    def retrying(attempt: int, offset: int, reason: str):
+        if on_retry:
+            on_retry(attempt, offset, reason)
+        if verbose:
+            resume = f"，從 {offset:,} bytes 續傳" if offset else ""
+            console.print(f"[yellow]下載中斷 ({reason})，第 {attempt} 次重試{resume}[/yellow]")
+
+    try:
+        if show_progress:
+            # 顯示進度條 (續傳時從已收到的位元組開始)
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+                console=console,
+            ) as progress:
+                task = progress.add_task("正在下載...", total=file_size or None)
+                outcome = download_resumable(
+                    client or shared_client(), download_url, sink,
+                    expected_size=file_size, expected_sha256=expected_sha256,
+                    on_progress=lambda done: progress.update(task, completed=done),
+                    on_retry=retrying,
+                )
+        else:
+            outcome = download_resumable(
+                client or shared_client(), download_url, sink,
+                expected_size=file_size, expected_sha256=expected_sha256, on_retry=retrying,
+            )
+    except (httpx.HTTPError, IncompleteDownload, DownloadIntegrityError, OSError) as e:
+        if verbose:
+            console.print(f"[red]下載範本時發生錯誤：[/red] {e}")
+        sink.close()
+        if staging_path and not partial:
+            staging_path.unlink(missing_ok=True)
+        if partial:
+            # 保留已收到內容的 .part，下次下載從中斷處繼續
+            if staging_path.stat().st_size == 0:
+                staging_path.unlink()
+            cache.release_partial(staging_path)
+        raise typer.Exit(1)
+    except BaseException:
+        sink.close()
+        if partial:
+            cache.release_partial(staging_path)
+        raise
+    metadata.update(
+        sha256=outcome["sha256"],
+        attempts=outcome["attempts"],
+        resumed_bytes=outcome["resumed_bytes"],
+        verified=outcome["verified"],
+    )
+    if verbose:
+        console.print(f"已下載：{filename}")
+
+    if staging_path is None:
+        sink.seek(0)
+        return sink, metadata
+
+    # 存入快取 (同目錄內重新命名) 並淘汰過期項目
+    sink.close()
+    try:
+        zip_path = cache.store(staging_path, metadata["release"], filename, sha256=metadata["sha256"], asset_url=download_url)
+    except OSError as e:
+        if verbose:
+            console.print(f"[yellow]無法寫入範本快取索引：[/yellow] {e}")
+        # 檔案仍在 blobs 目錄中，未被引用的部分會在下次 prune 時清除
+        zip_path = cache.blob_path(metadata["sha256"])
+        if not zip_path.exists():
+            zip_path = staging_path
+        return open(zip_path, "rb"), metadata
+    finally:
+        if partial:
+            cache.release_partial(staging_path)
+    metadata["cached"] = True
+    try:
+        cache.prune()
+    except OSError:
+        pass
+    return open(zip_path, "rb"), metadata
+
+
+def download_error_message(error: Exception) -> str:
+    # download_template_from_github 已在內部處理的錯誤以 typer.Exit 結束
+    return "下載失敗" if isinstance(error, typer.Exit) else str(error)
+
+
+def iter_template_downloads(ai_assistants: list[str], *, cache: TemplateCache | None, offline: bool, client: httpx.Client, release: tuple[dict, str] | None):
+    """透過共用連線池並行下載多個助理的範本。
+    依完成順序在呼叫端執行緒產生 (ai, (archive, metadata))；失敗時第二個值為例外。
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(ai_assistants))) as pool:
+        futures = {
+            pool.submit(
+                download_template_from_github,
+                ai,
+                verbose=False,
+                show_progress=False,
+                cache=cache,
+                offline=offline,
+                client=client,
+                release=release,
+            ): ai
+            for ai in ai_assistants
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
@@ -0,0 +1,102 @@
+"""所有網路請求共用的 httpx.Client。
+
+同一次執行中的發布版本查詢、範本下載與 specify check 都透過同一個連線池 (保持連線，有 h2 時使用 HTTP/2)，
+不必為每個請求重新進行 TLS 交握。以環境變數設定：
+
+- SPECIFY_HTTP_CONNECT_TIMEOUT / SPECIFY_HTTP_READ_TIMEOUT：連線與讀取逾時秒數 (預設 10 / 30)
+- SPECIFY_PROXY：代理伺服器 URL；未設定時沿用 HTTPS_PROXY、ALL_PROXY 與 NO_PROXY
+- SPECIFY_CA_BUNDLE：自訂 CA 憑證 (PEM 檔案或目錄)；未設定時沿用 REQUESTS_CA_BUNDLE、SSL_CERT_FILE 與 SSL_CERT_DIR
+- SPECIFY_MIRROR_URL：鏡像站基底 URL，同時取代 https://api.github.com 與 https://github.com
+- SPECIFY_MIRROR_TOKEN：鏡像站的驗證權杖 (使用鏡像站時不會送出 GITHUB_TOKEN)
+- SPECIFY_HTTP2=0：停用 HTTP/2
+"""
+
+import os
+import ssl
+import atexit
+import threading
+import importlib.util
+from pathlib import Path
+
+import httpx
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_WEB_URL = "https://github.com"
+
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("SPECIFY_HTTP_CONNECT_TIMEOUT", 10))
+HTTP_READ_TIMEOUT = float(os.environ.get("SPECIFY_HTTP_READ_TIMEOUT", 30))
+# 連線池：批次模式與多助理下載會同時發出多個請求
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE = 10
+HTTP_KEEPALIVE_EXPIRY = 30.0
+
+_shared_client: httpx.Client | None = None
+_shared_lock = threading.Lock()
+
+
+def http2_available() -> bool:
+    """httpx 的 HTTP/2 支援需要選用的 h2 套件；SPECIFY_HTTP2=0 時停用。"""
+    if os.environ.get("SPECIFY_HTTP2", "1").strip().lower() in ("0", "false", "no", "off"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def mirror_url() -> str | None:
+    """SPECIFY_MIRROR_URL (移除結尾斜線)；未設定時為 None。"""
+    return os.environ.get("SPECIFY_MIRROR_URL", "").strip().rstrip("/") or None
+
+
+def api_base_url() -> str:
+    """GitHub API 的基底 URL：有鏡像站時使用鏡像站。"""
+    return mirror_url() or GITHUB_API_URL
+
+
+def rewrite_download_url(url: str) -> str:
+    """有鏡像站時將 https://github.com/<路徑> 改寫為 <鏡像站>/<路徑>，其餘 URL 不變。"""
+    mirror = mirror_url()
+    if mirror and url.startswith(GITHUB_WEB_URL + "/"):
+        return mirror + url[len(GITHUB_WEB_URL):]
+    return url
+
+
+def http_timeout(*, connect: float | None = None, read: float | None = None) -> httpx.Timeout:
+    """連線與讀取分開的逾時 (寫入與等待連線池沿用讀取逾時)。"""
+    return httpx.Timeout(read if read is not None else HTTP_READ_TIMEOUT, connect=connect if connect is not None else HTTP_CONNECT_TIMEOUT)
+
+
+def ssl_verify() -> ssl.SSLContext | bool:
+    """自訂 CA 憑證時回傳只信任該憑證的 SSLContext，否則使用 httpx 的預設 (含 SSL_CERT_FILE / SSL_CERT_DIR)。"""
+    bundle = os.environ.get("SPECIFY_CA_BUNDLE") or os.environ.get("REQUESTS_CA_BUNDLE")
+    if not bundle:
+        return True
+    path = Path(bundle).expanduser()
+    if path.is_dir():
+        return ssl.create_default_context(capath=str(path))
+    return ssl.create_default_context(cafile=str(path))
+
+
+def create_client(*, timeout: httpx.Timeout | None = None) -> httpx.Client:
+    """依環境變數設定建立新的 httpx.Client；一般情況請使用 shared_client()。"""
+    return httpx.Client(
+        http2=http2_available(),
+        follow_redirects=True,
+        timeout=timeout or http_timeout(),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        verify=ssl_verify(),
+        proxy=os.environ.get("SPECIFY_PROXY") or None,
+        trust_env=True,
+    )
+
+
+def shared_client() -> httpx.Client:
+    """本行程共用的用戶端：第一次使用時建立，結束時關閉。可在多個執行緒中同時使用。"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None or _shared_client.is_closed:
+            _shared_client = create_client()
+            atexit.register(_shared_client.close)
+        return _shared_client
@@ -0,0 +1,304 @@
+"""specs/*/ 文件的結構檢查：必要章節、未解決的標記、憲章閘門與任務編號。
+
+每個檔案只逐行掃描一次。結果依內容雜湊快取，未變更的檔案 (大小與修改時間相同) 完全不需讀取；
+需要檢查的檔案很多時分散到多個行程。
+"""
+
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from .agent_context import write_atomic
+
+LINT_VERSION = 1
+ARTIFACT_KINDS = ("spec.md", "plan.md", "tasks.md")
+# 需要檢查的檔案數達到此數量時才啟動行程池 (行程啟動成本高於少量檔案的檢查時間)
+LINT_PARALLEL_THRESHOLD = 64
+
+# 各文件必要的 ## 章節 (每個章節的可能標題)
+REQUIRED_SECTIONS = {
+    "spec.md": (
+        ("使用者情境與測試", "User Scenarios & Testing"),
+        ("需求", "Requirements"),
+        ("審查與接受檢查清單", "Review & Acceptance Checklist"),
+    ),
+    "plan.md": (
+        ("摘要", "Summary"),
+        ("技術背景", "Technical Context"),
+        ("憲法檢查", "Constitution Check"),
+        ("專案結構", "Project Structure"),
+        ("進度追蹤", "Progress Tracking"),
+    ),
+    "tasks.md": (
+        ("相依性", "Dependencies"),
+    ),
+}
+# 範本中給 AI 的指示章節，其中的標記與佔位符是說明文字，不檢查
+GUIDANCE_SECTIONS = ("執行流程", "Execution Flow", "快速指導原則", "Quick Guidelines", "任務產生規則", "Task Generation Rules")
+# 必須全部勾選的閘門檢查清單：(文件, 所在章節, 起始行前綴；None 表示整個章節)
+GATE_CHECKLISTS = (
+    ("spec.md", ("審查與接受檢查清單", "Review & Acceptance Checklist"), None),
+    ("plan.md", ("進度追蹤", "Progress Tracking"), ("**閘門狀態**", "**Gate Status**")),
+)
+CONSTITUTION_SECTIONS = ("憲法檢查", "Constitution Check")
+TECHNICAL_CONTEXT_SECTIONS = ("技術背景", "Technical Context")
+PRINCIPLE_SECTIONS = ("核心原則", "Core Principles")
+
+CLARIFICATION_MARKER = re.compile(r"\[NEEDS CLARIFICATION:[^\]]*\]")
+# plan.md 技術背景欄位的值仍待釐清，例如「**測試**：NEEDS CLARIFICATION」
+CLARIFICATION_FIELD = re.compile(r"^\*\*[^*]+\*\*\s*[:：]\s*[^\[]*NEEDS CLARIFICATION")
+PLACEHOLDER = re.compile(r"\[(?:FEATURE(?: NAME)?|PROJECT NAME|DATE|###-feature-name|#|例如[^\]]*|e\.g\.[^\]]*)\]")
+CHECKBOX = re.compile(r"^\s*[-*]\s*\[( |x|X)\]\s*(.*)$")
+_TRAILING_NOTE = re.compile(r"\s*[_*]*[（(][^）)]*[）)][_*]*\s*$")
+_LEADING_SYMBOLS = re.compile(r"^[^\w\[]+")
+
+
+def section_title(heading: str) -> str:
+    """去除標題前的 # 與符號，以及結尾的註記 (例如「⚡ 快速指導原則」-> 「快速指導原則」、「需求 _（必要）_」-> 「需求」)。"""
+    return _TRAILING_NOTE.sub("", _LEADING_SYMBOLS.sub("", heading.lstrip("#").strip())).strip()
+
+
+def _matches(title: str, candidates: tuple[str, ...]) -> bool:
+    return title.lower() in (c.lower() for c in candidates)
+
+
+def load_constitution_principles(repo_root: Path) -> tuple[str, ...]:
+    """讀取 memory/constitution.md 核心原則的名稱 (略過尚未填寫的範本佔位符)。"""
+    path = repo_root / "memory" / "constitution.md"
+    principles = []
+    in_principles = False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("## "):
+                    in_principles = _matches(section_title(line), PRINCIPLE_SECTIONS)
+                elif in_principles and line.startswith("### "):
+                    name = re.sub(r"^[IVXLC]+\.\s*", "", section_title(line))
+                    if name and not name.startswith("["):
+                        principles.append(name)
+    except OSError:
+        pass
+    return tuple(principles)
+
+
+def _finding(line: int | None, severity: str, rule: str, message: str) -> dict:
+    return {"line": line, "severity": severity, "rule": rule, "message": message}
+
+
+def lint_text(text: str, kind: str, principles: tuple[str, ...] = ()) -> list[dict]:
+    """逐行檢查一份文件，回傳問題清單 (不含路徑)。"""
+    findings = []
+    seen_sections = set()
+    in_fence = False
+    # 目前 ## 章節的屬性，只在遇到標題時計算
+    guidance = in_constitution = in_technical = gate_active = False
+    gate_starts: tuple[str, ...] = ()
+    constitution_text = []
+    gates = [(titles, start) for gate_kind, titles, start in GATE_CHECKLISTS if gate_kind == kind]
+
+    for number, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        if line.startswith("#"):
+            if line.startswith("## "):
+                title = section_title(line)
+                seen_sections.add(title.lower())
+                guidance = _matches(title, GUIDANCE_SECTIONS)
+                in_constitution = _matches(title, CONSTITUTION_SECTIONS)
+                in_technical = kind == "plan.md" and _matches(title, TECHNICAL_CONTEXT_SECTIONS)
+                section_gates = [start for titles, start in gates if _matches(title, titles)]
+                gate_active = None in section_gates
+                gate_starts = tuple(prefix for start in section_gates if start for prefix in start)
+            elif line.startswith("# "):
+                guidance = False
+            if PLACEHOLDER.search(line):
+                findings.append(_finding(number, "warning", "placeholder", f"標題仍有範本佔位符：{stripped}"))
+            continue
+        if guidance:
+            continue
+
+        if in_constitution:
+            constitution_text.append(line)
+        if gate_starts and stripped.startswith(gate_starts):
+            gate_active = True
+        if "NEEDS CLARIFICATION" in line:
+            for marker in CLARIFICATION_MARKER.finditer(line):
+                findings.append(_finding(number, "error", "needs-clarification", f"未解決的標記：{marker.group()}"))
+            if in_technical and CLARIFICATION_FIELD.match(stripped):
+                findings.append(_finding(number, "error", "needs-clarification", f"技術背景仍待釐清：{stripped}"))
+        if "[" in line:
+            for placeholder in PLACEHOLDER.finditer(line):
+                findings.append(_finding(number, "warning", "placeholder", f"未填寫的範本佔位符：{placeholder.group()}"))
+        if gate_active:
+            checkbox = CHECKBOX.match(line)
+            if checkbox and checkbox.group(1) == " ":
+                findings.append(_finding(number, "warning", "gate", f"閘門尚未通過：{checkbox.group(2)}"))
+
+    for candidates in REQUIRED_SECTIONS.get(kind, ()):
+        if not any(c.lower() in seen_sections for c in candidates):
+            findings.append(_finding(None, "error", "missing-section", f"缺少必要章節：## {candidates[0]}"))
+
+    if kind == "plan.md" and principles and any(_matches(s, CONSTITUTION_SECTIONS) for s in seen_sections):
+        checked = "\n".join(constitution_text).lower()
+        for principle in principles:
+            if principle.lower() not in checked:
+                findings.append(_finding(None, "warning", "constitution", f"憲法檢查未涵蓋憲章原則：{principle}"))
+
+    if kind == "tasks.md":
+        findings.extend(_lint_tasks(text))
+    return findings
+
+
+def _lint_tasks(text: str) -> list[dict]:
+    from .tasks import build_task_graph, parse_tasks
+
+    try:
+        tasks, edges = parse_tasks(text)
+    except ValueError as e:
+        return [_finding(None, "error", "task-format", str(e))]
+    findings = []
+    highest = 0
+    seen = set()
+    for task in tasks:
+        number = int(task["id"][1:])
+        if number in seen:
+            findings.append(_finding(None, "error", "task-id", f"重複的任務編號：{task['id']}"))
+        elif number < highest:
+            findings.append(_finding(None, "warning", "task-id", f"任務編號未依順序：{task['id']} 在 T{highest:03d} 之後"))
+        elif number > highest + 1:
+            missing = "、".join(f"T{n:03d}" for n in range(highest + 1, number))
+            findings.append(_finding(None, "warning", "task-id", f"任務編號不連續，缺少 {missing}"))
+        seen.add(number)
+        highest = max(highest, number)
+
+    graph = build_task_graph(tasks, edges)
+    for cycle in graph["cycles"]:
+        findings.append(_finding(None, "error", "task-graph", f"循環相依：{' → '.join(cycle)}"))
+    for conflict in graph["conflicts"]:
+        findings.append(_finding(None, "error", "task-graph", f"平行任務 {'、'.join(conflict['tasks'])} 都修改 {conflict['file']}"))
+    for warning in graph["warnings"]:
+        if not warning.startswith("重複的任務編號"):
+            findings.append(_finding(None, "warning", "task-graph", warning))
+    return findings
+
+
+def discover_artifacts(paths: list[Path]) -> list[Path]:
+    """展開要檢查的檔案：檔案直接加入；目錄包含 specs/ 時改用 specs/，否則檢查目錄本身與其子目錄中的文件。
+    不存在的路徑也原樣加入，由 lint_paths 回報為錯誤 (避免打錯路徑時檢查 0 個檔案而通過)。
+    """
+    found = []
+    for path in paths:
+        if path.is_file() or not path.exists():
+            found.append(path)
+            continue
+        if (path / "specs").is_dir():
+            path = path / "specs"
+        dirs = [path]
+        try:
+            with os.scandir(path) as entries:
+                dirs += sorted(Path(e.path) for e in entries if e.is_dir() and not e.name.startswith("."))
+        except FileNotFoundError:
+            continue
+        for directory in dirs:
+            found.extend(directory / kind for kind in ARTIFACT_KINDS if (directory / kind).is_file())
+    return list(dict.fromkeys(p.resolve() for p in found))
+
+
+def _lint_job(args: tuple[str, str, tuple[str, ...]]) -> list[dict]:
+    return lint_text(*args)
+
+
+class LintCache:
+    """以檔案路徑為鍵的結果快取；大小、修改時間與憲章原則都相同時不讀檔，內容雜湊相同時不重新檢查。"""
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self.files: dict = {}
+        self.dirty = False
+        if path is None:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == LINT_VERSION:
+                self.files = data["files"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+    def save(self):
+        if self.path is not None and self.dirty:
+            write_atomic(self.path, json.dumps({"version": LINT_VERSION, "files": self.files}, ensure_ascii=False))
+
+
+def lint_paths(paths: list[Path], *, repo_root: Path, cache_path: Path | None = None, jobs: int = 1) -> dict:
+    """檢查所有文件，回傳 {files, checked, cached, errors, warnings, findings}。"""
+    files = discover_artifacts(paths)
+    principles = load_constitution_principles(repo_root)
+    # plan.md 的結果也取決於憲章原則：每次執行只雜湊一次，原則改變時不使用大小 / 修改時間的快速路徑
+    principles_digest = hashlib.sha256("\n".join(principles).encode("utf-8")).hexdigest()[:16]
+    cache = LintCache(cache_path)
+    results: dict[str, list[dict]] = {}
+    pending = []  # (路徑字串, 快取鍵, 原則雜湊, stat, 檢查參數)
+    cached = 0
+    for path in files:
+        kind = path.name if path.name in ARTIFACT_KINDS else None
+        key_path = str(path)
+        if not path.exists():
+            results[key_path] = [_finding(None, "error", "missing-path", "找不到檔案或目錄")]
+            continue
+        if kind is None:
+            results[key_path] = [_finding(None, "error", "unknown-artifact", f"不支援的檔案：{path.name} (僅支援 {', '.join(ARTIFACT_KINDS)})")]
+            continue
+        st = path.stat()
+        entry = cache.files.get(key_path)
+        context_digest = principles_digest if kind == "plan.md" else ""
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns and entry.get("context") == context_digest:
+            results[key_path] = entry["findings"]
+            cached += 1
+            continue
+        data = path.read_bytes()
+        context = "\n".join(principles) if kind == "plan.md" else ""
+        digest = hashlib.sha256(f"{LINT_VERSION}\0{kind}\0{context}\0".encode("utf-8") + data).hexdigest()
+        if entry and entry["key"] == digest:
+            entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns, context=context_digest)
+            cache.dirty = True
+            results[key_path] = entry["findings"]
+            cached += 1
+            continue
+        pending.append((key_path, digest, context_digest, st, (data.decode("utf-8", errors="replace"), kind, principles)))
+
+    if len(pending) >= LINT_PARALLEL_THRESHOLD and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(pending) // (jobs * 4))
+            outputs = pool.map(_lint_job, [job for *_, job in pending], chunksize=chunksize)
+            checked = list(outputs)
+    else:
+        checked = [_lint_job(job) for *_, job in pending]
+    for (key_path, digest, context_digest, st, _), findings in zip(pending, checked):
+        results[key_path] = findings
+        cache.files[key_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "context": context_digest, "key": digest, "findings": findings}
+        cache.dirty = True
+    cache.save()
+
+    findings = []
+    for path in files:
+        try:
+            display = path.relative_to(repo_root).as_posix()
+        except ValueError:
+            display = str(path)
+        findings.extend({"path": display, **finding} for finding in results[str(path)])
+    return {
+        "files": len(files),
+        "checked": len(pending),
+        "cached": cached,
+        "errors": sum(f["severity"] == "error" for f in findings),
+        "warnings": sum(f["severity"] == "warning" for f in findings),
+        "findings": findings,
+    }
@@ -0,0 +1,222 @@
+"""本機範本來源：不連線，直接由範本原始碼或預先建置的 ZIP 提供範本。
+
+由原始碼建置時的轉換與 .github/workflows/release.yml 的 generate_commands 相同。
+"""
+
+import io
+import re
+import json
+import time
+import zipfile
+import hashlib
+from pathlib import Path
+
+from .constants import SHARED_TEMPLATE_DIRS
+from .render import compile_template
+
+# 各 AI 助理的指令目錄、副檔名與 {ARGS} 的替換內容 (對應 release.yml)
+AGENT_COMMAND_LAYOUTS = {
+    "claude": (".claude/commands", "md", "$ARGUMENTS"),
+    "gemini": (".gemini/commands", "toml", "{{args}}"),
+    "copilot": (".github/prompts", "prompt.md", "$ARGUMENTS"),
+}
+
+# 各助理額外複製的檔案 (來源相對路徑 -> 範本中的路徑)，來源不存在時略過
+AGENT_EXTRA_FILES = {
+    "gemini": {"agent_templates/gemini/GEMINI.md": "GEMINI.md"},
+}
+
+COMMANDS_DIR = "templates/commands"
+
+
+def render_command(text: str, ext: str, arg_format: str) -> str:
+    """將 templates/commands/*.md 轉換為指定格式的指令檔內容。"""
+    lines = text.split("\n")
+    description = ""
+    for line in lines:
+        if line.startswith("description:"):
+            description = re.sub(r'"$', "", re.sub(r'^description: *"?', "", line)).replace("\r", "")
+            break
+    # 取第二個 --- 之後的內容 (略過 front matter)，與 shell 的 $(...) 一樣去除結尾換行
+    separators = [i for i, line in enumerate(lines) if line == "---"]
+    body = lines[separators[1] + 1:] if len(separators) >= 2 else []
+    # 指令本文依內容雜湊快取編譯結果，同一份指令為多個助理渲染時只解析一次
+    content = compile_template("\n".join(body).rstrip("\n")).render({"ARGS": arg_format})
+
+    if ext == "toml":
+        return f'description = "{description}"\n\nprompt = """\n{content}\n"""\n'
+    if ext == "prompt.md":
+        title = re.sub(r"\. .*", "", description)
+        return f"# {title}\n\n{content}\n"
+    return f"{content}\n"
+
+
+def is_template_source(path: Path) -> bool:
+    """檢查路徑是否為範本原始碼目錄 (含 templates/commands)。"""
+    return (path / COMMANDS_DIR).is_dir()
+
+
+# 範本 ZIP 內的檔案清單 (各檔案的 SHA-256)，解壓縮後留在專案中供快取驗證與差異更新使用
+MANIFEST_DIR = ".specify"
+MANIFEST_VERSION = 1
+# 可重現的 ZIP 使用的固定時間 (SOURCE_DATE_EPOCH 優先，否則為 ZIP 格式可表示的最早時間)
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def manifest_name(ai_assistant: str) -> str:
+    return f"{MANIFEST_DIR}/manifest-{ai_assistant}.json"
+
+
+def read_template_sources(source_dir: Path) -> dict:
+    """讀取範本原始碼一次，回傳可供所有助理共用的記憶體檔案集。
+
+    shared 為 memory/、scripts/、templates/ (不含 commands) 的 {路徑: (內容, 權限, 修改時間)}，
+    commands 為 {指令名稱: (內容, 修改時間)}，extra 為各助理額外檔案。
+    """
+    source_dir = Path(source_dir).resolve()
+    if not is_template_source(source_dir):
+        raise FileNotFoundError(f"{source_dir} 不是範本原始碼目錄 (找不到 {COMMANDS_DIR})")
+
+    def read(path: Path) -> tuple[bytes, int, float]:
+        st = path.stat()
+        with open(path, "rb") as f:
+            return f.read(), st.st_mode & 0o777, st.st_mtime
+
+    shared = {}
+    for top in SHARED_TEMPLATE_DIRS:
+        base = source_dir / top
+        if not base.is_dir():
+            continue
+        for path in sorted(base.rglob("*")):
+            rel = path.relative_to(source_dir).as_posix()
+            if path.is_file() and not rel.startswith(f"{COMMANDS_DIR}/"):
+                shared[rel] = read(path)
+    commands = {}
+    for template in sorted((source_dir / COMMANDS_DIR).glob("*.md")):
+        if template.is_file():
+            commands[template.stem] = (template.read_text(encoding="utf-8"), template.stat().st_mtime)
+    extra = {}
+    for ai, files in AGENT_EXTRA_FILES.items():
+        extra[ai] = {arcname: read(source_dir / source) for source, arcname in files.items() if (source_dir / source).is_file()}
+    return {"source_dir": source_dir, "shared": shared, "commands": commands, "extra": extra}
+
+
+def agent_template_files(sources: dict, ai_assistant: str) -> dict:
+    """組合指定助理的範本檔案 {路徑: (內容, 權限, 修改時間)}：共用檔案、產生的指令檔與額外檔案。"""
+    if ai_assistant not in AGENT_COMMAND_LAYOUTS:
+        raise ValueError(f"不支援的 AI 助理 '{ai_assistant}'")
+    command_dir, ext, arg_format = AGENT_COMMAND_LAYOUTS[ai_assistant]
+    files = dict(sources["shared"])
+    for name, (text, mtime) in sources["commands"].items():
+        files[f"{command_dir}/{name}.{ext}"] = (render_command(text, ext, arg_format).encode("utf-8"), 0o644, mtime)
+    files.update(sources["extra"].get(ai_assistant, {}))
+    return files
+
+
+def template_manifest(files: dict, ai_assistant: str, release: str) -> dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "agent": ai_assistant,
+        "release": release,
+        "files": {
+            name: {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+            for name, (data, _, _) in sorted(files.items())
+        },
+    }
+
+
+def manifest_bytes(manifest: dict) -> bytes:
+    return json.dumps(manifest, indent=2, sort_keys=True, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def write_template_zip(fileobj, files: dict, *, compression: int = zipfile.ZIP_STORED, date_time: tuple | None = None):
+    """依路徑排序寫入 ZIP；提供 date_time 時所有項目使用相同時間 (可重現的輸出)。"""
+    with zipfile.ZipFile(fileobj, "w", compression) as zf:
+        for name in sorted(files):
+            data, mode, mtime = files[name]
+            info = zipfile.ZipInfo(name, date_time or time.localtime(mtime)[:6])
+            # 只保留執行位元，其餘統一為 644，避免來源的 umask 影響輸出
+            info.external_attr = (0o100755 if mode & 0o111 else 0o100644) << 16
+            info.compress_type = compression
+            info.create_system = 3
+            zf.writestr(info, data)
+
+
+def build_template_archive(source_dir: Path, ai_assistant: str, *, sources: dict | None = None) -> tuple[io.BytesIO, dict]:
+    """在記憶體中建置指定 AI 助理的範本 ZIP，回傳 (archive, metadata_dict)。
+
+    內容與發布版本的資產相同：memory/、scripts/、templates/ (不含 commands)，
+    以及由 templates/commands/*.md 產生的助理指令檔。ZIP 不壓縮，只用於立即解壓縮。
+    為多個助理建置時可傳入 read_template_sources 的結果，原始碼只讀取一次。
+    """
+    sources = sources or read_template_sources(source_dir)
+    files = agent_template_files(sources, ai_assistant)
+    manifest = template_manifest(files, ai_assistant, "local")
+    newest = max((mtime for _, _, mtime in files.values()), default=time.time())
+    files[manifest_name(ai_assistant)] = (manifest_bytes(manifest), 0o644, newest)
+
+    buffer = io.BytesIO()
+    write_template_zip(buffer, files)
+    data = buffer.getvalue()
+    buffer.seek(0)
+    return buffer, {
+        "filename": f"spec-kit-template-{ai_assistant}-local.zip",
+        "size": len(data),
+        "release": "local",
+        "asset_url": sources["source_dir"].as_uri(),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "cached": False,
+        "cache_hit": False,
+        "release_cache": "local",
+    }
+
+
+def open_template_zip(zip_path: Path, ai_assistant: str) -> tuple[object, dict]:
+    """開啟預先建置的範本 ZIP (例如發布版本資產)，回傳 (archive, metadata_dict)。"""
+    zip_path = Path(zip_path).resolve()
+    match = re.match(r"spec-kit-template-([a-z]+)-(.+)\.zip$", zip_path.name)
+    if match and match.group(1) in AGENT_COMMAND_LAYOUTS and match.group(1) != ai_assistant:
+        raise ValueError(f"{zip_path.name} 是 {match.group(1)} 的範本，不是 {ai_assistant}")
+    archive = open(zip_path, "rb")
+    if not zipfile.is_zipfile(archive):
+        archive.close()
+        raise ValueError(f"{zip_path} 不是有效的 ZIP 檔案")
+    archive.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: archive.read(1024 * 1024), b""):
+        digest.update(chunk)
+    archive.seek(0)
+    return archive, {
+        "filename": zip_path.name,
+        "size": zip_path.stat().st_size,
+        "release": match.group(2) if match else "local",
+        "asset_url": zip_path.as_uri(),
+        "sha256": digest.hexdigest(),
+        "cached": False,
+        "cache_hit": False,
+        "release_cache": "local",
+    }
+
+
+def local_template_loader(*, template_dir: Path | None = None, template_zip: Path | None = None):
+    """回傳 loader(ai) -> (archive, metadata_dict)，供 init 取代從 GitHub 下載。"""
+    if template_zip is not None:
+        return lambda ai: open_template_zip(template_zip, ai)
+    sources = {}
+
+    def load(ai):
+        # 原始碼只讀取一次，多個助理共用
+        if not sources:
+            sources.update(read_template_sources(template_dir))
+        return build_template_archive(template_dir, ai, sources=sources)
+
+    return load
+
+
+def iter_local_templates(ai_assistants: list[str], loader):
+    """依序載入各助理的本機範本，產生 (ai, (archive, metadata) 或 Exception)。"""
+    for ai in ai_assistants:
+        try:
+            yield ai, loader(ai)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            yield ai, e
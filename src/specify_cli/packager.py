@@ -0,0 +1,80 @@
+"""發布版本的範本套件：在同一個程序中建置所有助理的 ZIP (取代 release.yml 的 cp -r / zip -r)。
+
+原始碼只讀取一次，各助理的套件在執行緒中同時建置並直接寫入 ZIP，不需暫存目錄。
+輸出可重現：項目依路徑排序、使用固定時間與權限，相同的輸入產生位元組完全相同的 ZIP。
+每個 ZIP 內含 .specify/manifest-<助理>.json，記錄各檔案的 SHA-256。
+"""
+
+import os
+import hashlib
+import zipfile
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from .local_templates import (
+    AGENT_COMMAND_LAYOUTS,
+    ZIP_EPOCH,
+    agent_template_files,
+    manifest_bytes,
+    manifest_name,
+    read_template_sources,
+    template_manifest,
+    write_template_zip,
+)
+
+
+def reproducible_date_time() -> tuple:
+    """ZIP 項目使用的固定時間：SOURCE_DATE_EPOCH (UTC) 或 1980-01-01。"""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not epoch:
+        return ZIP_EPOCH
+    stamp = datetime.fromtimestamp(int(epoch), tz=timezone.utc)
+    return max(ZIP_EPOCH, stamp.timetuple()[:6])
+
+
+def package_asset_name(ai_assistant: str, version: str) -> str:
+    return f"spec-kit-template-{ai_assistant}-{version}.zip"
+
+
+def build_release_package(sources: dict, ai_assistant: str, version: str, out_dir: Path, date_time: tuple) -> dict:
+    """建置單一助理的發布 ZIP，先寫入暫存檔再取代，回傳 {agent, path, size, sha256, files}。"""
+    files = agent_template_files(sources, ai_assistant)
+    manifest = template_manifest(files, ai_assistant, version)
+    files[manifest_name(ai_assistant)] = (manifest_bytes(manifest), 0o644, 0)
+
+    path = out_dir / package_asset_name(ai_assistant, version)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            write_template_zip(f, files, compression=zipfile.ZIP_DEFLATED, date_time=date_time)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return {
+        "agent": ai_assistant,
+        "path": str(path),
+        "size": path.stat().st_size,
+        "sha256": digest.hexdigest(),
+        "files": len(files),
+    }
+
+
+def package_templates(source_dir: Path, out_dir: Path, version: str, agents: list[str] | None = None) -> list[dict]:
+    """同時建置所有 (或指定) 助理的發布 ZIP，依助理順序回傳結果。"""
+    agents = agents or list(AGENT_COMMAND_LAYOUTS)
+    invalid = [ai for ai in agents if ai not in AGENT_COMMAND_LAYOUTS]
+    if invalid:
+        raise ValueError(f"不支援的 AI 助理：{', '.join(invalid)}")
+    sources = read_template_sources(source_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    date_time = reproducible_date_time()
+    # 壓縮在 zlib 中進行時會釋放 GIL，各助理的 ZIP 可以真正平行建置
+    with ThreadPoolExecutor(max_workers=len(agents)) as pool:
+        futures = [pool.submit(build_release_package, sources, ai, version, out_dir, date_time) for ai in agents]
+        return [future.result() for future in futures]
@@ -0,0 +1,119 @@
+"""範本佔位符的單次替換：[PROJECT NAME]、[DATE]、[FEATURE NAME]、[###-feature-name]、{ARGS} 等。
+
+範本只解析一次，編譯為「文字片段 + 變數」的序列 (依內容雜湊快取)，
+之後每次渲染只需串接一次，所有變數在同一輪中替換；未提供的變數保留原本的佔位符。
+"""
+
+import re
+import hashlib
+from datetime import date
+from pathlib import Path
+
+# [大寫名稱] (例如 [PROJECT NAME]、[DATE])、[###-feature-name] 形式的分支佔位符，以及 {ARGS} 形式的指令參數
+PLACEHOLDER_PATTERN = re.compile(r"\[(#+-[a-z-]+|[A-Z][A-Z0-9 _./-]*)\]|\{([A-Z][A-Z0-9_]*)\}")
+# 同義的變數：提供其中一個時，其餘未提供的也使用相同值
+VARIABLE_SYNONYMS = (
+    ("###-feature-name", "###-feature", "BRANCH"),
+    ("FEATURE NAME", "FEATURE"),
+)
+# 範本中有意義的標記，不是變數 (例如任務的 [P]、格式說明中的 [ID])
+TEMPLATE_MARKERS = frozenset({"P", "ID", "NEEDS CLARIFICATION"})
+COMPILED_CACHE_SIZE = 256
+
+_compiled_cache: dict[str, "CompiledTemplate"] = {}
+
+
+def normalize_variable(name: str) -> str:
+    """變數名稱不分大小寫，底線視為空白 (project_name -> PROJECT NAME)；分支佔位符保持原樣。"""
+    name = name.strip()
+    if name.startswith("#"):
+        return name.lower()
+    return name.upper().replace("_", " ")
+
+
+class CompiledTemplate:
+    """已解析的範本：literals 比 names 多一個，渲染時交錯串接。"""
+
+    __slots__ = ("literals", "names", "tokens", "digest")
+
+    def __init__(self, text: str, digest: str):
+        self.literals = []
+        self.names = []
+        self.tokens = []
+        self.digest = digest
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            if match.group(1) in TEMPLATE_MARKERS:
+                continue
+            self.literals.append(text[position:match.start()])
+            self.names.append(normalize_variable(match.group(1) or match.group(2)))
+            self.tokens.append(match.group())
+            position = match.end()
+        self.literals.append(text[position:])
+
+    @property
+    def variables(self) -> list[str]:
+        return list(dict.fromkeys(self.names))
+
+    def render(self, variables: dict[str, str]) -> str:
+        parts = [self.literals[0]]
+        for name, token, literal in zip(self.names, self.tokens, self.literals[1:]):
+            value = variables.get(name)
+            parts.append(token if value is None else value)
+            parts.append(literal)
+        return "".join(parts)
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    """編譯範本文字；相同內容 (依 SHA-256) 只解析一次。"""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    compiled = _compiled_cache.get(digest)
+    if compiled is None:
+        if len(_compiled_cache) >= COMPILED_CACHE_SIZE:
+            _compiled_cache.clear()
+        compiled = _compiled_cache[digest] = CompiledTemplate(text, digest)
+    return compiled
+
+
+def load_template(path: Path) -> CompiledTemplate:
+    return compile_template(Path(path).read_text(encoding="utf-8"))
+
+
+def resolve_variables(variables: dict[str, str], defaults: dict[str, str] | None = None) -> dict[str, str]:
+    """正規化變數名稱，套用預設值與同義變數 (明確提供的值優先於預設值)。"""
+    explicit = {normalize_variable(k): v for k, v in variables.items()}
+    resolved = {normalize_variable(k): v for k, v in (defaults or {}).items()}
+    for group in VARIABLE_SYNONYMS:
+        for source in (explicit, resolved):
+            value = next((source[name] for name in group if name in source), None)
+            if value is not None:
+                resolved.update(dict.fromkeys(group, value))
+                break
+    resolved.update(explicit)
+    return resolved
+
+
+def default_variables(repo_root: Path | None = None, branch: str | None = None, today: str | None = None) -> dict[str, str]:
+    """可自動取得的變數：今天日期、專案名稱 (儲存庫目錄名稱) 與目前的功能分支。"""
+    defaults = {"DATE": today or date.today().isoformat()}
+    if repo_root is not None:
+        defaults["PROJECT NAME"] = repo_root.name
+    if branch:
+        defaults["###-feature-name"] = branch
+    return defaults
+
+
+def parse_variable_args(values: list[str]) -> dict[str, str]:
+    """解析 --var KEY=VALUE 參數，格式錯誤時拋出 ValueError。"""
+    variables = {}
+    for item in values:
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"變數格式應為 KEY=VALUE：{item}")
+        variables[key] = value
+    return variables
+
+
+def output_name(template: Path) -> str:
+    """範本對應的輸出檔名 (spec-template.md -> spec.md)。"""
+    return template.name.replace("-template", "", 1)
@@ -0,0 +1,325 @@
+"""下載並解壓縮範本以建立專案 (單一或多個 AI 助理)。"""
+
+import shutil
+import zipfile
+from pathlib import Path
+
+import typer
+import httpx
+
+from .cache import TemplateCache
+from .constants import AI_CHOICES, SHARED_TEMPLATE_DIRS
+from .extract import archive_root_prefix, extract_template_archive, layer_template_archives
+from .github import (
+    download_error_message,
+    download_template_from_github,
+    fetch_latest_release,
+    iter_template_downloads,
+    latest_release_url,
+)
+from .http_client import shared_client
+from .local_templates import iter_local_templates
+from .tracker import StepTracker
+from .ui import console
+from .upgrade import record_installed_templates
+
+# 追蹤器 fetch 步驟中顯示的發布版本中繼資料快取狀態
+RELEASE_CACHE_LABELS = {
+    "fresh": "中繼資料快取命中",
+    "revalidated": "中繼資料未變更 (304)",
+    "stale": "網路失敗，使用過期中繼資料",
+    "miss": "中繼資料快取未命中",
+    "offline": "離線",
+    "local": "本機範本",
+}
+
+
+def download_detail(meta: dict) -> str:
+    """下載步驟的補充說明：重試次數、續傳省下的位元組與完整性驗證方式。"""
+    notes = []
+    if meta.get("resumed_bytes"):
+        notes.append(f"續傳省下 {meta['resumed_bytes']:,} bytes")
+    if meta.get("attempts", 1) > 1:
+        notes.append(f"重試 {meta['attempts'] - 1} 次")
+    if meta.get("verified") == "sha256":
+        notes.append("SHA-256 已驗證")
+    elif meta.get("verified") == "size":
+        notes.append("大小已驗證")
+    return "".join(f"，{note}" for note in notes)
+
+
+def download_and_extract_template(project_path: Path, ai_assistant: str, is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None, cache: TemplateCache | None = None, offline: bool = False, loader=None) -> Path:
+    """下載最新發布版本並解壓縮以建立新專案。
+    提供 loader (見 local_templates.local_template_loader) 時改用本機範本，不連線。
+    回傳 project_path。如果提供追蹤器則使用 (鍵值：fetch、download、extract、cleanup)
+    """
+    # 步驟：fetch (發布版本資訊) 與 download (範本) 分開計時，供 --trace 使用
+    current = "fetch"
+    if tracker:
+        tracker.start("fetch", "讀取本機範本" if loader else "讀取本機快取" if offline else "正在聯繫 GitHub API")
+    try:
+        if loader is not None:
+            archive, meta = loader(ai_assistant)
+        else:
+            release = None
+            if tracker and not offline:
+                release = fetch_latest_release(latest_release_url(), cache=cache)
+                tracker.complete("fetch", f"發布版本 {release[0]['tag_name']}，{RELEASE_CACHE_LABELS.get(release[1], '已取得')}")
+                tracker.add("download", "下載範本")
+                tracker.start("download")
+                current = "download"
+            archive, meta = download_template_from_github(
+                ai_assistant,
+                verbose=verbose and tracker is None,
+                show_progress=(tracker is None),
+                cache=cache,
+                offline=offline,
+                release=release,
+                on_retry=(lambda attempt, offset, reason: tracker.start(
+                    current, f"下載中斷 ({reason})，第 {attempt} 次重試" + (f"，從 {offset:,} bytes 續傳" if offset else "")
+                )) if tracker else None,
+            )
+        if tracker:
+            if current == "fetch":
+                if meta["release"] == "local":
+                    fetch_detail = f"{meta['filename']} ({meta['size']:,} bytes)"
+                else:
+                    fetch_detail = f"發布版本 {meta['release']} ({meta['size']:,} bytes)"
+                if meta["release_cache"] in RELEASE_CACHE_LABELS:
+                    fetch_detail += f"，{RELEASE_CACHE_LABELS[meta['release_cache']]}"
+                tracker.complete("fetch", fetch_detail)
+                tracker.add("download", "下載範本")
+            tracker.record("download", nbytes=meta["size"])
+            if meta["cache_hit"]:
+                tracker.skip("download", f"快取命中 {meta['filename']}")
+            elif meta["release_cache"] == "local":
+                tracker.skip("download", f"本機範本 {meta['filename']}")
+            else:
+                tracker.complete("download", f"{meta['filename']} ({meta['size']:,} bytes){download_detail(meta)}")
+    except Exception as e:
+        if tracker:
+            tracker.error(current, download_error_message(e))
+        else:
+            if verbose:
+                console.print(f"[red]下載範本時發生錯誤：[/red] {e}")
+        raise
+    
+    if tracker:
+        tracker.add("extract", "解壓縮範本")
+        tracker.start("extract")
+    elif verbose:
+        console.print("正在解壓縮範本...")
+    
+    try:
+        # 只有在不使用目前目錄時才建立專案目錄
+        if not is_current_dir:
+            project_path.mkdir(parents=True)
+        
+        with zipfile.ZipFile(archive, 'r') as zip_ref:
+            # 列出 ZIP 中的所有檔案以供除錯
+            zip_contents = zip_ref.namelist()
+            if tracker:
+                tracker.start("zip-list")
+                tracker.record("zip-list", files=len(zip_contents))
+                tracker.complete("zip-list", f"{len(zip_contents)} 項目")
+            elif verbose:
+                console.print(f"[cyan]ZIP 包含 {len(zip_contents)} 項目[/cyan]")
+
+            # 處理 GitHub 樣式的 ZIP，包含單一根目錄：解壓縮時直接移除前綴
+            strip_prefix = archive_root_prefix(zip_contents)
+            if is_current_dir and verbose and not tracker:
+                for name in {n[len(strip_prefix):].split("/", 1)[0] for n in zip_contents if n.startswith(strip_prefix)}:
+                    if name and (project_path / name).is_dir():
+                        console.print(f"[yellow]合併目錄：[/yellow] {name}")
+
+            stats = extract_template_archive(zip_ref, project_path, strip_prefix=strip_prefix)
+            record_installed_templates(project_path, [(ai_assistant, stats)], meta["release"])
+
+            if tracker:
+                tracker.record("extract", nbytes=sum(entry["size"] for entry in stats["hashes"].values()), files=stats["files"])
+                tracker.start("extracted-summary")
+                summary = f"{len(stats['top_level'])} 頂層項目，{stats['files']} 檔案"
+                if stats["overwritten"]:
+                    summary += f"，覆寫 {len(stats['overwritten'])} 檔案"
+                if stats["unchanged"]:
+                    summary += f"，{len(stats['unchanged'])} 檔案未變更"
+                tracker.complete("extracted-summary", summary)
+            elif verbose:
+                console.print(f"[cyan]解壓縮 {stats['files']} 檔案到 {project_path}：[/cyan]")
+                for name, is_dir in stats["top_level"].items():
+                    console.print(f"  - {name} ({'目錄' if is_dir else '檔案'})")
+                for rel in stats["overwritten"]:
+                    console.print(f"[yellow]覆寫檔案：[/yellow] {rel}")
+                if stats["unchanged"]:
+                    console.print(f"[cyan]{len(stats['unchanged'])} 檔案內容相同，未重寫[/cyan]")
+
+            if strip_prefix:
+                if tracker:
+                    tracker.add("flatten", "展平巢狀目錄")
+                    tracker.complete("flatten", f"移除前綴 {strip_prefix}")
+                elif verbose:
+                    console.print("[cyan]已展平巢狀目錄結構[/cyan]")
+            if is_current_dir and verbose and not tracker:
+                console.print("[cyan]範本檔案已合併到目前目錄[/cyan]")
+                    
+    except Exception as e:
+        if tracker:
+            tracker.error("extract", str(e))
+        else:
+            if verbose:
+                console.print(f"[red]解壓縮範本時發生錯誤：[/red] {e}")
+        # 如果已建立且非目前目錄，則清理專案目錄
+        if not is_current_dir and project_path.exists():
+            shutil.rmtree(project_path)
+        raise typer.Exit(1)
+    else:
+        if tracker:
+            tracker.complete("extract")
+    finally:
+        if tracker:
+            tracker.add("cleanup", "移除暫存檔案")
+        # 釋放下載緩衝 (範本不會落地到目前目錄；快取中的檔案保留供下次使用)
+        archive.close()
+        if tracker:
+            tracker.complete("cleanup", "範本保留於快取" if meta["cached"] else "已釋放下載緩衝")
+    
+    return project_path
+
+
+def download_and_extract_templates(project_path: Path, ai_assistants: list[str], is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None, cache: TemplateCache | None = None, offline: bool = False, loader=None) -> Path:
+    """一次為多個 AI 助理建立專案。
+
+    發布版本資訊只取得一次，各助理的範本透過共用的 httpx.Client 連線池並行下載 (見 http_client.shared_client)。
+    提供 loader 時改用本機範本，不建立連線。
+    共用基底 (memory/、scripts/、templates/) 只從第一個範本解壓縮，其餘範本只疊加助理專屬的目錄。
+    回傳 project_path。如果提供追蹤器則使用 (鍵值：fetch、agent-<ai>、extract、cleanup)
+    """
+    if len(ai_assistants) == 1:
+        return download_and_extract_template(project_path, ai_assistants[0], is_current_dir, verbose=verbose, tracker=tracker, cache=cache, offline=offline, loader=loader)
+
+    if tracker:
+        tracker.start("fetch", "讀取本機範本" if loader else "讀取本機快取" if offline else "正在聯繫 GitHub API")
+        for ai in ai_assistants:
+            tracker.add(f"agent-{ai}", f"{AI_CHOICES[ai]} 範本")
+    elif verbose:
+        console.print(f"[cyan]正在取得 {len(ai_assistants)} 個 AI 助理的範本...[/cyan]")
+
+    archives: dict[str, tuple] = {}
+    failures: dict[str, str] = {}
+
+    def collect(results):
+        if tracker:
+            for ai in ai_assistants:
+                tracker.start(f"agent-{ai}", "下載中")
+        # 只在主執行緒更新追蹤器
+        for ai, result in results:
+            if isinstance(result, Exception):
+                failures[ai] = download_error_message(result)
+                if tracker:
+                    tracker.error(f"agent-{ai}", failures[ai])
+                continue
+            archives[ai] = result
+            meta = result[1]
+            if meta["cache_hit"]:
+                detail = f"快取命中 {meta['filename']}"
+            elif meta["release_cache"] == "local":
+                detail = f"本機範本 {meta['filename']}"
+            else:
+                detail = f"已下載 {meta['filename']}{download_detail(meta)}"
+            if tracker:
+                tracker.record(f"agent-{ai}", nbytes=meta["size"])
+                tracker.start(f"agent-{ai}", detail)
+            elif verbose:
+                console.print(f"[cyan]{AI_CHOICES[ai]}：[/cyan] {detail}")
+
+    try:
+        if loader is not None:
+            if tracker:
+                tracker.complete("fetch", RELEASE_CACHE_LABELS["local"])
+            collect(iter_local_templates(ai_assistants, loader))
+        else:
+            client = shared_client()
+            release = None
+            if not offline:
+                try:
+                    release = fetch_latest_release(latest_release_url(), cache=cache, client=client)
+                except httpx.HTTPError as e:
+                    if tracker:
+                        tracker.error("fetch", str(e))
+                    elif verbose:
+                        console.print(f"[red]取得發布版本資訊時發生錯誤：[/red] {e}")
+                    raise typer.Exit(1)
+            if tracker:
+                if release:
+                    tracker.complete("fetch", f"發布版本 {release[0]['tag_name']}，{RELEASE_CACHE_LABELS.get(release[1], '已取得')}")
+                else:
+                    tracker.complete("fetch", RELEASE_CACHE_LABELS["offline"])
+            collect(iter_template_downloads(ai_assistants, cache=cache, offline=offline, client=client, release=release))
+        if failures:
+            if verbose and not tracker:
+                for ai, reason in failures.items():
+                    console.print(f"[red]下載 {AI_CHOICES[ai]} 範本時發生錯誤：[/red] {reason}")
+            raise typer.Exit(1)
+
+        if tracker:
+            tracker.add("extract", "解壓縮範本")
+            tracker.start("extract")
+        elif verbose:
+            console.print("正在解壓縮範本...")
+
+        try:
+            if not is_current_dir:
+                project_path.mkdir(parents=True)
+            layered = layer_template_archives(project_path, [(ai, archives[ai][0]) for ai in ai_assistants])
+            record_installed_templates(project_path, layered, archives[ai_assistants[0]][1]["release"])
+            total_files = sum(stats["files"] for _, stats in layered)
+            unchanged = sum(len(stats["unchanged"]) for _, stats in layered)
+            for index, (ai, stats) in enumerate(layered):
+                agent_items = [name for name in stats["top_level"] if name not in SHARED_TEMPLATE_DIRS]
+                layers = ", ".join(agent_items) or "無專屬檔案"
+                detail = f"{'基底 + ' if index == 0 else ''}{layers} ({stats['files']} 檔案)"
+                if tracker:
+                    tracker.record(f"agent-{ai}", files=stats["files"])
+                    tracker.complete(f"agent-{ai}", detail)
+                elif verbose:
+                    console.print(f"[cyan]{AI_CHOICES[ai]}：[/cyan] {detail}")
+        except Exception as e:
+            if tracker:
+                tracker.error("extract", str(e))
+            elif verbose:
+                console.print(f"[red]解壓縮範本時發生錯誤：[/red] {e}")
+            if not is_current_dir and project_path.exists():
+                shutil.rmtree(project_path)
+            raise typer.Exit(1)
+        if tracker:
+            tracker.record("extract", nbytes=sum(entry["size"] for _, stats in layered for entry in stats["hashes"].values()), files=total_files)
+            tracker.complete("extract", f"{len(ai_assistants)} 個 AI 助理，{total_files} 檔案" + (f"，{unchanged} 檔案未變更" if unchanged else ""))
+    finally:
+        for archive, _ in archives.values():
+            archive.close()
+        if tracker:
+            tracker.add("cleanup", "移除暫存檔案")
+            tracker.complete("cleanup", "已釋放下載緩衝")
+
+    return project_path
+
+
+def preview_template_merge(project_path: Path, ai_assistants: list[str], *, cache: TemplateCache | None = None, offline: bool = False, loader=None) -> list[tuple[str, dict]]:
+    """取得範本並與 project_path 的現有檔案比較，不寫入任何檔案 (init --here --dry-run)。
+    回傳 (ai, 統計) 清單，統計中的 added、overwritten、unchanged 見 extract_template_archive。
+    """
+    if loader is not None:
+        results = list(iter_local_templates(ai_assistants, loader))
+    else:
+        client = shared_client()
+        release = None if offline else fetch_latest_release(latest_release_url(), cache=cache, client=client)
+        results = list(iter_template_downloads(ai_assistants, cache=cache, offline=offline, client=client, release=release))
+    archives = {ai: result for ai, result in results if not isinstance(result, Exception)}
+    try:
+        for ai, result in results:
+            if isinstance(result, Exception):
+                raise RuntimeError(f"{AI_CHOICES[ai]}：{download_error_message(result)}")
+        return layer_template_archives(project_path, [(ai, archives[ai][0]) for ai in ai_assistants], dry_run=True)
+    finally:
+        for archive, _ in archives.values():
+            archive.close()
@@ -0,0 +1,302 @@
+"""依任務圖平行執行 tasks.md 中附加的指令。
+
+排程在主執行緒進行：相依任務都完成後才送出，[P] 任務可同時執行，其餘任務單獨執行。
+每個任務在獨立的行程群組中執行，逾時時整個群組一併結束；失敗後依指數退避重試。
+執行狀態在每個任務結束時寫入 specs/<branch>/.tasks-state.json，中斷後重新執行會略過已成功的任務。
+"""
+
+import os
+import json
+import time
+import signal
+import hashlib
+import threading
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .agent_context import write_atomic
+from .tracker import StepTracker
+
+TASK_STATE_NAME = ".tasks-state.json"
+TASK_STATE_VERSION = 1
+TASK_LOG_DIR = ".task-logs"
+DEFAULT_TASK_TIMEOUT = 1800
+DEFAULT_TASK_BACKOFF = 2.0
+
+
+def command_digest(command: str) -> str:
+    """指令內容的雜湊，指令變更後先前的成功紀錄不再有效。"""
+    return hashlib.sha256(command.encode("utf-8")).hexdigest()[:16]
+
+
+def load_task_state(feature_dir: Path) -> dict:
+    try:
+        with open(feature_dir / TASK_STATE_NAME, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == TASK_STATE_VERSION and isinstance(state.get("tasks"), dict):
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": TASK_STATE_VERSION, "tasks": {}}
+
+
+def save_task_state(feature_dir: Path, state: dict):
+    write_atomic(feature_dir / TASK_STATE_NAME, json.dumps(state, indent=2, ensure_ascii=False) + "\n")
+
+
+class TaskProcesses:
+    """追蹤執行中的子行程，中斷時一併結束 (包含 shell 啟動的子行程)。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._procs: dict[str, subprocess.Popen] = {}
+        self._closed = False
+
+    def run(self, task_id: str, command: str, *, cwd: Path, env: dict, timeout: float, log_path: Path, attempt: int) -> dict:
+        """執行一次任務指令，輸出附加到記錄檔，回傳 {returncode, timed_out, seconds}。"""
+        started = time.perf_counter()
+        with open(log_path, "ab") as log:
+            log.write(f"\n=== {task_id} 第 {attempt} 次執行 {datetime.now().isoformat(timespec='seconds')}：{command}\n".encode("utf-8"))
+            log.flush()
+            proc = subprocess.Popen(
+                command,
+                shell=True,
+                cwd=cwd,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=os.name != "nt",
+            )
+            with self._lock:
+                self._procs[task_id] = proc
+                closed = self._closed
+            # kill_all 之後才啟動的行程 (工作執行緒已取出任務) 也立即結束
+            if closed:
+                self._kill(proc)
+            timed_out = False
+            try:
+                proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                self._kill(proc)
+                proc.wait()
+            finally:
+                with self._lock:
+                    self._procs.pop(task_id, None)
+        return {"returncode": proc.returncode, "timed_out": timed_out, "seconds": time.perf_counter() - started}
+
+    @staticmethod
+    def _kill(proc: subprocess.Popen):
+        try:
+            if os.name != "nt":
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def kill_all(self):
+        """結束所有執行中的行程；之後啟動的行程也會立即結束。"""
+        with self._lock:
+            self._closed = True
+            procs = list(self._procs.values())
+        for proc in procs:
+            self._kill(proc)
+
+
+def plan_task_run(graph: dict, state: dict, *, skip_manual: bool, restart: bool) -> dict:
+    """決定每個任務的初始處理方式：run、satisfied (已完成，不再執行) 或 manual (無指令，需手動完成)。"""
+    plan = {}
+    for task in graph["tasks"]:
+        previous = state["tasks"].get(task["id"], {})
+        if task["done"]:
+            plan[task["id"]] = ("satisfied", "tasks.md 中已完成")
+        elif task["command"] is None:
+            plan[task["id"]] = ("satisfied", "手動任務，已略過") if skip_manual else ("manual", "沒有指令，需手動完成")
+        elif not restart and previous.get("status") == "succeeded" and previous.get("command") == command_digest(task["command"]):
+            plan[task["id"]] = ("satisfied", "先前已成功")
+        else:
+            plan[task["id"]] = ("run", "")
+    return plan
+
+
+def run_task_graph(
+    graph: dict,
+    *,
+    repo_root: Path,
+    feature_dir: Path,
+    jobs: int,
+    timeout: float,
+    retries: int,
+    backoff: float,
+    keep_going: bool = False,
+    skip_manual: bool = False,
+    restart: bool = False,
+    tracker: StepTracker | None = None,
+) -> dict:
+    """依相依圖執行任務指令，回傳 {tasks: {id: 結果}, succeeded, failed, blocked, skipped, seconds}。
+
+    任務失敗時不再送出新任務 (keep_going 時只略過相依於失敗任務的任務)，執行中的任務會等待完成。
+    """
+    started = time.perf_counter()
+    jobs = max(1, jobs)
+    tasks = {task["id"]: task for task in graph["tasks"]}
+    deps = {task["id"]: set(task["deps"]) for task in graph["tasks"]}
+    state = load_task_state(feature_dir)
+    if restart:
+        state["tasks"] = {}
+    plan = plan_task_run(graph, state, skip_manual=skip_manual, restart=restart)
+    log_dir = feature_dir / TASK_LOG_DIR
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    order = list(tasks)
+    results: dict[str, dict] = {}
+    for task_id, (action, detail) in plan.items():
+        if action == "satisfied":
+            results[task_id] = {"status": "skipped", "detail": detail}
+            if tracker:
+                tracker.skip(task_id, detail)
+    # 相依條件已滿足的任務；略過的任務只在其相依任務都滿足後才算滿足，不會讓後續任務提早開始
+    satisfied = set()
+
+    def propagate():
+        changed = True
+        while changed:
+            changed = False
+            for task_id in order:
+                if task_id not in satisfied and plan[task_id][0] == "satisfied" and deps[task_id] <= satisfied:
+                    satisfied.add(task_id)
+                    changed = True
+
+    def ready(task_id: str) -> bool:
+        return plan[task_id][0] == "run" and task_id not in results and deps[task_id] <= satisfied
+
+    processes = TaskProcesses()
+    attempts: dict[str, int] = {}
+    # (可再次送出的時間, 任務) — 等待退避的重試
+    delayed: list[tuple[float, str]] = []
+    running = {}
+    stopping = False
+
+    def submit(pool: ThreadPoolExecutor, task_id: str):
+        task = tasks[task_id]
+        attempts[task_id] = attempts.get(task_id, 0) + 1
+        env = {
+            **os.environ,
+            "SPECIFY_TASK_ID": task_id,
+            "SPECIFY_TASK_ATTEMPT": str(attempts[task_id]),
+            "SPECIFY_FEATURE_DIR": str(feature_dir),
+        }
+        future = pool.submit(
+            processes.run, task_id, task["command"],
+            cwd=repo_root, env=env, timeout=task["timeout"] or timeout,
+            log_path=log_dir / f"{task_id}.log", attempt=attempts[task_id],
+        )
+        running[future] = task_id
+        if tracker:
+            tracker.start(task_id, "執行中" if attempts[task_id] == 1 else f"第 {attempts[task_id]} 次執行")
+
+    def finish(task_id: str, outcome: dict):
+        task = tasks[task_id]
+        succeeded = outcome["returncode"] == 0 and not outcome["timed_out"]
+        max_attempts = 1 + (task["retries"] if task["retries"] is not None else retries)
+        if not succeeded and attempts[task_id] < max_attempts and not stopping:
+            delay = backoff * 2 ** (attempts[task_id] - 1)
+            delayed.append((time.monotonic() + delay, task_id))
+            if tracker:
+                reason = "逾時" if outcome["timed_out"] else f"結束代碼 {outcome['returncode']}"
+                tracker.start(task_id, f"{reason}，{delay:g} 秒後重試 ({attempts[task_id]}/{max_attempts - 1})")
+            return False
+        log_path = log_dir / f"{task_id}.log"
+        result = {
+            "status": "succeeded" if succeeded else "failed",
+            "returncode": outcome["returncode"],
+            "timed_out": outcome["timed_out"],
+            "attempts": attempts[task_id],
+            "seconds": round(outcome["seconds"], 3),
+            "log": str(log_path),
+        }
+        results[task_id] = result
+        state["tasks"][task_id] = {
+            **{key: result[key] for key in ("status", "returncode", "timed_out", "attempts", "seconds")},
+            "command": command_digest(task["command"]),
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        save_task_state(feature_dir, state)
+        if succeeded:
+            satisfied.add(task_id)
+            if tracker:
+                tracker.complete(task_id, f"{outcome['seconds']:.1f}s" + (f"，第 {attempts[task_id]} 次" if attempts[task_id] > 1 else ""))
+        elif tracker:
+            reason = "逾時" if outcome["timed_out"] else f"結束代碼 {outcome['returncode']}"
+            tracker.error(task_id, f"{reason}，記錄：{log_path}")
+        return not succeeded
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        try:
+            while True:
+                propagate()
+                if not stopping:
+                    now = time.monotonic()
+                    for due, task_id in sorted(delayed):
+                        if due <= now and len(running) < jobs:
+                            delayed.remove((due, task_id))
+                            submit(pool, task_id)
+                    retrying = {task_id for _, task_id in delayed}
+                    for task_id in order:
+                        if len(running) >= jobs:
+                            break
+                        if ready(task_id) and task_id not in running.values() and task_id not in retrying:
+                            submit(pool, task_id)
+                if not running and (stopping or not delayed):
+                    break
+                wait_timeout = None
+                if delayed and not stopping:
+                    wait_timeout = max(0.0, min(due for due, _ in delayed) - time.monotonic())
+                if not running:
+                    time.sleep(wait_timeout or 0)
+                    continue
+                done, _ = wait(running, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task_id = running.pop(future)
+                    if finish(task_id, future.result()) and not keep_going:
+                        stopping = True
+        except KeyboardInterrupt:
+            # 子行程在獨立的行程群組中，收不到終端機的 SIGINT：先結束它們，
+            # 並在離開 with 區塊 (等待工作執行緒) 之前取消尚未開始的任務
+            processes.kill_all()
+            pool.shutdown(wait=False, cancel_futures=True)
+            for task_id in running.values():
+                results[task_id] = {"status": "interrupted"}
+                if tracker:
+                    tracker.error(task_id, "已中斷")
+            save_task_state(feature_dir, state)
+            raise
+
+    # 尚未執行的任務：手動任務、相依任務未完成，或因失敗而停止
+    for task_id in order:
+        if task_id in results:
+            continue
+        action, detail = plan[task_id]
+        if action == "manual":
+            results[task_id] = {"status": "manual", "detail": detail}
+        else:
+            blockers = sorted(d for d in deps[task_id] if d not in satisfied)
+            detail = f"等待 {'、'.join(blockers)}" if blockers else "因其他任務失敗而停止"
+            results[task_id] = {"status": "blocked", "detail": detail}
+        if tracker:
+            tracker.skip(task_id, detail)
+
+    statuses = [r["status"] for r in results.values()]
+    return {
+        "tasks": {task_id: results[task_id] for task_id in order},
+        "succeeded": statuses.count("succeeded"),
+        "failed": statuses.count("failed"),
+        "skipped": statuses.count("skipped"),
+        "manual": statuses.count("manual"),
+        "blocked": statuses.count("blocked"),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,282 @@
+"""tasks.md 任務圖：解析 [P] 標記與相依性，產生可排程的 DAG。
+
+相依性規則 (對應 templates/tasks-template.md)：
+- 任務依文件順序執行；同一階段中連續的 [P] 任務組成一個可平行的步驟，其餘任務各自為一個步驟；
+- 每個步驟相依於前一個步驟的所有任務；
+- 「相依性」章節與任務描述中的明確相依性 (阻擋 / 之前 / 需要、blocks / before / depends on) 再加上額外的邊。
+
+任務可在下一層清單附加執行設定，供 specify tasks run 使用：
+
+    - [ ] T004 [P] 在 tests/contract/test_users_post.py 中進行合約測試
+      - 指令：`pytest tests/contract/test_users_post.py`
+      - 逾時：120
+      - 重試：2
+"""
+
+import re
+from collections import deque
+
+TASK_LINE = re.compile(r"^\s*[-*]\s*(?:\[(?P<done>[ xX])\]\s*)?(?P<id>T\d+)\b\s*(?P<parallel>\[P\])?\s*(?P<description>.*)$")
+TASK_ID = re.compile(r"T(\d+)(?:\s*[-–~～]\s*T(\d+))?")
+# 檔案路徑：需包含以字母開頭的副檔名 (排除 /api/users 之類的端點與版本號)
+FILE_PATH = re.compile(r"(?<![\w/.-])(?:[\w.-]+/)*[\w-][\w.-]*\.[A-Za-z][A-Za-z0-9]*(?![\w/])")
+DEPENDENCY_TITLES = ("相依性", "Dependencies")
+# 任務下一層清單中的執行設定 (標籤 -> 欄位)
+TASK_ATTRIBUTES = {
+    "指令": "command", "執行": "command", "command": "command", "run": "command",
+    "逾時": "timeout", "timeout": "timeout",
+    "重試": "retries", "retries": "retries",
+}
+TASK_ATTRIBUTE_LINE = re.compile(r"^\s+[-*]\s*(?P<key>[^\s:：]+)\s*[:：]\s*(?P<value>.+?)\s*$")
+
+# 關鍵字之前的任務先於之後的任務
+BEFORE_KEYWORDS = ("阻擋", "blocks", "之前", "before")
+# 關鍵字之後的任務先於之前的任務
+AFTER_KEYWORDS = ("需要", "requires", "depends on", "相依於", "依賴", "after", "之後")
+INLINE_DEPENDENCY = re.compile(
+    r"(?:depends on|after|相依於|依賴)\s*[:：]?\s*(T\d+(?:\s*(?:[-–~～,、，和及]|and)\s*T\d+)*)", re.IGNORECASE
+)
+
+
+def expand_task_ids(text: str) -> list[str]:
+    """展開文字中的任務編號與範圍 (T004-T007 -> T004、T005、T006、T007)。"""
+    ids = []
+    for match in TASK_ID.finditer(text):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else start
+        width = len(match.group(1))
+        ids.extend(f"T{n:0{width}d}" for n in range(start, end + 1))
+    return ids
+
+
+def extract_file_paths(description: str) -> list[str]:
+    return list(dict.fromkeys(m.group().strip("`") for m in FILE_PATH.finditer(description.replace("`", " "))))
+
+
+def _task_attribute(task: dict, line: str) -> bool:
+    """套用任務下一層清單中的執行設定，回傳該行是否為執行設定。"""
+    match = TASK_ATTRIBUTE_LINE.match(line)
+    field = match and TASK_ATTRIBUTES.get(match.group("key").lower())
+    if not field:
+        return False
+    value = match.group("value")
+    if field == "command":
+        task["command"] = value[1:-1] if len(value) > 1 and value[0] == value[-1] == "`" else value
+    else:
+        number = re.match(r"\d+(?:\.\d+)?", value)
+        if not number:
+            raise ValueError(f"{task['id']} 的{match.group('key')}必須是數字：{value}")
+        task[field] = float(number.group()) if field == "timeout" else int(float(number.group()))
+    return True
+
+
+def _dependency_edges(line: str) -> list[tuple[str, str]]:
+    """解析一行相依性描述，回傳 (先, 後) 邊。"""
+    lowered = line.lower()
+    for keywords, forward in ((BEFORE_KEYWORDS, True), (AFTER_KEYWORDS, False)):
+        for keyword in keywords:
+            pos = lowered.find(keyword)
+            if pos < 0:
+                continue
+            left = expand_task_ids(line[:pos])
+            right = expand_task_ids(line[pos + len(keyword):])
+            if not left or not right:
+                continue
+            pairs = [(a, b) for a in left for b in right] if forward else [(b, a) for a in left for b in right]
+            return pairs
+    return []
+
+
+def parse_tasks(text: str) -> tuple[list[dict], list[tuple[str, str]]]:
+    """解析 tasks.md，回傳 (任務清單, 明確相依的 (先, 後) 邊)。
+
+    執行設定格式錯誤 (例如逾時不是數字) 時拋出 ValueError。
+    """
+    tasks = []
+    edges = []
+    phase = None
+    in_fence = False
+    in_dependencies = False
+    current = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        if stripped.startswith("#"):
+            current = None
+            title = stripped.lstrip("#").strip()
+            in_dependencies = any(title.startswith(t) for t in DEPENDENCY_TITLES)
+            if stripped.startswith("## ") and not in_dependencies:
+                phase = title
+            continue
+        if in_dependencies:
+            edges.extend(_dependency_edges(stripped))
+            continue
+        if current is not None and _task_attribute(current, line):
+            continue
+        match = TASK_LINE.match(line)
+        if not match:
+            if stripped:
+                current = None
+            continue
+        task_id = match.group("id")
+        description = match.group("description").strip()
+        for inline in INLINE_DEPENDENCY.finditer(description):
+            edges.extend((dep, task_id) for dep in expand_task_ids(inline.group(1)))
+        current = {
+            "id": task_id,
+            "description": description,
+            "parallel": bool(match.group("parallel")),
+            "done": (match.group("done") or " ") in "xX",
+            "phase": phase,
+            "files": extract_file_paths(description),
+            "command": None,
+            "timeout": None,
+            "retries": None,
+        }
+        tasks.append(current)
+    return tasks, edges
+
+
+def build_task_graph(tasks: list[dict], explicit_edges: list[tuple[str, str]] = ()) -> dict:
+    """建立任務 DAG，計算平行波次、關鍵路徑，並檢查循環與 [P] 檔案衝突。"""
+    ids = [t["id"] for t in tasks]
+    by_id = {t["id"]: t for t in tasks}
+    warnings = []
+    duplicates = sorted({i for i in ids if ids.count(i) > 1})
+    if duplicates:
+        warnings.append(f"重複的任務編號：{', '.join(duplicates)}")
+
+    # 1. 依文件順序分成步驟：同一階段連續的 [P] 任務為一步，其餘各自一步
+    steps: list[list[str]] = []
+    for task in tasks:
+        previous = by_id[steps[-1][-1]] if steps else None
+        if task["parallel"] and previous and previous["parallel"] and previous["phase"] == task["phase"]:
+            steps[-1].append(task["id"])
+        else:
+            steps.append([task["id"]])
+    deps: dict[str, set[str]] = {task_id: set() for task_id in by_id}
+    for before, after in zip(steps, steps[1:]):
+        for task_id in after:
+            deps[task_id].update(before)
+
+    # 2. 明確相依
+    for before, after in explicit_edges:
+        if before not in by_id or after not in by_id:
+            warnings.append(f"相依性參照不存在的任務：{before} -> {after}")
+            continue
+        if before != after:
+            deps[after].add(before)
+
+    # 3. 拓撲排序 (Kahn)；無法排序的剩餘節點位於循環上
+    dependents: dict[str, list[str]] = {task_id: [] for task_id in by_id}
+    for task_id, task_deps in deps.items():
+        for dep in task_deps:
+            dependents[dep].append(task_id)
+    remaining = {task_id: len(task_deps) for task_id, task_deps in deps.items()}
+    order_index = {task_id: i for i, task_id in enumerate(by_id)}
+    queue = deque(sorted((t for t, n in remaining.items() if n == 0), key=order_index.get))
+    wave: dict[str, int] = {}
+    longest: dict[str, tuple[int, str | None]] = {}
+    order = []
+    while queue:
+        task_id = queue.popleft()
+        order.append(task_id)
+        wave[task_id] = max((wave[d] + 1 for d in deps[task_id]), default=0)
+        best = max(deps[task_id], key=lambda d: (longest[d][0], -order_index[d]), default=None)
+        longest[task_id] = (longest[best][0] + 1 if best else 1, best)
+        for dependent in sorted(dependents[task_id], key=order_index.get):
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                queue.append(dependent)
+
+    cycles = []
+    if len(order) < len(by_id):
+        cycles = _find_cycles({t for t in by_id if t not in wave}, deps)
+
+    waves: list[list[str]] = []
+    for task_id in sorted(wave, key=lambda t: (wave[t], order_index[t])):
+        if wave[task_id] == len(waves):
+            waves.append([])
+        waves[wave[task_id]].append(task_id)
+
+    # 4. 同一波次中的任務會同時執行，不得修改相同檔案
+    conflicts = []
+    for number, members in enumerate(waves):
+        owners: dict[str, str] = {}
+        for task_id in members:
+            for path in by_id[task_id]["files"]:
+                if path in owners:
+                    conflicts.append({"wave": number, "file": path, "tasks": [owners[path], task_id]})
+                else:
+                    owners[path] = task_id
+
+    critical_path = []
+    if longest:
+        node = max(longest, key=lambda t: (longest[t][0], -order_index[t]))
+        while node:
+            critical_path.append(node)
+            node = longest[node][1]
+        critical_path.reverse()
+
+    return {
+        "tasks": [
+            {**task, "deps": sorted(deps[task["id"]], key=order_index.get), "wave": wave.get(task["id"])}
+            for task in tasks
+        ],
+        "waves": waves,
+        "critical_path": critical_path,
+        "max_parallelism": max((len(w) for w in waves), default=0),
+        "cycles": cycles,
+        "conflicts": conflicts,
+        "warnings": warnings,
+        "valid": not cycles and not conflicts,
+    }
+
+
+def _find_cycles(nodes: set[str], deps: dict[str, set[str]]) -> list[list[str]]:
+    """在無法排序的節點中找出循環 (每個強連通元件回報一個)。"""
+    cycles = []
+    seen: set[str] = set()
+    for start in sorted(nodes):
+        if start in seen:
+            continue
+        # 沿著位於循環上的相依前進，直到重複走到同一節點
+        path = [start]
+        position = {start: 0}
+        node = start
+        while True:
+            node = min(d for d in deps[node] if d in nodes)
+            if node in position:
+                cycle = path[position[node]:]
+                cycles.append(list(reversed(cycle)) + [cycle[-1]])
+                seen.update(path)
+                break
+            position[node] = len(path)
+            path.append(node)
+    return cycles
+
+
+def task_graph_to_dot(graph: dict, name: str = "tasks") -> str:
+    """輸出 Graphviz DOT：同一波次排在同一層，[P] 任務以方框表示，關鍵路徑以粗線標示。"""
+    critical_edges = set(zip(graph["critical_path"], graph["critical_path"][1:]))
+    lines = [f'digraph "{name}" {{', "  rankdir=LR;", '  node [shape=ellipse, fontname="sans-serif"];']
+    for task in graph["tasks"]:
+        label = f"{task['id']}\\n{task['description'][:40]}".replace('"', '\\"')
+        attrs = [f'label="{label}"']
+        if task["parallel"]:
+            attrs.append("shape=box")
+        if task["done"]:
+            attrs.append("style=filled, fillcolor=lightgrey")
+        lines.append(f'  "{task["id"]}" [{", ".join(attrs)}];')
+    for wave in graph["waves"]:
+        lines.append("  { rank=same; " + " ".join(f'"{t}";' for t in wave) + " }")
+    for task in graph["tasks"]:
+        for dep in task["deps"]:
+            style = " [penwidth=2.5, color=red]" if (dep, task["id"]) in critical_edges else ""
+            lines.append(f'  "{dep}" -> "{task["id"]}"{style};')
+    lines.append("}")
+    return "\n".join(lines) + "\n"
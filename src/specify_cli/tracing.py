@@ -0,0 +1,189 @@
+"""將 StepTracker 記錄的步驟時間匯出為追蹤檔 (specify init --trace / SPECIFY_TRACE)。
+
+- Chrome 追蹤事件格式：可在 chrome://tracing 或 https://ui.perfetto.dev 開啟；
+- 純 JSON 摘要：各步驟的起訖毫秒數、耗時、位元組數與檔案數，方便彙總多台 CI 機器的結果；
+- OTLP/JSON (OpenTelemetry 檔案匯出器的格式)：每行一個 ExportTraceServiceRequest，可由 OpenTelemetry Collector 匯入。
+"""
+
+import os
+import json
+import time
+import socket
+import secrets
+import platform
+from pathlib import Path
+
+from . import __name__ as _package
+from .agent_context import write_atomic
+from .tracker import StepTracker
+
+TRACE_SUMMARY_VERSION = 1
+# OTLP 的 span 狀態：0 未設定、1 成功、2 錯誤
+_STATUS_CODES = {"done": 1, "skipped": 1, "error": 2}
+
+
+def _spans(tracker: StepTracker, now: float) -> list[dict]:
+    """已開始的步驟：{step, start, end}，時間為相對於追蹤器起點的秒數；進行中的步驟以 now 作為終點。"""
+    spans = []
+    for step in tracker.steps:
+        if step["started"] is None:
+            continue
+        end = step["ended"] if step["ended"] is not None else now
+        spans.append({"step": step, "start": step["started"] - tracker.origin, "end": end - tracker.origin})
+    return spans
+
+
+def _lanes(spans: list[dict]) -> list[int]:
+    """為重疊的步驟分配不同的列 (Chrome 同一執行緒中的事件必須正確巢狀)。"""
+    lane_ends: list[float] = []
+    lanes = []
+    for span in spans:
+        for lane, end in enumerate(lane_ends):
+            if end <= span["start"]:
+                lane_ends[lane] = span["end"]
+                lanes.append(lane)
+                break
+        else:
+            lane_ends.append(span["end"])
+            lanes.append(len(lane_ends) - 1)
+    return lanes
+
+
+def _step_args(step: dict) -> dict:
+    args = {"key": step["key"], "status": step["status"]}
+    if step["detail"]:
+        args["detail"] = step["detail"]
+    for field in ("bytes", "files"):
+        if step[field] is not None:
+            args[field] = step[field]
+    return args
+
+
+def chrome_trace(tracker: StepTracker, *, now: float | None = None) -> dict:
+    """Chrome 追蹤事件格式 (JSON 物件格式，時間單位為微秒)。"""
+    now = now if now is not None else time.perf_counter()
+    spans = sorted(_spans(tracker, now), key=lambda span: span["start"])
+    pid = os.getpid()
+    events = [
+        {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"specify: {tracker.title}"}},
+    ]
+    for span, lane in zip(spans, _lanes(spans)):
+        events.append({
+            "name": span["step"]["label"],
+            "cat": "specify",
+            "ph": "X",
+            "ts": round(span["start"] * 1e6, 3),
+            "dur": round((span["end"] - span["start"]) * 1e6, 3),
+            "pid": pid,
+            "tid": lane,
+            "args": _step_args(span["step"]),
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"title": tracker.title, "started_at": tracker.origin_wall}}
+
+
+def trace_summary(tracker: StepTracker, *, now: float | None = None) -> dict:
+    """純 JSON 摘要：所有步驟 (包含未開始者) 的狀態、起訖時間 (毫秒)、位元組數與檔案數。"""
+    now = now if now is not None else time.perf_counter()
+    steps = []
+    for step in tracker.steps:
+        entry = {key: step[key] for key in ("key", "label", "status", "detail", "bytes", "files")}
+        if step["started"] is None:
+            entry.update(start_ms=None, end_ms=None, duration_ms=None)
+        else:
+            end = step["ended"] if step["ended"] is not None else now
+            entry.update(
+                start_ms=round((step["started"] - tracker.origin) * 1000, 3),
+                end_ms=round((end - tracker.origin) * 1000, 3),
+                duration_ms=round((end - step["started"]) * 1000, 3),
+            )
+        steps.append(entry)
+    return {
+        "version": TRACE_SUMMARY_VERSION,
+        "title": tracker.title,
+        "started_at": tracker.origin_wall,
+        "total_ms": round((now - tracker.origin) * 1000, 3),
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "steps": steps,
+    }
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        # OTLP/JSON 以字串表示 64 位元整數
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def otlp_trace(tracker: StepTracker, *, now: float | None = None) -> dict:
+    """OTLP/JSON 的 ExportTraceServiceRequest：整個流程為根 span，每個步驟為其子 span。"""
+    now = now if now is not None else time.perf_counter()
+    trace_id = secrets.token_hex(16)
+    root_id = secrets.token_hex(8)
+
+    def unix_nano(offset: float) -> str:
+        return str(int((tracker.origin_wall + offset) * 1e9))
+
+    spans = []
+    for span in _spans(tracker, now):
+        step = span["step"]
+        spans.append({
+            "traceId": trace_id,
+            "spanId": secrets.token_hex(8),
+            "parentSpanId": root_id,
+            "name": step["key"],
+            "kind": 1,
+            "startTimeUnixNano": unix_nano(span["start"]),
+            "endTimeUnixNano": unix_nano(span["end"]),
+            "attributes": [_attribute(f"specify.step.{key}", value) for key, value in _step_args(step).items() if key != "key"]
+            + [_attribute("specify.step.label", step["label"])],
+            "status": {"code": _STATUS_CODES.get(step["status"], 0)},
+        })
+    failed = any(step["status"] == "error" for step in tracker.steps)
+    spans.insert(0, {
+        "traceId": trace_id,
+        "spanId": root_id,
+        "name": tracker.title,
+        "kind": 1,
+        "startTimeUnixNano": unix_nano(0),
+        "endTimeUnixNano": unix_nano(now - tracker.origin),
+        "attributes": [],
+        "status": {"code": 2 if failed else 1},
+    })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                _attribute("service.name", "specify-cli"),
+                _attribute("host.name", socket.gethostname()),
+                _attribute("process.pid", os.getpid()),
+            ]},
+            "scopeSpans": [{"scope": {"name": _package}, "spans": spans}],
+        }]
+    }
+
+
+def summary_path(trace_path: Path) -> Path:
+    """摘要與追蹤檔放在一起：out.json -> out.summary.json。"""
+    return trace_path.with_name(f"{trace_path.stem}.summary.json")
+
+
+def write_trace(tracker: StepTracker, trace_path: Path | None = None, otlp_path: Path | None = None, *, now: float | None = None) -> list[Path]:
+    """寫入 Chrome 追蹤檔與摘要 (trace_path)，以及 OTLP/JSON (otlp_path，附加為新的一行)。回傳寫入的檔案。"""
+    now = now if now is not None else time.perf_counter()
+    written = []
+    if trace_path is not None:
+        trace_path = Path(trace_path)
+        write_atomic(trace_path, json.dumps(chrome_trace(tracker, now=now), ensure_ascii=False) + "\n")
+        write_atomic(summary_path(trace_path), json.dumps(trace_summary(tracker, now=now), indent=2, ensure_ascii=False) + "\n")
+        written += [trace_path, summary_path(trace_path)]
+    if otlp_path is not None:
+        otlp_path = Path(otlp_path)
+        otlp_path.parent.mkdir(parents=True, exist_ok=True)
+        # 與 OpenTelemetry Collector 的 file exporter 相同：每次匯出附加一行 JSON
+        with open(otlp_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(otlp_trace(tracker, now=now), ensure_ascii=False) + "\n")
+        written.append(otlp_path)
+    return written
@@ -0,0 +1,147 @@
+"""init 流程的階層式步驟追蹤器。"""
+
+import time
+import threading
+
+from rich.tree import Tree
+
+
+class StepTracker:
+    """追蹤並渲染階層式步驟，不使用表情符號，類似 Claude Code 樹狀輸出。
+    狀態改變時遞增 version 並通知監聽者；render() 只在狀態改變後才重建樹狀圖，
+    因此即時畫面可以依固定頻率檢查 version，把多次更新合併為一次重繪 (見 ui.track_progress)。
+    """
+    def __init__(self, title: str):
+        self.title = title
+        self._steps: dict[str, dict] = {}  # key -> {key, label, status, detail, started, ended, bytes, files}，依加入順序
+        self.status_order = {"pending": 0, "running": 1, "done": 2, "error": 3, "skipped": 4}
+        self.version = 0  # 每次狀態 (狀態、詳細資訊、標籤) 改變時遞增
+        self._listeners = []  # callable(step)，狀態改變時呼叫
+        self._rendered = (-1, None)  # (version, Tree)
+        # 即時畫面在背景執行緒渲染，與主執行緒的更新互斥
+        self._lock = threading.Lock()
+        # 計時基準：單調時鐘與同一時刻的牆上時間 (匯出追蹤時換算為絕對時間，見 tracing.py)
+        self.origin = time.perf_counter()
+        self.origin_wall = time.time()
+
+    @property
+    def steps(self) -> list[dict]:
+        with self._lock:
+            return list(self._steps.values())
+
+    def attach_refresh(self, cb):
+        """狀態改變時呼叫 cb() (不含參數)。"""
+        self._listeners.append(lambda step: cb())
+
+    def attach_listener(self, cb):
+        """狀態改變時呼叫 cb(step)。"""
+        self._listeners.append(cb)
+
+    def add(self, key: str, label: str):
+        if key in self._steps:
+            return
+        with self._lock:
+            step = self._steps[key] = self._new_step(key, label, "pending", "")
+            self.version += 1
+        self._notify(step)
+
+    @staticmethod
+    def _new_step(key: str, label: str, status: str, detail: str) -> dict:
+        return {"key": key, "label": label, "status": status, "detail": detail, "started": None, "ended": None, "bytes": None, "files": None}
+
+    def start(self, key: str, detail: str = ""):
+        self._update(key, status="running", detail=detail)
+
+    def complete(self, key: str, detail: str = ""):
+        self._update(key, status="done", detail=detail)
+
+    def error(self, key: str, detail: str = ""):
+        self._update(key, status="error", detail=detail)
+
+    def skip(self, key: str, detail: str = ""):
+        self._update(key, status="skipped", detail=detail)
+
+    def record(self, key: str, *, nbytes: int | None = None, files: int | None = None):
+        """記錄步驟處理的位元組數與檔案數 (不影響顯示，只用於 --trace)。"""
+        step = self._steps.get(key)
+        if step is None:
+            return
+        if nbytes is not None:
+            step["bytes"] = nbytes
+        if files is not None:
+            step["files"] = files
+
+    def _update(self, key: str, status: str, detail: str):
+        # 第一次開始時記錄起點 (重試時沿用)；結束時記錄終點，未開始就結束的步驟視為瞬間完成
+        now = time.perf_counter()
+        with self._lock:
+            step = self._steps.get(key)
+            if step is None:
+                # 如果不存在，則新增
+                step = self._steps[key] = self._new_step(key, key, status, detail)
+                changed = True
+            else:
+                changed = step["status"] != status or bool(detail and step["detail"] != detail)
+            step["status"] = status
+            if detail:
+                step["detail"] = detail
+            if step["started"] is None:
+                step["started"] = now
+            step["ended"] = None if status == "running" else now
+            if changed:
+                self.version += 1
+        # 狀態沒有改變時不通知，也不需要重繪
+        if changed:
+            self._notify(step)
+
+    def _notify(self, step: dict):
+        for cb in self._listeners:
+            try:
+                cb(step)
+            except Exception:
+                pass
+
+    def __rich__(self):
+        return self.render()
+
+    def render(self):
+        with self._lock:
+            if self._rendered[0] == self.version:
+                return self._rendered[1]
+            version, steps = self.version, list(self._steps.values())
+        tree = Tree(f"[bold cyan]{self.title}[/bold cyan]", guide_style="grey50")
+        for step in steps:
+            label = step["label"]
+            detail_text = step["detail"].strip() if step["detail"] else ""
+
+            # 圓圈 (樣式不變)
+            status = step["status"]
+            if status == "done":
+                symbol = "[green]●[/green]"
+            elif status == "pending":
+                symbol = "[green dim]○[/green dim]"
+            elif status == "running":
+                symbol = "[cyan]○[/cyan]"
+            elif status == "error":
+                symbol = "[red]●[/red]"
+            elif status == "skipped":
+                symbol = "[yellow]○[/yellow]"
+            else:
+                symbol = " "
+
+            if status == "pending":
+                # 整行淺灰色 (待處理)
+                if detail_text:
+                    line = f"{symbol} [bright_black]{label} ({detail_text})[/bright_black]"
+                else:
+                    line = f"{symbol} [bright_black]{label}[/bright_black]"
+            else:
+                # 標籤為白色，詳細資訊 (如有) 在括號中為淺灰色
+                if detail_text:
+                    line = f"{symbol} [white]{label}[/white] [bright_black]({detail_text})[/bright_black]"
+                else:
+                    line = f"{symbol} [white]{label}[/white]"
+
+            tree.add(line)
+        self._rendered = (version, tree)
+        return tree
@@ -0,0 +1,212 @@
+"""主控台輸出、橫幅與互動式選單。
+
+readchar 與 rich.live 等僅在互動式選擇時才載入，讓 --help 與 check 保持輕量。
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+import typer
+from rich.console import Console
+from rich.text import Text
+from rich.align import Align
+
+# ASCII 藝術橫幅
+BANNER = """
+███████╗██████╗ ███████╗ ██████╗██╗███████╗██╗   ██╗
+██╔════╝██╔══██╗██╔════╝██╔════╝██║██╔════╝╚██╗ ██╔╝
+███████╗██████╔╝█████╗  ██║     ██║█████╗   ╚████╔╝ 
+╚════██║██╔═══╝ ██╔══╝  ██║     ██║██╔══╝    ╚██╔╝  
+███████║██║     ███████╗╚██████╗██║██║        ██║   
+╚══════╝╚═╝     ╚══════╝ ╚═════╝╚═╝╚═╝        ╚═╝   
+"""
+
+TAGLINE = "規格驅動開發工具包 Jerry 改"
+
+MINI_BANNER = """
+╔═╗╔═╗╔═╗╔═╗╦╔═╗╦ ╦
+╚═╗╠═╝║╣ ║  ║╠╣ ╚╦╝
+╚═╝╩  ╚═╝╚═╝╩╚   ╩ 
+"""
+
+console = Console()
+
+
+def show_banner():
+    """顯示 ASCII 藝術橫幅。"""
+    # 使用不同顏色建立漸層效果
+    banner_lines = BANNER.strip().split('\n')
+    colors = ["bright_blue", "blue", "cyan", "bright_cyan", "white", "bright_white"]
+    
+    styled_banner = Text()
+    for i, line in enumerate(banner_lines):
+        color = colors[i % len(colors)]
+        styled_banner.append(line + "\n", style=color)
+    
+    console.print(Align.center(styled_banner))
+    console.print(Align.center(Text(TAGLINE, style="italic bright_yellow")))
+    console.print()
+
+
+def get_key():
+    """使用 readchar 以跨平台方式取得單一按鍵。"""
+    import readchar
+
+    key = readchar.readkey()
+    
+    # 方向鍵
+    if key == readchar.key.UP:
+        return 'up'
+    if key == readchar.key.DOWN:
+        return 'down'
+    
+    # Enter/Return 鍵
+    if key == readchar.key.ENTER:
+        return 'enter'
+    
+    # Escape 鍵
+    if key == readchar.key.ESC:
+        return 'escape'
+        
+    # Ctrl+C
+    if key == readchar.key.CTRL_C:
+        raise KeyboardInterrupt
+
+    return key
+
+
+def select_with_arrows(options: dict, prompt_text: str = "選擇一個選項", default_key: str | None = None) -> str:
+    """
+    使用方向鍵與 Rich Live 顯示進行互動式選擇。
+    
+    Args:
+        options: 以選項鍵為鍵、描述為值的字典
+        prompt_text: 在選項上方顯示的文字
+        default_key: 預設開始的選項鍵
+        
+    Returns:
+        選擇的選項鍵
+    """
+    from rich.live import Live
+    from rich.panel import Panel
+    from rich.table import Table
+
+    option_keys = list(options.keys())
+    if default_key and default_key in option_keys:
+        selected_index = option_keys.index(default_key)
+    else:
+        selected_index = 0
+    
+    selected_key = None
+
+    def create_selection_panel():
+        """建立目前選擇項目高亮顯示的選擇面板。"""
+        table = Table.grid(padding=(0, 2))
+        table.add_column(style="bright_cyan", justify="left", width=3)
+        table.add_column(style="white", justify="left")
+        
+        for i, key in enumerate(option_keys):
+            if i == selected_index:
+                table.add_row("▶", f"[bright_cyan]{key}: {options[key]}[/bright_cyan]")
+            else:
+                table.add_row(" ", f"[white]{key}: {options[key]}[/white]")
+        
+        table.add_row("", "")
+        table.add_row("", "[dim]使用 ↑/↓ 導航，Enter 選擇，Esc 取消[/dim]")
+        
+        return Panel(
+            table,
+            title=f"[bold]{prompt_text}[/bold]",
+            border_style="cyan",
+            padding=(1, 2)
+        )
+    
+    console.print()
+
+    def run_selection_loop():
+        nonlocal selected_key, selected_index
+        with Live(create_selection_panel(), console=console, transient=True, auto_refresh=False) as live:
+            while True:
+                try:
+                    key = get_key()
+                    if key == 'up':
+                        selected_index = (selected_index - 1) % len(option_keys)
+                    elif key == 'down':
+                        selected_index = (selected_index + 1) % len(option_keys)
+                    elif key == 'enter':
+                        selected_key = option_keys[selected_index]
+                        break
+                    elif key == 'escape':
+                        console.print("\n[yellow]選擇已取消[/yellow]")
+                        raise typer.Exit(1)
+                    
+                    live.update(create_selection_panel(), refresh=True)
+
+                except KeyboardInterrupt:
+                    console.print("\n[yellow]選擇已取消[/yellow]")
+                    raise typer.Exit(1)
+
+    run_selection_loop()
+
+    if selected_key is None:
+        console.print("\n[red]選擇失敗。[/red]")
+        raise typer.Exit(1)
+
+    # 抑制明確的選擇輸出；追蹤器 / 後續邏輯將回報整合狀態
+    return selected_key
+
+
+# 逐行進度模式中各狀態的標示
+PROGRESS_LINE_LABELS = {"pending": "等待", "running": "開始", "done": "完成", "error": "錯誤", "skipped": "略過"}
+PROGRESS_REFRESH_PER_SECOND = 8
+
+
+def use_tui(no_tui: bool = False) -> bool:
+    """是否使用即時樹狀圖：輸出不是終端機 (CI 記錄、管線) 或指定 --no-tui 時改用逐行進度。"""
+    return not no_tui and console.is_terminal
+
+
+@contextmanager
+def track_progress(tracker, *, tui: bool = True):
+    """顯示 StepTracker 的進度。
+
+    tui 為 True 時使用 Rich Live 即時樹狀圖：背景執行緒依固定頻率檢查 tracker.version，
+    只在狀態改變後才重繪，多次更新合併為一次；tui 為 False 時每次狀態改變輸出一行。
+    產生 Live 物件 (逐行模式為 None)，呼叫端可用 live.refresh() 立即重繪。
+    """
+    if not tui:
+        def emit(step):
+            if step["status"] == "pending":
+                return
+            line = f"[{time.perf_counter() - tracker.origin:7.2f}s] {PROGRESS_LINE_LABELS.get(step['status'], step['status'])} {step['label']}"
+            if step["detail"]:
+                line += f" ({step['detail']})"
+            console.print(line, markup=False, highlight=False, soft_wrap=True)
+
+        # 進入前已完成的步驟 (例如預先檢查) 也輸出一次
+        for step in tracker.steps:
+            emit(step)
+        tracker.attach_listener(emit)
+        yield None
+        return
+
+    from rich.live import Live
+
+    with Live(tracker, console=console, auto_refresh=False, transient=True) as live:
+        stop = threading.Event()
+
+        def tick():
+            seen = tracker.version
+            while not stop.wait(1 / PROGRESS_REFRESH_PER_SECOND):
+                if tracker.version != seen:
+                    seen = tracker.version
+                    live.refresh()
+
+        ticker = threading.Thread(target=tick, name="specify-progress", daemon=True)
+        ticker.start()
+        try:
+            yield live
+        finally:
+            stop.set()
+            ticker.join()
@@ -0,0 +1,192 @@
+"""範本差異更新：只改寫上游有變更、且本機未修改的檔案。
+
+init 時在 .specify/manifest-<助理>.json 記錄安裝的發布版本與各檔案的 SHA-256 (基準)。
+upgrade 以「基準、本機、上游」三方比較：只有基準與上游不同的檔案才需要讀取本機內容，
+本機未修改的檔案直接更新，本機也修改過的檔案列為衝突並保留本機版本。
+"""
+
+import json
+import hashlib
+import zipfile
+from pathlib import Path
+
+from .agent_context import write_atomic
+from .constants import AI_CHOICES, SHARED_TEMPLATE_DIRS
+from .extract import archive_root_prefix
+from .local_templates import MANIFEST_DIR, MANIFEST_VERSION, manifest_bytes, manifest_name
+
+# 會寫入專案的變更；其餘 (current、conflict) 不改動本機檔案
+WRITE_ACTIONS = ("added", "updated")
+# 三方比較摘要中顯示的狀態
+UPSTREAM_LABELS = {"added": "上游新增", "changed": "上游變更", "removed": "上游刪除"}
+LOCAL_LABELS = {"unchanged": "未修改", "modified": "已修改", "missing": "不存在", "matches": "與上游相同"}
+ACTION_LABELS = {
+    "added": "新增",
+    "updated": "更新",
+    "removed": "刪除",
+    "current": "已是最新",
+    "conflict": "衝突，保留本機版本",
+}
+
+
+def is_manifest_path(rel: str) -> bool:
+    return rel.startswith(f"{MANIFEST_DIR}/manifest-") and rel.endswith(".json")
+
+
+def write_installed_manifest(project_path: Path, ai_assistant: str, release: str, files: dict):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "agent": ai_assistant,
+        "release": release,
+        "files": {rel: files[rel] for rel in sorted(files) if not is_manifest_path(rel)},
+    }
+    write_atomic(project_path / manifest_name(ai_assistant), manifest_bytes(manifest))
+
+
+def record_installed_templates(project_path: Path, layered: list[tuple[str, dict]], release: str):
+    """依解壓縮統計記錄各助理安裝的檔案 (範本 ZIP 本身沒有 manifest 時也能建立基準)。"""
+    for ai, stats in layered:
+        write_installed_manifest(project_path, ai, release, stats["hashes"])
+
+
+def load_installed_manifest(project_path: Path, ai_assistant: str) -> dict | None:
+    try:
+        with open(project_path / manifest_name(ai_assistant), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or not isinstance(manifest.get("files"), dict):
+        return None
+    return manifest
+
+
+def includes_shared(manifest: dict) -> bool:
+    """是否為基底助理：多助理專案中只有第一個助理安裝 SHARED_TEMPLATE_DIRS。"""
+    return any(rel.split("/", 1)[0] in SHARED_TEMPLATE_DIRS for rel in manifest["files"])
+
+
+def installed_agents(project_path: Path) -> list[str]:
+    """已記錄安裝基準的助理，安裝共用基底的助理排在最前面。"""
+    manifests = {ai: load_installed_manifest(project_path, ai) for ai in AI_CHOICES}
+    agents = [ai for ai, manifest in manifests.items() if manifest is not None]
+    return sorted(agents, key=lambda ai: not includes_shared(manifests[ai]))
+
+
+def archive_entries(zip_ref: zipfile.ZipFile) -> dict[str, zipfile.ZipInfo]:
+    """範本 ZIP 中的檔案 (已移除 GitHub 樣式的根目錄前綴)：路徑 -> ZipInfo。"""
+    strip_prefix = archive_root_prefix(zip_ref.namelist())
+    entries = {}
+    for info in zip_ref.infolist():
+        if info.is_dir() or not info.filename.startswith(strip_prefix):
+            continue
+        rel = Path(info.filename[len(strip_prefix):])
+        if not rel.parts or rel.is_absolute() or ".." in rel.parts:
+            continue
+        entries[rel.as_posix()] = info
+    return entries
+
+
+def archive_manifest(zip_ref: zipfile.ZipFile, entries: dict[str, zipfile.ZipInfo], ai_assistant: str) -> dict:
+    """新版本的檔案雜湊：優先使用 ZIP 內的 manifest，沒有或不完整時才讀取內容計算。"""
+    files = {rel: info for rel, info in entries.items() if not is_manifest_path(rel)}
+    embedded = entries.get(manifest_name(ai_assistant))
+    if embedded is not None:
+        try:
+            manifest = json.loads(zip_ref.read(embedded))
+            if manifest.get("version") == MANIFEST_VERSION and set(manifest.get("files", {})) == set(files):
+                return manifest["files"]
+        except ValueError:
+            pass
+    hashes = {}
+    for rel, info in files.items():
+        digest = hashlib.sha256()
+        with zip_ref.open(info) as src:
+            for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                digest.update(chunk)
+        hashes[rel] = {"sha256": digest.hexdigest(), "size": info.file_size}
+    return hashes
+
+
+def local_sha256(path: Path) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+
+
+def plan_upgrade(project_path: Path, base: dict, upstream: dict) -> list[dict]:
+    """三方比較基準與上游不同的檔案，回傳變更清單。
+
+    每項包含 path、upstream (added / changed / removed)、local (unchanged / modified / missing / matches)
+    與 action：added、updated、removed (會改動本機)、current (本機已與上游一致) 或 conflict (保留本機版本)。
+    """
+    changes = []
+    for rel in sorted(set(base) | set(upstream)):
+        base_hash = base.get(rel, {}).get("sha256")
+        new_hash = upstream.get(rel, {}).get("sha256")
+        if base_hash == new_hash:
+            continue
+        local_hash = local_sha256(project_path / rel)
+        upstream_state = "added" if base_hash is None else "removed" if new_hash is None else "changed"
+        if local_hash == new_hash:
+            local_state, action = "matches", "current"
+        elif local_hash is None:
+            local_state = "missing"
+            action = "added" if base_hash is None else "conflict"
+        elif local_hash == base_hash:
+            local_state = "unchanged"
+            action = "removed" if new_hash is None else "updated"
+        else:
+            local_state, action = "modified", "conflict"
+        changes.append({"path": rel, "upstream": upstream_state, "local": local_state, "action": action})
+    return changes
+
+
+def upgrade_agent(project_path: Path, ai_assistant: str, archive, meta: dict, *, dry_run: bool = False) -> dict:
+    """以新版本範本 ZIP 更新單一助理的檔案，回傳 {agent, from, to, changes, counts}。
+
+    衝突的檔案保留本機版本，manifest 中仍記錄舊基準，解決前每次 upgrade 都會再次列出。
+    """
+    project_path = Path(project_path)
+    installed = load_installed_manifest(project_path, ai_assistant)
+    if installed is None:
+        raise FileNotFoundError(f"找不到 {manifest_name(ai_assistant)}：此專案沒有 {ai_assistant} 的安裝紀錄")
+    base = installed["files"]
+    with zipfile.ZipFile(archive) as zip_ref:
+        entries = archive_entries(zip_ref)
+        upstream = archive_manifest(zip_ref, entries, ai_assistant)
+        if not includes_shared(installed):
+            # 疊加的助理只擁有專屬檔案，共用基底由第一個助理更新
+            upstream = {rel: h for rel, h in upstream.items() if rel.split("/", 1)[0] not in SHARED_TEMPLATE_DIRS}
+        changes = plan_upgrade(project_path, base, upstream)
+        if not dry_run:
+            for change in changes:
+                target = project_path / change["path"]
+                if change["action"] in WRITE_ACTIONS:
+                    info = entries[change["path"]]
+                    write_atomic(target, zip_ref.read(info))
+                    target.chmod((info.external_attr >> 16) & 0o777 or 0o644)
+                elif change["action"] == "removed":
+                    target.unlink()
+
+    if not dry_run:
+        files = dict(upstream)
+        for change in changes:
+            if change["action"] == "conflict":
+                files.pop(change["path"], None)
+                if change["path"] in base:
+                    files[change["path"]] = base[change["path"]]
+        write_installed_manifest(project_path, ai_assistant, meta["release"], files)
+
+    counts = {action: 0 for action in ("added", "updated", "removed", "current", "conflict")}
+    for change in changes:
+        counts[change["action"]] += 1
+    return {
+        "agent": ai_assistant,
+        "from": installed.get("release"),
+        "to": meta["release"],
+        "files": len(upstream),
+        "changes": changes,
+        "counts": counts,
+    }